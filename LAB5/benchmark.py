@@ -0,0 +1,57 @@
+import argparse
+import time
+
+from cc_algorithms import ALGORITHMS, Link, simulate
+
+DEFAULT_FLOWS = (1, 2, 4, 8, 16, 32, 64)
+
+def run_benchmark(flows=DEFAULT_FLOWS, algorithms=tuple(ALGORITHMS), link=None, duration=60.0,
+                  against=None, seed=1):
+    """
+    Runs each algorithm with each number of flows over one bottleneck and
+    prints total throughput, utilization, Jain fairness, loss rate, mean
+    queueing delay and the simulation time. With `against`, half of the
+    flows run that algorithm instead, and the table also shows the share
+    of the bandwidth the tested algorithm got. Returns {(name, n): result}.
+    """
+    link = link or Link()
+    print(f"Bottleneck: {link.bandwidth:g} Mbps, base RTT {link.rtt * 1000:g} ms, "
+          f"buffer {link.buffer:.0f} segments, {duration:g} s per run\n")
+    results = {}
+    for name in algorithms:
+        title = f"{name} vs {against}" if against else name
+        print(f"--- {title} ---")
+        print(f"  {'Flows':>5} {'Mbps':>7} {'Util':>6} {'Fairness':>8} {'Loss %':>7} "
+              f"{'Queue ms':>8} {'Share':>6} {'Time (s)':>9}")
+        for n in flows:
+            tested = (n + 1) // 2 if against else n
+            controllers = [ALGORITHMS[name]() for _ in range(tested)]
+            controllers += [ALGORITHMS[against]() for _ in range(n - tested)]
+            start = time.perf_counter()
+            result = simulate(controllers, link, duration, seed)
+            elapsed = time.perf_counter() - start
+            results[(name, n)] = result
+            share = sum(result['throughput'][:tested]) / result['total']
+            print(f"  {n:>5} {result['total']:>7.2f} {result['utilization']:>6.2f} "
+                  f"{result['fairness']:>8.3f} {result['loss_rate'] * 100:>7.2f} "
+                  f"{result['queue_delay'] * 1000:>8.1f} {share:>6.2f} {elapsed:>9.3f}")
+        print()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Throughput and fairness of TCP congestion control algorithms sharing a bottleneck.")
+    parser.add_argument('--flows', type=int, nargs='+', default=list(DEFAULT_FLOWS))
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument('--against', choices=list(ALGORITHMS), default=None,
+                        help="make half of the flows run this algorithm")
+    parser.add_argument('--bandwidth', type=float, default=10.0, help="bottleneck bandwidth (Mbps)")
+    parser.add_argument('--rtt', type=float, default=0.05, help="base round-trip time (s)")
+    parser.add_argument('--buffer', type=float, default=None,
+                        help="drop-tail buffer (segments, default one bandwidth-delay product)")
+    parser.add_argument('--duration', type=float, default=60.0, help="simulated seconds per run")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    run_benchmark(args.flows, args.algorithms, Link(args.bandwidth, args.rtt, args.buffer),
+                  args.duration, args.against, args.seed)
@@ -0,0 +1,396 @@
+import math
+import random
+from bisect import bisect_right
+from collections import deque
+from itertools import accumulate
+
+MIN_RTO = 0.2       # minimum retransmission timeout (s)
+DUPACK_THRESHOLD = 3
+
+
+class CongestionController:
+    """
+    A TCP sender's congestion control, on a per-round (one RTT) clock.
+
+    The base class is the state machine of
+    congestion_contol.tcp_congestion_control: slow start doubles cwnd each
+    round up to ssthresh, congestion avoidance adds one segment per round,
+    and a loss halves ssthresh and restarts slow start (Tahoe). Subclasses
+    change how cwnd reacts to loss (on_loss()).
+    """
+    name = "base"
+
+    def __init__(self, init_cwnd=1, ssthresh=math.inf):
+        self.init_cwnd = init_cwnd
+        self.cwnd = init_cwnd
+        self.ssthresh = ssthresh
+        self.state = "slow start"
+        self.idle_until = 0.0
+
+    def start(self, rng):
+        """Called by simulate() before the first round; `rng` is its seeded random.Random."""
+
+    def window(self, now, rtt):
+        """
+        Segments to send in the round that starts at `now` and lasts `rtt`
+        (0 while waiting for a timeout).
+        """
+        if now < self.idle_until:
+            return 0
+        return max(1, int(self.cwnd))
+
+    def on_round(self, now, rtt, sent, lost, delivered):
+        """
+        The round that sent `sent` segments is acknowledged: `lost` of them
+        were dropped and `delivered` crossed the bottleneck during the round.
+        """
+        if lost:
+            self.on_loss(now, rtt, sent, lost)
+        else:
+            self.grow(now, rtt)
+
+    def grow(self, now, rtt):
+        if self.state == "slow start":
+            self.cwnd *= 2
+            if self.cwnd >= self.ssthresh:
+                self.cwnd = self.ssthresh
+                self.state = "congestion avoidance"
+        else:
+            self.cwnd += 1
+
+    def on_loss(self, now, rtt, sent, lost):
+        self.ssthresh = max(int(self.cwnd) // 2, 1)
+        self.cwnd = self.init_cwnd
+        self.state = "slow start"
+
+    def timeout(self, now, rtt):
+        """The retransmission timer expires: wait, then slow start again from one segment."""
+        self.ssthresh = max(int(self.cwnd) // 2, 2)
+        self.cwnd = 1
+        self.state = "slow start"
+        self.idle_until = now + max(MIN_RTO, 2 * rtt)
+
+
+class Tahoe(CongestionController):
+    """Any loss halves ssthresh and restarts slow start from init_cwnd (the LAB5 model)."""
+    name = "Tahoe"
+
+
+class Reno(CongestionController):
+    """
+    Fast retransmit / fast recovery: a loss detected by three duplicate
+    ACKs halves cwnd instead of restarting slow start. Every loss in the
+    window halves it again, and three or more losses, or too few segments
+    after the losses to produce three duplicate ACKs, end in a timeout.
+    """
+    name = "Reno"
+
+    def on_loss(self, now, rtt, sent, lost):
+        if lost > 2 or sent - lost < DUPACK_THRESHOLD:
+            self.timeout(now, rtt)
+            return
+        for _ in range(lost):
+            self.ssthresh = max(int(self.cwnd) // 2, 2)
+            self.cwnd = self.ssthresh
+        self.state = "congestion avoidance"
+
+
+class NewReno(Reno):
+    """
+    Reno whose fast recovery lasts until the whole window is acknowledged
+    (partial ACKs retransmit the next hole), so several losses in one
+    window halve cwnd only once.
+    """
+    name = "NewReno"
+
+    def on_loss(self, now, rtt, sent, lost):
+        if sent - lost < DUPACK_THRESHOLD:
+            self.timeout(now, rtt)
+            return
+        self.ssthresh = max(int(self.cwnd) // 2, 2)
+        self.cwnd = self.ssthresh
+        self.state = "congestion avoidance"
+
+
+class Cubic(CongestionController):
+    """
+    CUBIC: after a loss, cwnd follows W(t) = C (t - K)^3 + W_max from
+    BETA * W_max, so it regrows quickly, flattens near the window where
+    the loss happened and then probes beyond it; never slower than the
+    Reno-friendly estimate. Losses are handled like NewReno.
+    """
+    name = "CUBIC"
+    C = 0.4
+    BETA = 0.7
+
+    def __init__(self, init_cwnd=1, ssthresh=math.inf):
+        super().__init__(init_cwnd, ssthresh)
+        self.w_max = 0.0
+        self.epoch = None
+        self.k = 0.0
+
+    def _start_epoch(self, now):
+        self.epoch = now
+        self.w_max = max(self.w_max, self.cwnd)
+        self.k = ((self.w_max - self.cwnd) / self.C) ** (1 / 3)
+
+    def grow(self, now, rtt):
+        if self.state == "slow start":
+            super().grow(now, rtt)
+            return
+        if self.epoch is None:
+            self._start_epoch(now)
+        # Aim for the cubic's value one RTT from now
+        t = now + rtt - self.epoch
+        target = self.C * (t - self.k) ** 3 + self.w_max
+        reno = self.w_max * self.BETA + 3 * (1 - self.BETA) / (1 + self.BETA) * t / rtt
+        self.cwnd = max(self.cwnd, target, reno)
+
+    def on_loss(self, now, rtt, sent, lost):
+        if sent - lost < DUPACK_THRESHOLD:
+            self.timeout(now, rtt)
+            self.w_max, self.epoch = self.cwnd, None
+            return
+        # Fast convergence: a flow losing below its last W_max backs off more
+        if self.cwnd < self.w_max:
+            self.w_max = self.cwnd * (1 + self.BETA) / 2
+        else:
+            self.w_max = self.cwnd
+        self.cwnd = max(self.cwnd * self.BETA, 2)
+        self.ssthresh = self.cwnd
+        self.state = "congestion avoidance"
+        self.epoch = now
+        self.k = ((self.w_max - self.cwnd) / self.C) ** (1 / 3)
+
+
+class BBR(CongestionController):
+    """
+    A simplified BBR (v1): a model of the path instead of a reaction to
+    loss. It keeps the bottleneck bandwidth (the best delivery rate of the
+    last 10 rounds) and the minimum RTT (of the last 10 s), sends about
+    pacing_gain * bandwidth * RTT per round and caps cwnd at twice the
+    bandwidth-delay product. STARTUP doubles the rate each round until the
+    bandwidth stops growing, DRAIN empties the queue that built, PROBE_BW
+    cycles the pacing gain 1.25, 0.75, 1, ... and PROBE_RTT drops to four
+    segments for a round when the minimum RTT gets stale. Loss is ignored.
+    """
+    name = "BBR-lite"
+    STARTUP_GAIN = 2.885
+    PROBE_GAINS = (1.25, 0.75, 1, 1, 1, 1, 1, 1)
+    MIN_RTT_WINDOW = 10.0
+
+    def __init__(self, init_cwnd=10, ssthresh=math.inf):
+        super().__init__(init_cwnd, ssthresh)
+        self.state = "startup"
+        self.pacing_gain = self.STARTUP_GAIN
+        self.cwnd_gain = self.STARTUP_GAIN
+        self.bw_samples = deque(maxlen=10)
+        self.btl_bw = 0.0
+        self.min_rtt = math.inf
+        self.min_rtt_stamp = 0.0
+        self.full_bw = 0.0
+        self.full_bw_rounds = 0
+        self.cycle = 0
+        self.phase = 0
+        self.credit = 0.0
+
+    def start(self, rng):
+        # Like BBR, start the gain cycle at a random phase (never the 0.75
+        # one) so competing flows do not all probe in the same round
+        self.phase = rng.choice([k for k in range(len(self.PROBE_GAINS)) if k != 1])
+
+    def window(self, now, rtt):
+        if now < self.idle_until:
+            return 0
+        if self.state == "probe rtt":
+            return 4
+        if not self.btl_bw:
+            return max(1, int(self.cwnd))
+        bdp = self.btl_bw * self.min_rtt
+        self.cwnd = max(4, self.cwnd_gain * bdp)
+        # Pacing is a rate: carry the fraction of a segment to the next round
+        paced = self.pacing_gain * self.btl_bw * rtt + self.credit
+        segments = max(1, int(min(paced, self.cwnd)))
+        self.credit = max(min(paced, self.cwnd) - segments, 0.0)
+        return segments
+
+    def on_round(self, now, rtt, sent, lost, delivered):
+        self.bw_samples.append(delivered / rtt)
+        self.btl_bw = max(self.bw_samples)
+        expired = now - self.min_rtt_stamp > self.MIN_RTT_WINDOW
+        if rtt <= self.min_rtt or expired:
+            self.min_rtt = rtt
+            self.min_rtt_stamp = now
+        if expired and self.state == "probe bw":
+            # Send little for a round so the queue drains and the RTT is measured again
+            self.state = "probe rtt"
+            return
+
+        if self.state == "startup":
+            # The pipe is full once the bandwidth grew < 25% in three rounds
+            if self.btl_bw >= self.full_bw * 1.25:
+                self.full_bw = self.btl_bw
+                self.full_bw_rounds = 0
+            else:
+                self.full_bw_rounds += 1
+                if self.full_bw_rounds >= 3:
+                    self.state = "drain"
+                    self.pacing_gain = 1 / self.STARTUP_GAIN
+                    self.cwnd_gain = 2
+        elif self.state == "drain":
+            if sent <= self.btl_bw * self.min_rtt:
+                self._probe_bw()
+        elif self.state == "probe rtt":
+            self._probe_bw()
+        else:
+            self.cycle = (self.cycle + 1) % len(self.PROBE_GAINS)
+            self.pacing_gain = self.PROBE_GAINS[self.cycle]
+
+    def _probe_bw(self):
+        self.state = "probe bw"
+        self.cycle = self.phase
+        self.pacing_gain = self.PROBE_GAINS[self.cycle]
+        self.cwnd_gain = 2
+
+
+ALGORITHMS = {cls.name: cls for cls in (Tahoe, Reno, NewReno, Cubic, BBR)}
+
+
+class Link:
+    """
+    A bottleneck link: `bandwidth` in Mbps, the base (empty queue)
+    round-trip time `rtt` in seconds and a drop-tail buffer of `buffer`
+    segments (default: one bandwidth-delay product).
+    """
+
+    def __init__(self, bandwidth=10.0, rtt=0.05, buffer=None, mss=1500):
+        self.bandwidth = bandwidth
+        self.rtt = rtt
+        self.mss = mss
+        self.rate = bandwidth * 1e6 / (8 * mss)     # segments per second
+        self.bdp = self.rate * rtt
+        self.buffer = self.bdp if buffer is None else buffer
+
+
+def jain_fairness(values):
+    """Jain's fairness index: 1 when all values are equal, 1/n when one flow gets everything."""
+    total = sum(values)
+    squares = sum(value * value for value in values)
+    return total * total / (len(values) * squares) if squares else 1.0
+
+
+def simulate(controllers, link=None, duration=60.0, seed=1):
+    """
+    Runs one flow per controller over a shared bottleneck `link` for
+    `duration` simulated seconds, one round trip at a time.
+
+    Each round every flow sends its window. The link forwards rate * RTT
+    segments per round and queues the rest up to its buffer; the round's
+    RTT includes the queueing delay. The packets of the flows arrive
+    interleaved, so the ones that overflow the buffer are a random sample
+    of the round's arrivals (drawn from random.Random(seed)).
+
+    Returns a dict with each flow's throughput (Mbps) and segments sent /
+    lost, the total throughput, link utilization, Jain fairness index,
+    loss rate, mean queueing delay, and each flow's window per round.
+    """
+    link = link or Link()
+    rng = random.Random(seed)
+    for controller in controllers:
+        controller.start(rng)
+    n = len(controllers)
+    sent_total = [0] * n
+    lost_total = [0] * n
+    delivered_total = [0.0] * n
+    windows_history = [[] for _ in range(n)]
+    queue = 0.0
+    now = 0.0
+    served = 0.0
+    queue_delay = 0.0
+    rounds = 0
+
+    while now < duration:
+        rtt = link.rtt + queue / link.rate
+        windows = [controller.window(now, rtt) for controller in controllers]
+        arrivals = sum(windows)
+        backlog = max(queue + arrivals - link.rate * rtt, 0.0)
+        drops = int(max(backlog - link.buffer, 0))
+        forwarded = queue + arrivals - backlog
+        # Share what the link forwarded (queued segments included) among the
+        # flows in proportion to the segments each got into the queue
+        accepted = arrivals - drops
+        share = forwarded / accepted if accepted else 0.0
+        served += forwarded
+        queue = min(backlog, link.buffer)
+
+        lost = [0] * n
+        if drops:
+            ends = list(accumulate(windows))
+            for packet in rng.sample(range(arrivals), drops):
+                lost[bisect_right(ends, packet)] += 1
+
+        now += rtt
+        for i, controller in enumerate(controllers):
+            windows_history[i].append(windows[i])
+            if windows[i]:
+                delivered = (windows[i] - lost[i]) * share
+                sent_total[i] += windows[i]
+                lost_total[i] += lost[i]
+                delivered_total[i] += delivered
+                controller.on_round(now, rtt, windows[i], lost[i], delivered)
+        queue_delay += rtt - link.rtt
+        rounds += 1
+
+    to_mbps = link.mss * 8 / 1e6 / now
+    throughput = [delivered * to_mbps for delivered in delivered_total]
+    return {
+        'throughput': throughput,
+        'sent': sent_total,
+        'lost': lost_total,
+        'total': sum(throughput),
+        'utilization': served / (link.rate * now),
+        'fairness': jain_fairness(throughput),
+        'loss_rate': sum(lost_total) / max(sum(sent_total), 1),
+        'queue_delay': queue_delay / rounds,
+        'windows': windows_history,
+    }
+
+
+def run_with_random_loss(controller, rounds=30, loss_prob=0.18, seed=7):
+    """
+    The loss model of congestion_contol.tcp_congestion_control: each round
+    is lost with probability `loss_prob`. Returns the cwnd per round;
+    Tahoe(init_cwnd, ssthresh) reproduces tcp_congestion_control exactly.
+    """
+    rng = random.Random(seed)
+    history = []
+    for r in range(rounds):
+        loss = rng.random() < loss_prob
+        history.append(controller.cwnd)
+        sent = max(1, int(controller.cwnd))
+        controller.on_round(r, 1.0, sent, 1 if loss else 0, sent - loss)
+    return history
+
+
+if __name__ == "__main__":
+    link = Link(bandwidth=10.0, rtt=0.05)
+    print(f"Bottleneck: {link.bandwidth:g} Mbps, base RTT {link.rtt * 1000:g} ms, "
+          f"buffer {link.buffer:.0f} segments (1 BDP)\n")
+
+    print(f"{'Algorithm':<10} {'Flows':>5} {'Total Mbps':>10} {'Util':>6} {'Fairness':>8} "
+          f"{'Loss %':>7} {'Queue ms':>8}")
+    print("-" * 60)
+    for name, cls in ALGORITHMS.items():
+        for flows in (1, 4):
+            result = simulate([cls() for _ in range(flows)], link)
+            print(f"{name:<10} {flows:>5} {result['total']:>10.2f} {result['utilization']:>6.2f} "
+                  f"{result['fairness']:>8.3f} {result['loss_rate'] * 100:>7.2f} "
+                  f"{result['queue_delay'] * 1000:>8.1f}")
+
+    # Competing algorithms on the same bottleneck
+    print()
+    for pair in [(Reno, Cubic), (Cubic, BBR), (Reno, BBR)]:
+        result = simulate([cls() for cls in pair], link)
+        shares = ", ".join(f"{cls.name} {mbps:.2f}" for cls, mbps in zip(pair, result['throughput']))
+        print(f"{' vs '.join(cls.name for cls in pair):<18}: {shares} Mbps "
+              f"(fairness {result['fairness']:.3f})")
@@ -1,12 +1,19 @@
-import matplotlib.pyplot as plt
 import random
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 def tcp_congestion_control(
     rounds=30,
     init_cwnd=1,
     ssthresh=12,
     loss_prob=0.18,
-    seed=7
+    seed=7,
+    verbose=True,
+    plot=True
 ):
     random.seed(seed)
     cwnd_history = []
@@ -14,41 +21,117 @@ def tcp_congestion_control(
     threshold = ssthresh
     state = "slow start"
 
-    print(f"{'Round':<6} {'cwnd':<6} {'ssthresh':<9} {'Phase':<18} {'Loss'}")
-    print("-" * 50)
+    if verbose:
+        print(f"{'Round':<6} {'cwnd':<6} {'ssthresh':<9} {'Phase':<18} {'Loss'}")
+        print("-" * 50)
 
     for r in range(1, rounds + 1):
         loss = random.random() < loss_prob
         cwnd_history.append(cwnd)
 
         # Print summary for this round
-        print(f"{r:<6} {cwnd:<6} {threshold:<9} {state:<18} {'Yes' if loss else 'No'}")
+        if verbose:
+            print(f"{r:<6} {cwnd:<6} {threshold:<9} {state:<18} {'Yes' if loss else 'No'}")
 
         if loss:
             # Multiplicative decrease
             threshold = max(cwnd // 2, 1)
             cwnd = init_cwnd
             state = "slow start"
-            print(f"  Loss detected! ssthresh set to {threshold}, cwnd reset to {cwnd} (Slow Start resumes)")
+            if verbose:
+                print(f"  Loss detected! ssthresh set to {threshold}, cwnd reset to {cwnd} (Slow Start resumes)")
         elif state == "slow start":
             cwnd *= 2
             if cwnd >= threshold:
                 cwnd = threshold
                 state = "congestion avoidance"
-                print(f"  cwnd reached ssthresh ({threshold}), switching to Congestion Avoidance")
+                if verbose:
+                    print(f"  cwnd reached ssthresh ({threshold}), switching to Congestion Avoidance")
         elif state == "congestion avoidance":
             cwnd += 1
 
     # Plot
-    plt.figure(figsize=(8, 5))
-    plt.plot(cwnd_history, marker='o', color='blue')
-    plt.title("TCP Congestion Window (cwnd) Evolution")
-    plt.xlabel("Transmission Round")
-    plt.ylabel("cwnd (segments)")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig("cwnd plot.png")
-    plt.show()
+    if plot:
+        import matplotlib.pyplot as plt
+        plt.figure(figsize=(8, 5))
+        plt.plot(cwnd_history, marker='o', color='blue')
+        plt.title("TCP Congestion Window (cwnd) Evolution")
+        plt.xlabel("Transmission Round")
+        plt.ylabel("cwnd (segments)")
+        plt.grid(True)
+        plt.tight_layout()
+        plt.savefig("cwnd plot.png")
+        plt.show()
+
+    return cwnd_history
+
+def tcp_congestion_control_batch(
+    flows=10000,
+    rounds=30,
+    init_cwnd=1,
+    ssthresh=12,
+    loss_prob=0.18,
+    seed=7
+):
+    """
+    Batch (Monte Carlo) mode of tcp_congestion_control: simulates `flows`
+    independent flows for `rounds` rounds at once with NumPy arrays, one
+    vectorized step per round, without printing or plotting.
+
+    `ssthresh` and `loss_prob` may be scalars or one value per flow, so a
+    parameter sweep is a single batch. Returns a dict with the cwnd matrix
+    (rounds x flows), the mean cwnd per round, each flow's throughput
+    (mean segments sent per round) and loss count, and the mean, standard
+    deviation and 5th/50th/95th percentiles of the throughput.
+    """
+    if np is None:
+        raise ImportError("tcp_congestion_control_batch() requires NumPy.")
+    rng = np.random.default_rng(seed)
+    loss_prob = np.broadcast_to(np.asarray(loss_prob, dtype=np.float32), (flows,))
+    threshold = np.array(np.broadcast_to(np.asarray(ssthresh, dtype=np.int32), (flows,)))
+    cwnd = np.full(flows, init_cwnd, dtype=np.int32)
+    doubled = np.empty_like(cwnd)
+    halved = np.empty_like(cwnd)
+    draws = np.empty(flows, dtype=np.float32)
+    loss = np.empty(flows, dtype=bool)
+    slow_start = np.ones(flows, dtype=bool)
+    cwnd_history = np.empty((rounds, flows), dtype=np.int32)
+    losses = np.zeros(flows, dtype=np.int64)
+
+    # One vectorized step per round, in place. Slow start doubles cwnd up
+    # to ssthresh, then congestion avoidance adds one segment per round; a
+    # loss halves ssthresh and resets cwnd to init_cwnd.
+    for r in range(rounds):
+        rng.random(out=draws, dtype=np.float32)
+        np.less(draws, loss_prob, out=loss)
+        cwnd_history[r] = cwnd
+        losses += loss
+
+        np.right_shift(cwnd, 1, out=halved)
+        np.maximum(halved, 1, out=halved)
+        np.left_shift(cwnd, 1, out=doubled)
+        np.minimum(doubled, threshold, out=doubled)
+        cwnd += 1
+        np.copyto(cwnd, doubled, where=slow_start)
+        np.putmask(cwnd, loss, init_cwnd)
+        # Slow start ends once cwnd reaches ssthresh (unless there was a loss)
+        slow_start &= doubled != threshold
+        slow_start |= loss
+        np.putmask(threshold, loss, halved)
+
+    throughput = cwnd_history.mean(axis=0)
+    p5, p50, p95 = np.percentile(throughput, [5, 50, 95])
+    return {
+        'cwnd': cwnd_history,
+        'mean_cwnd': cwnd_history.mean(axis=1),
+        'throughput': throughput,
+        'losses': losses,
+        'throughput_mean': throughput.mean(),
+        'throughput_std': throughput.std(),
+        'throughput_p5': p5,
+        'throughput_p50': p50,
+        'throughput_p95': p95,
+    }
 
 if __name__ == "__main__":
     tcp_congestion_control(
@@ -58,3 +141,20 @@ if __name__ == "__main__":
         loss_prob=0.18,
         seed=3,
     )
+
+    # Batch mode: many independent flows at once, compared with looping
+    flows = 10000
+    start = time.perf_counter()
+    stats = tcp_congestion_control_batch(flows=flows, rounds=30, ssthresh=12, loss_prob=0.18, seed=3)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for seed in range(100):
+        tcp_congestion_control(rounds=30, ssthresh=12, loss_prob=0.18, seed=seed, verbose=False, plot=False)
+    loop_time = (time.perf_counter() - start) * flows / 100
+
+    print(f"\nBatch of {flows} flows x 30 rounds: {batch_time:.3f} s "
+          f"(looping tcp_congestion_control without output: ~{loop_time:.2f} s)")
+    print(f"Throughput (segments/round): mean {stats['throughput_mean']:.2f}, "
+          f"std {stats['throughput_std']:.2f}, p5 {stats['throughput_p5']:.2f}, "
+          f"median {stats['throughput_p50']:.2f}, p95 {stats['throughput_p95']:.2f}")
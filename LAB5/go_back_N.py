@@ -1,79 +1,134 @@
+import heapq
 import random
 import time
 
+ACK, TIMEOUT = 0, 1     # event kinds
+
 def range_str(a, b):
         return f"{a} {b}"
 
-def go_back_n(total_frames=10, window_size=4, loss_prob=0.2, timeout=1.0, seed=None):
+def go_back_n(total_frames=10, window_size=4, loss_prob=0.2, timeout=1.0, seed=None,
+              prop_delay=0.05, bandwidth=1e6, frame_size=1000, verbose=True, realtime=False):
+    """
+    Go-Back-N on a discrete-event simulated clock.
+
+    Each frame takes frame_size * 8 / bandwidth seconds to transmit and
+    prop_delay seconds to propagate; ACKs are cumulative and take
+    prop_delay back. The sender keeps one timer for its oldest unACKed
+    frame and on timeout resends the whole window. Losses are drawn from
+    random.Random(seed), so a run is reproducible per seed.
 
-    if seed is not None:
-        random.seed(seed)
+    With realtime=True the simulation sleeps through the simulated time
+    (a demo mode); otherwise it runs as fast as possible. Returns a dict
+    of statistics; times are simulated seconds.
+    """
+    if timeout <= 0:
+        raise ValueError("The timeout must be positive.")
+    rng = random.Random(seed)
+    tx_time = frame_size * 8 / bandwidth
+    N = window_size
 
     base = 0                 # oldest unacknowledged frame
     next_seq = 0             # next frame to send
-    N = window_size
-    in_flight_status = {}    # frame -> 'ok' or 'lost' for the latest send attempt
+    expected = 0             # receiver's next in-order frame
+    link_free = 0.0          # when the sender's link finishes its current frame
+    timer = None             # deadline of the retransmission timer
+    timer_pending = False    # whether a TIMEOUT event is queued
+    events = []
+    now = 0.0
+    sent = 0
+    timeouts = 0
 
-    start_time = None
+    def log(message):
+        if verbose:
+            print(f"[{now:9.3f}s] {message}")
 
-    while base < total_frames:
-        # Send as many as the window allows
-        frames_to_send = []
+    def transmit(frame):
+        # The receiver sees frames in the order they were sent, so its
+        # state can be updated now and only the ACK needs an event.
+        nonlocal link_free, expected, sent
+        start = max(now, link_free)
+        link_free = start + tx_time
+        sent += 1
+        if rng.random() >= loss_prob:
+            if frame == expected:
+                expected += 1
+            if expected:
+                heapq.heappush(events, (link_free + 2 * prop_delay, ACK, expected - 1))
+        return start
+
+    def send_window():
+        nonlocal next_seq, timer, timer_pending
+        first = next_seq
         while next_seq < base + N and next_seq < total_frames:
-            frames_to_send.append(next_seq)
+            start = transmit(next_seq)
+            if timer is None:
+                # The timer runs from when the frame actually leaves
+                timer = start + timeout
             next_seq += 1
+        if next_seq > first:
+            log(f"Sending frames {range_str(first, next_seq - 1)}")
+        if timer is not None and not timer_pending:
+            heapq.heappush(events, (timer, TIMEOUT, None))
+            timer_pending = True
 
-        if frames_to_send:
-            # Grouped send print like: "Sending frames 0 3"
-            print(f"Sending frames {range_str(frames_to_send[0], frames_to_send[-1])}")
-            # Mark each sent frame as lost or ok for this attempt
-            for f in frames_to_send:
-                in_flight_status[f] = 'lost' if random.random() < loss_prob else 'ok'
-            # Start (or restart) timer for oldest unACKed if needed
-            if start_time is None:
-                start_time = time.time()
+    send_window()
+    while base < total_frames:
+        at, kind, ack = heapq.heappop(events)
+        if realtime:
+            time.sleep(at - now)
+        now = at
 
-        # Simulate receiver cumulative ACK up to first lost in-flight frame
-        # Find highest consecutive 'ok' from base
-        ack_upto = base - 1
-        i = base
-        while i < next_seq and in_flight_status.get(i) == 'ok':
-            ack_upto = i
-            i += 1
+        if kind == TIMEOUT:
+            timer_pending = False
+            if timer is None:
+                continue
+            if now < timer:
+                # The timer was restarted meanwhile: wait for the new deadline
+                heapq.heappush(events, (timer, TIMEOUT, None))
+                timer_pending = True
+                continue
+            timeouts += 1
+            log(f"Frame {base} lost , retransmitting frames {range_str(base, next_seq - 1)}")
+            timer = transmit(base) + timeout
+            for f in range(base + 1, next_seq):
+                transmit(f)
+            heapq.heappush(events, (timer, TIMEOUT, None))
+            timer_pending = True
+            continue
 
-        if ack_upto >= base:
-            # Receiver cumulatively ACKs last in-order frame index
-            print(f"ACK {ack_upto} received")
-            base = ack_upto + 1
-            # Slide window print
-            if base < total_frames:
-                win_right = min(base + N - 1, total_frames - 1)
-                print(f"Window slides to {range_str(base, win_right)}")
-            # Clear timer if window emptied; otherwise reset for new base
-            if base == next_seq:
-                start_time = None
-            else:
-                start_time = time.time()
+        if ack < base:
+            # Duplicate ACK for a frame already acknowledged
             continue
+        log(f"ACK {ack} received")
+        base = ack + 1
+        if base < total_frames:
+            win_right = min(base + N - 1, total_frames - 1)
+            log(f"Window slides to {range_str(base, win_right)}")
+        # Stop the timer if the window emptied; otherwise restart it for the new base
+        timer = None if base == next_seq else now + timeout
+        send_window()
+
+    stats = {
+        'frames': total_frames,
+        'sent': sent,
+        'retransmissions': sent - total_frames,
+        'timeouts': timeouts,
+        'elapsed': now,
+        'throughput': total_frames / now if now else 0.0,
+        'efficiency': total_frames * tx_time / now if now else 0.0,
+    }
+    if verbose:
+        print(f"\nSummary: sent={sent}, retransmissions={stats['retransmissions']}, "
+              f"timeouts={timeouts}, time={now:.3f}s, efficiency={stats['efficiency']:.2%}")
+    return stats
 
-        # No ACK progress; check timeout if there are outstanding frames
-        if base < next_seq:
-            if start_time is None:
-                start_time = time.time()
-            if time.time() - start_time >= timeout:
-                # Timeout at 'base' implies that frame 'base' was lost (first gap)
-                last = next_seq - 1
-                print(f"Frame {base} lost , retransmitting frames {range_str(base, last)}")
-                # Retransmit all in-flight frames from base..next_seq-1
-                for f in range(base, next_seq):
-                    in_flight_status[f] = 'lost' if random.random() < loss_prob else 'ok'
-                # Reset timer
-                start_time = time.time()
-            else:
-                # Small sleep to avoid busy-wait; not functionally required
-                time.sleep(0.01)
-        else:
-            # Nothing outstanding and nothing new to send; done
-            break
+if __name__ == "__main__":
+    go_back_n(15, 4, 0.25, 1.0, 20)
 
-go_back_n(15, 4, 0.25,1.0, 20)
+    # A long run: the simulated clock never sleeps
+    start = time.perf_counter()
+    stats = go_back_n(10**6, 8, 0.05, 0.2, seed=1, verbose=False)
+    print(f"\n{stats['frames']:,} frames: {stats['sent']:,} sent, {stats['timeouts']:,} timeouts, "
+          f"{stats['elapsed']:,.1f} simulated s, efficiency {stats['efficiency']:.2%} "
+          f"({time.perf_counter() - start:.2f} s wall clock)")
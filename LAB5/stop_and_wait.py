@@ -1,24 +1,53 @@
 import random
 import time
 
-def stop_and_wait(num_frames=5, loss_prob=0.3, timeout=1.0, ack_loss_prob=0.0, seed=42):
+def stop_and_wait(num_frames=5, loss_prob=0.3, timeout=1.0, ack_loss_prob=0.0, seed=42,
+                  prop_delay=0.05, bandwidth=1e6, frame_size=1000, verbose=True, realtime=False):
+    """
+    Stop-and-Wait (alternating bit) on a simulated clock.
+
+    A frame takes frame_size * 8 / bandwidth seconds to transmit, then
+    prop_delay each way for it and its ACK; a lost frame or ACK costs the
+    sender `timeout` seconds from the start of the transmission. Losses
+    are drawn from random.Random(seed), so a run is reproducible per seed.
+
+    With realtime=True the simulation sleeps through the simulated time
+    (a demo mode); otherwise it runs as fast as possible. Returns a dict
+    of statistics; times are simulated seconds.
+    """
+    rng = random.Random(seed)
+    tx_time = frame_size * 8 / bandwidth
+    rtt = tx_time + 2 * prop_delay
+    if timeout <= rtt:
+        raise ValueError(f"The timeout must exceed the round-trip time ({rtt:.3f} s).")
 
     seq = 0                 # sender's current frame sequence bit (0/1)
     expected_seq = 0        # receiver's expected sequence bit (0/1)
     total_sent = 0
     total_retx = 0
     delivered = 0
+    now = 0.0
+
+    def wait(seconds):
+        nonlocal now
+        if realtime:
+            time.sleep(seconds)
+        now += seconds
+
+    def log(message):
+        if verbose:
+            print(f"[{now:9.3f}s] {message}")
 
     for i in range(num_frames):
         acked = False
         while not acked:
             # Sender transmits current frame i
-            print(f"Sending Frame {i} (seq {seq})")
+            log(f"Sending Frame {i} (seq {seq})")
             total_sent += 1
 
-            if random.random() < loss_prob:
-                time.sleep(timeout)
-                print(f"Frame {i} lost, timeout, retransmitting ...")
+            if rng.random() < loss_prob:
+                wait(timeout)
+                log(f"Frame {i} lost, timeout, retransmitting ...")
                 total_retx += 1
                 # Retransmit same frame
                 continue
@@ -26,33 +55,53 @@ def stop_and_wait(num_frames=5, loss_prob=0.3, timeout=1.0, ack_loss_prob=0.0, s
             # Receiver side
             if seq == expected_seq:
                 # First time seeing this seq: accept and deliver
-                print(f"Receiver: accepted Frame {i} (seq {seq})")
+                log(f"Receiver: accepted Frame {i} (seq {seq})")
                 delivered += 1
                 ack_bit = seq            # ACK carries the received bit
                 expected_seq ^= 1        # expect the other bit next
             else:
                 # Duplicate: do not deliver, just ACK the received bit
-                print(f"Receiver: duplicate Frame {i} (seq {seq}), discarding")
-                ack_bit = seq           
+                log(f"Receiver: duplicate Frame {i} (seq {seq}), discarding")
+                ack_bit = seq
 
-            if random.random() < ack_loss_prob:
-                time.sleep(timeout)
-                print(f"ACK {ack_bit} for Frame {i} lost, timeout, retransmitting ...")
+            if rng.random() < ack_loss_prob:
+                wait(timeout)
+                log(f"ACK {ack_bit} for Frame {i} lost, timeout, retransmitting ...")
                 total_retx += 1
                 continue
 
             # Sender receives ACK
+            wait(rtt)
             if ack_bit == seq:
-                print(f"ACK {ack_bit} received")
+                log(f"ACK {ack_bit} received")
                 seq ^= 1      # advance to next bit
                 acked = True
             else:
-                time.sleep(timeout)
-                print(f"Out-of-sync ACK {ack_bit} ignored, retransmitting ...")
+                wait(timeout - rtt)
+                log(f"Out-of-sync ACK {ack_bit} ignored, retransmitting ...")
                 total_retx += 1
 
-    print(f"\nSummary: sent={total_sent}, retransmissions={total_retx}, delivered={delivered}")
+    stats = {
+        'frames': num_frames,
+        'sent': total_sent,
+        'retransmissions': total_retx,
+        'delivered': delivered,
+        'elapsed': now,
+        'throughput': delivered / now if now else 0.0,
+        'efficiency': delivered * tx_time / now if now else 0.0,
+    }
+    if verbose:
+        print(f"\nSummary: sent={total_sent}, retransmissions={total_retx}, delivered={delivered}, "
+              f"time={now:.3f}s, efficiency={stats['efficiency']:.2%}")
+    return stats
 
 
-stop_and_wait(6,0.3,1.0,0.0,20)
+if __name__ == "__main__":
+    stop_and_wait(6, 0.3, 1.0, 0.0, 20)
 
+    # A long run: the simulated clock never sleeps
+    start = time.perf_counter()
+    stats = stop_and_wait(10**6, 0.05, 0.2, 0.02, seed=1, verbose=False)
+    print(f"\n{stats['frames']:,} frames: {stats['sent']:,} sent, {stats['retransmissions']:,} "
+          f"retransmissions, {stats['elapsed']:,.1f} simulated s, efficiency "
+          f"{stats['efficiency']:.2%} ({time.perf_counter() - start:.2f} s wall clock)")
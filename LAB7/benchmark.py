@@ -0,0 +1,124 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# The simulators live in their own folders next to this file
+HERE = os.path.dirname(os.path.abspath(__file__))
+for folder in ('rip', 'bgp'):
+    sys.path.insert(0, os.path.join(HERE, folder))
+try:
+    import topology
+    from spf import compile_lsdb, spf, all_pairs_spf
+    from rip_sim import RipSimulator
+    from bgp_sim import BgpSimulator
+    from flooding import FloodingSimulator
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find the LAB7 modules (topology.py, spf.py, flooding.py, rip/, bgp/).")
+    print("-------------\n")
+    exit()
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+def run_spf_all(topo, workers):
+    all_pairs_spf(compile_lsdb(topo), workers)
+
+def run_spf_one(topo, workers):
+    spf(compile_lsdb(topo), 0)
+
+def run_rip(topo, workers):
+    RipSimulator([(u, v) for u, v, _ in topo.links], topo.nodes).run()
+
+def run_bgp(topo, workers):
+    sim = BgpSimulator([(u, v) for u, v, _ in topo.links], topo.nodes)
+    for asn in sim.neighbors:
+        sim.originate(asn, asn)
+    sim.run()
+
+def run_flooding(topo, workers):
+    FloodingSimulator(topo.links, topo.nodes).run()
+
+def run_flooding_change(topo, workers):
+    sim = FloodingSimulator(topo.links, topo.nodes, synchronized=True)
+    u, v, cost = topo.links[0]
+    sim.set_link(u, v, cost + 1)
+    sim.run()
+
+# (name, runner, exponent): cost grows roughly like n^exponent, which is
+# used to skip sizes that would blow the time or memory budget
+SIMULATORS = [
+    ("OSPF / IS-IS, all routers' SPF", run_spf_all, 2),
+    ("OSPF / IS-IS, one router's SPF", run_spf_one, 1),
+    ("LSP flooding, cold start", run_flooding, 2),
+    ("LSP flooding, one link change", run_flooding_change, 2),
+    ("RIP (event-driven)", run_rip, 2),
+    ("BGP (event-driven)", run_bgp, 2),
+]
+
+def measure(runner, topo, workers):
+    """
+    Runs one simulation twice: timed with `workers`, then under tracemalloc
+    (which slows Python down a lot) for the peak memory. tracemalloc only
+    sees the current process, so the memory run uses a single worker: the
+    parallel SPF would otherwise leave out everything its workers allocate.
+    Returns (seconds, peak bytes).
+    """
+    start = time.perf_counter()
+    runner(topo, workers)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    runner(topo, 1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def run_benchmark(sizes=DEFAULT_SIZES, generator='ba', seed=1, workers=None,
+                  time_budget=60.0, memory_budget=4 * 2**30):
+    """
+    Runs every simulator on generated topologies of the given sizes and
+    prints time and peak memory. A size is skipped when extrapolating the
+    previous one predicts more than `time_budget` seconds or
+    `memory_budget` bytes. Returns {(name, size): (seconds, peak)}.
+    """
+    topologies = {n: topology.generate(generator, n, seed=seed) for n in sizes}
+    results = {}
+    for name, runner, exponent in SIMULATORS:
+        print(f"--- {name} ({generator} topologies) ---")
+        print(f"  {'Nodes':>8} {'Links':>9} {'Time (s)':>10} {'Peak MiB':>10}")
+        previous = None
+        for n in sizes:
+            topo = topologies[n]
+            if previous:
+                last_n, last_time, last_peak = previous
+                growth = (len(topo) / last_n) ** exponent
+                if last_time * growth > time_budget or last_peak * growth > memory_budget:
+                    print(f"  {len(topo):>8} {len(topo.links):>9}   skipped (estimated "
+                          f"{last_time * growth:,.0f} s, {last_peak * growth / 2**20:,.0f} MiB)")
+                    continue
+            elapsed, peak = measure(runner, topo, workers)
+            results[(name, len(topo))] = (elapsed, peak)
+            previous = (len(topo), elapsed, peak)
+            print(f"  {len(topo):>8} {len(topo.links):>9} {elapsed:>10.3f} {peak / 2**20:>10.1f}")
+        print()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and peak memory of the LAB7 simulators.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--generator', choices=sorted(topology.GENERATORS), default='ba')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes for the all-routers SPF (default: one per CPU)")
+    parser.add_argument('--time-budget', type=float, default=60.0,
+                        help="skip sizes estimated to take longer (seconds)")
+    args = parser.parse_args()
+
+    if args.generator == 'waxman' and max(args.sizes) > 5000:
+        # Waxman generation itself is O(n^2)
+        print("Note: waxman topologies are limited to 5000 nodes.\n")
+        args.sizes = [n for n in args.sizes if n <= 5000]
+
+    run_benchmark(args.sizes, args.generator, args.seed, args.workers, args.time_budget)
\ No newline at end of file
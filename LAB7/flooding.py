@@ -0,0 +1,435 @@
+import heapq
+import sys
+from array import array
+from collections import namedtuple
+
+from topology import Topology, generate
+
+MAX_AGE = 1200.0            # an LSP that is not refreshed within MaxAge is dropped
+REFRESH_INTERVAL = 900.0    # how often a router re-originates its LSP
+LSP_INTERVAL = 0.033        # pacing: a router sends its queued LSPs at most this often
+SNP_ENTRIES = 90            # LSP entries per CSNP / PSNP packet
+
+# Event kinds of the flooding simulator. The first four are flooding in
+# flight; the timers are not, so run() can stop when the flooding is over.
+SEND_DUE = 0        # a router's pacing timer fired: send the queued LSPs
+LSPS = 1            # LSPs arrive over a link
+CSNP = 2            # a complete sequence-number summary arrives
+PSNP = 3            # a partial SNP (a request for LSPs) arrives
+REFRESH = 4         # a router re-originates its LSP
+EXPIRE = 5          # an LSP reaches MaxAge
+
+
+class Lsp(namedtuple('Lsp', 'origin seq links originated lifetime')):
+    """
+    A link-state PDU: router `origin`'s links as (neighbor, cost) pairs,
+    version `seq`. LSPs are immutable; every router that holds one and every
+    message that carries one refer to the same object. The age is derived
+    from `originated`, so copies never need to be updated as they age.
+    """
+    __slots__ = ()
+
+    def expires(self):
+        return self.originated + self.lifetime
+
+
+class FloodingSimulator:
+    """
+    Event-driven LSP flooding (IS-IS LSPs; OSPF LSAs flood the same way)
+    on a simulated clock.
+
+    Routers are numbered 0..n-1. Router i's LSDB is held[i], one entry per
+    origin: the sequence number of the LSP it holds from that origin, 0 if
+    none, or -seq if that LSP aged out. The LSPs themselves are stored
+    once, in versions[origin][seq].
+
+    A router that accepts a newer LSP queues it for its other neighbours
+    and sends its queue every `lsp_interval` seconds. An LSP it already
+    holds is a duplicate and is dropped; an older one is answered with its
+    own copy. When an adjacency comes up, both ends exchange CSNPs (the
+    sequence numbers of their whole LSDB), request the newer LSPs they
+    miss with PSNPs and send the ones the other side lacks. Routers
+    re-originate their LSP every `refresh_interval` seconds, and LSPs older
+    than `max_age` are dropped. Messages take `link_delay` seconds to cross
+    a link.
+
+    With `synchronized`, every router starts out holding every LSP (a
+    converged network), which skips the O(routers * links) initial flood
+    when only the flooding of later changes is of interest.
+    """
+
+    def __init__(self, links, nodes=(), link_delay=0.01, lsp_interval=LSP_INTERVAL,
+                 refresh_interval=REFRESH_INTERVAL, max_age=MAX_AGE, synchronized=False):
+        # links: (u, v) pairs (cost 1) or (u, v, cost) triples
+        self.names = []
+        self.index = {}
+        for name in nodes:
+            if name not in self.index:
+                self.index[name] = len(self.names)
+                self.names.append(name)
+        self.links = []
+        for link in links:
+            u, v = link[0], link[1]
+            for name in (u, v):
+                if name not in self.index:
+                    self.index[name] = len(self.names)
+                    self.names.append(name)
+            cost = link[2] if len(link) > 2 else 1
+            self.links.append((self.index[u], self.index[v], cost))
+
+        n = len(self.names)
+        self.neighbors = [{} for _ in range(n)]
+        for u, v, cost in self.links:
+            self.neighbors[u][v] = cost
+            self.neighbors[v][u] = cost
+
+        self.link_delay = link_delay
+        self.lsp_interval = lsp_interval
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.now = 0.0
+        self.last_change = 0.0
+        self.events = []
+        self.event_seq = 0
+        self.in_flight = 0
+
+        self.versions = [{} for _ in range(n)]
+        self.current = array('i', [0]) * n          # newest sequence number of each origin
+        self.pending = [{} for _ in range(n)]       # neighbor -> {origin: LSP} to send
+        self.timer_set = bytearray(n)
+        self.failed = bytearray(n)
+        self.alive = n
+
+        # stale_from[o] counts the live routers whose LSP from o is not the
+        # newest one; the LSDBs are consistent when no router is stale
+        self.stale_from = array('i', [0]) * n
+        self.stale = 0
+        self.consistent_at = 0.0
+
+        self.lsps_sent = [0] * n
+        self.csnps_sent = [0] * n
+        self.psnps_sent = [0] * n
+        self.duplicates = [0] * n
+
+        if synchronized:
+            self.current = array('i', [1]) * n
+            self.held = [array('i', self.current) for _ in range(n)]
+            for router in range(n):
+                self._install(Lsp(router, 1, tuple(self.neighbors[router].items()), 0.0, max_age))
+        else:
+            self.held = [array('i', [0]) * n for _ in range(n)]
+            for router in range(n):
+                self.originate(router)
+
+    def _schedule(self, delay, kind, router, sender=None, payload=None):
+        self.event_seq += 1
+        if kind <= PSNP:
+            self.in_flight += 1
+        heapq.heappush(self.events, (self.now + delay, self.event_seq, kind, router, sender, payload))
+
+    def _install(self, lsp):
+        # A new version of an origin's LSP: keep it and set its timers
+        self.versions[lsp.origin][lsp.seq] = lsp
+        if self.refresh_interval:
+            self._schedule(self.refresh_interval, REFRESH, lsp.origin, payload=lsp.seq)
+        self._schedule(self.max_age, EXPIRE, lsp.origin, payload=lsp.seq)
+
+    def _queue(self, router, neighbor, lsp):
+        queue = self.pending[router].get(neighbor)
+        if queue is None:
+            self.pending[router][neighbor] = {lsp.origin: lsp}
+        else:
+            queue[lsp.origin] = lsp
+        if not self.timer_set[router]:
+            self.timer_set[router] = 1
+            self._schedule(self.lsp_interval, SEND_DUE, router)
+
+    def _flood(self, router, lsp, skip=None):
+        """Queues `lsp` for every neighbour of `router` but `skip`."""
+        pending = self.pending[router]
+        origin = lsp.origin
+        for neighbor in self.neighbors[router]:
+            if neighbor != skip:
+                queue = pending.get(neighbor)
+                if queue is None:
+                    pending[neighbor] = {origin: lsp}
+                else:
+                    queue[origin] = lsp
+        if pending and not self.timer_set[router]:
+            self.timer_set[router] = 1
+            self._schedule(self.lsp_interval, SEND_DUE, router)
+
+    def originate(self, router):
+        """Router index `router` issues a new LSP describing its current links."""
+        seq = abs(self.current[router]) + 1
+        lsp = Lsp(router, seq, tuple(self.neighbors[router].items()), self.now, self.max_age)
+        self._install(lsp)
+        self.current[router] = seq
+        self.held[router][router] = seq
+        self.stale += self.alive - 1 - self.stale_from[router]
+        self.stale_from[router] = self.alive - 1
+        self.consistent_at = None if self.stale else self.now
+        self.last_change = self.now
+        self._flood(router, lsp)
+
+    def _send_queued(self, router):
+        self.timer_set[router] = 0
+        pending, self.pending[router] = self.pending[router], {}
+        for neighbor, queue in pending.items():
+            if neighbor in self.neighbors[router]:
+                self.lsps_sent[router] += len(queue)
+                self._schedule(self.link_delay, LSPS, neighbor, router, tuple(queue.values()))
+
+    def _receive(self, router, sender, lsps):
+        if sender not in self.neighbors[router]:
+            return      # the adjacency went down while the LSPs were in flight
+        held, current = self.held[router], self.current
+        for lsp in lsps:
+            origin, seq = lsp.origin, lsp.seq
+            have = held[origin]
+            if seq > abs(have):
+                # A newer LSP: install it and pass it on, unless it is too old
+                value = seq if lsp.expires() > self.now else -seq
+                held[origin] = value
+                self.last_change = self.now
+                if value == current[origin]:
+                    self.stale_from[origin] -= 1
+                    self.stale -= 1
+                    if not self.stale:
+                        self.consistent_at = self.now
+                if value > 0:
+                    self._flood(router, lsp, skip=sender)
+            elif seq == abs(have):
+                self.duplicates[router] += 1
+            elif have > 0:
+                # The sender is out of date: send it our newer copy
+                self._queue(router, sender, self.versions[origin][have])
+
+    def _send_csnp(self, router, neighbor):
+        summary = array('i', self.held[router])
+        entries = len(summary) - summary.count(0)
+        self.csnps_sent[router] += max(1, -(-entries // SNP_ENTRIES))
+        self._schedule(self.link_delay, CSNP, neighbor, router, summary)
+
+    def _receive_csnp(self, router, sender, summary):
+        if sender not in self.neighbors[router]:
+            return
+        held = self.held[router]
+        wanted = []
+        for origin, theirs in enumerate(summary):
+            have = held[origin]
+            if theirs == have:
+                continue
+            if abs(theirs) > abs(have):
+                if theirs > 0:
+                    wanted.append(origin)
+            elif abs(have) > abs(theirs) and have > 0:
+                self._queue(router, sender, self.versions[origin][have])
+        if wanted:
+            self.psnps_sent[router] += -(-len(wanted) // SNP_ENTRIES)
+            self._schedule(self.link_delay, PSNP, sender, router, wanted)
+
+    def _receive_psnp(self, router, sender, wanted):
+        if sender not in self.neighbors[router]:
+            return
+        held = self.held[router]
+        for origin in wanted:
+            if held[origin] > 0:
+                self._queue(router, sender, self.versions[origin][held[origin]])
+
+    def _expire(self, origin, seq):
+        # Every copy of the LSP ages out at the same time (its age is shared)
+        if self.current[origin] != seq:
+            return
+        self.current[origin] = -seq
+        for held in self.held:
+            if held[origin] == seq:
+                held[origin] = -seq
+        self.last_change = self.now
+
+    def set_link(self, u, v, cost):
+        """
+        Changes the link u-v: a new cost, or None to take it down. Both ends
+        re-originate their LSP; a link that comes up starts with a CSNP
+        exchange so the two ends catch up on each other's LSDB.
+        """
+        u, v = self.index[u], self.index[v]
+        came_up = cost is not None and v not in self.neighbors[u]
+        if cost is None:
+            self.neighbors[u].pop(v, None)
+            self.neighbors[v].pop(u, None)
+        else:
+            self.neighbors[u][v] = cost
+            self.neighbors[v][u] = cost
+        for end in (u, v):
+            if not self.failed[end]:
+                self.originate(end)
+        if came_up:
+            self._send_csnp(u, v)
+            self._send_csnp(v, u)
+
+    def fail_router(self, name):
+        """
+        Router `name` fails for good: its links go down and it stops
+        refreshing its LSP, which the other routers keep until MaxAge.
+        """
+        router = self.index[name]
+        self.failed[router] = 1
+        self.alive -= 1
+        # From now on the failed router's LSDB does not count
+        held, current = self.held[router], self.current
+        for origin in range(len(self.names)):
+            if held[origin] != current[origin]:
+                self.stale_from[origin] -= 1
+                self.stale -= 1
+        if not self.stale:
+            self.consistent_at = self.now
+        for neighbor in list(self.neighbors[router]):
+            self.set_link(name, self.names[neighbor], None)
+
+    def run(self, until=None):
+        """
+        Processes events until no flooding is in flight (or, with `until`,
+        every event up to that time, timers included); returns the time of
+        the last LSDB change.
+        """
+        events = self.events
+        while events and (self.in_flight or until is not None):
+            if until is not None and events[0][0] > until:
+                break
+            self.now, _, kind, router, sender, payload = heapq.heappop(events)
+            if kind <= PSNP:
+                self.in_flight -= 1
+            if kind == SEND_DUE:
+                self._send_queued(router)
+            elif kind == LSPS:
+                self._receive(router, sender, payload)
+            elif kind == CSNP:
+                self._receive_csnp(router, sender, payload)
+            elif kind == PSNP:
+                self._receive_psnp(router, sender, payload)
+            elif kind == REFRESH:
+                if not self.failed[router] and self.current[router] == payload:
+                    self.originate(router)
+            else:
+                self._expire(router, payload)
+        return self.last_change
+
+    def consistent(self):
+        """True if every live router holds the newest version of every LSP."""
+        return not self.stale
+
+    def totals(self):
+        """Messages sent so far by all routers, and the duplicate LSPs dropped."""
+        return {'lsps': sum(self.lsps_sent), 'csnps': sum(self.csnps_sent),
+                'psnps': sum(self.psnps_sent), 'duplicates': sum(self.duplicates)}
+
+    def lsdb(self, name):
+        """The live LSPs in router `name`'s LSDB."""
+        versions = self.versions
+        return [versions[origin][seq] for origin, seq in enumerate(self.held[self.index[name]])
+                if seq > 0]
+
+    def lsdb_topology(self, name):
+        """
+        Router `name`'s LSDB as a Topology to run SPF on. A link is used only
+        if the LSPs of both its ends report it (the two-way check).
+        """
+        lsps = self.lsdb(name)
+        reported = set()
+        for lsp in lsps:
+            for neighbor, _ in lsp.links:
+                reported.add((lsp.origin, neighbor))
+
+        names = self.names
+        topology = Topology(nodes=[names[lsp.origin] for lsp in lsps], name=f"lsdb-{name}")
+        for lsp in lsps:
+            for neighbor, cost in lsp.links:
+                if lsp.origin < neighbor and (neighbor, lsp.origin) in reported:
+                    topology.add_link(names[lsp.origin], names[neighbor], cost)
+        return topology
+
+    def lsdb_partitions(self):
+        """
+        The distinct LSDBs held by the routers, as (routers, topology)
+        pairs: `routers` all hold the LSDB `topology` (see lsdb_topology()).
+        Once the flooding is over, that is one LSDB per partition of the
+        network, so SPF can run on one compiled copy per partition.
+        """
+        names, index, held = self.names, self.index, self.held
+        partitions = []
+        grouped = set()
+        for router in range(len(names)):
+            if router in grouped:
+                continue
+            topology = self.lsdb_topology(names[router])
+            topology.add_node(names[router])
+            # The other routers of the partition are among this LSDB's origins
+            others = (index[name] for name in topology.nodes)
+            routers = [router] + [other for other in others if other != router
+                                  and other not in grouped and held[other] == held[router]]
+            grouped.update(routers)
+            partitions.append(([names[i] for i in routers], topology))
+        return partitions
+
+
+def print_flooding(sim, start, before, label):
+    """
+    Prints the messages sent since the `before` totals and how long after
+    `start` the LSDBs became consistent. Returns the new totals.
+    """
+    after = sim.totals()
+    sent = {key: after[key] - before.get(key, 0) for key in after}
+    if sim.consistent():
+        timing = f"LSDBs consistent after {sim.consistent_at - start:.3f} s"
+    else:
+        timing = "LSDBs NOT consistent"
+    print(f"{label}: {sent['lsps']} LSPs, {sent['csnps']} CSNPs, {sent['psnps']} PSNPs sent, "
+          f"{sent['duplicates']} duplicates dropped; {timing}")
+    return after
+
+
+if __name__ == "__main__":
+    print("--- LSP flooding ---\n")
+
+    edges = [
+        ('A', 'B', 5), ('A', 'C', 4), ('A', 'D', 2),
+        ('B', 'C', 3), ('B', 'F', 5),
+        ('C', 'D', 2), ('C', 'E', 4),
+        ('D', 'E', 7),
+        ('E', 'F', 6)
+    ]
+    sim = FloodingSimulator(edges)
+    sim.run()
+    totals = print_flooding(sim, 0.0, {}, "Initial flood")
+
+    for u, v, cost, label in [('C', 'D', None, "Link C-D down"), ('C', 'D', 2, "Link C-D up")]:
+        start = sim.now
+        sim.set_link(u, v, cost)
+        sim.run()
+        totals = print_flooding(sim, start, totals, label)
+
+    start = sim.now
+    sim.fail_router('F')
+    sim.run()
+    totals = print_flooding(sim, start, totals, "Router F fails")
+    print(f"  Router A's LSDB holds {len(sim.lsdb('A'))} LSPs; F's ages out after MaxAge...")
+    sim.run(until=start + MAX_AGE + 1)
+    totals = print_flooding(sim, start, totals, f"  After {MAX_AGE:.0f} s (with refreshes)")
+    print(f"  Router A's LSDB holds {len(sim.lsdb('A'))} LSPs\n")
+
+    # Scale: a cold start floods every LSP over every link, O(routers * links);
+    # a single change in a converged network only floods one LSP per end
+    routers = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    network = generate('grid', min(routers, 1000), seed=1)
+    sim = FloodingSimulator(network.links, network.nodes)
+    sim.run()
+    print_flooding(sim, 0.0, {}, f"Cold start, {len(network)}-router grid")
+
+    network = generate('grid', routers, seed=1)
+    sim = FloodingSimulator(network.links, network.nodes, synchronized=True)
+    before = sim.totals()
+    u, v, cost = network.links[0]
+    sim.set_link(u, v, cost + 1)
+    sim.run()
+    print_flooding(sim, 0.0, before, f"One link cost change, {len(network)}-router grid")
\ No newline at end of file
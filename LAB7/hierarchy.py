@@ -0,0 +1,341 @@
+import math
+import random
+import sys
+import time
+from collections import deque
+
+from spf import INF, compile_lsdb, spf, dijkstra
+from topology import Topology, generate
+
+PROTOCOLS = ('ospf', 'isis')
+
+
+def assign_areas(topology, count):
+    """
+    Splits `topology` into about `count` areas, numbered from 1 (area 0 is
+    the backbone): a square grid of blocks if the topology has node
+    positions, otherwise regions grown breadth-first from `count` routers
+    spread through the node list. Returns {router: area}.
+    """
+    nodes = topology.nodes
+    count = max(1, min(count, len(nodes)))
+    if topology.pos:
+        side = max(1, round(math.sqrt(count)))
+        xs = [topology.pos[node][0] for node in nodes]
+        ys = [topology.pos[node][1] for node in nodes]
+        width = (max(xs) - min(xs)) or 1
+        height = (max(ys) - min(ys)) or 1
+        areas = {}
+        for node in nodes:
+            x, y = topology.pos[node]
+            col = min(side - 1, int((x - min(xs)) / width * side))
+            row = min(side - 1, int((y - min(ys)) / height * side))
+            areas[node] = row * side + col + 1
+        return areas
+
+    adjacency = {node: [] for node in nodes}
+    for u, v, _ in topology.links:
+        adjacency[u].append(v)
+        adjacency[v].append(u)
+    areas = {}
+    queue = deque()
+    for k in range(count):
+        seed = nodes[k * len(nodes) // count]
+        areas[seed] = k + 1
+        queue.append(seed)
+    while queue:
+        node = queue.popleft()
+        for neighbor in adjacency[node]:
+            if neighbor not in areas:
+                areas[neighbor] = areas[node]
+                queue.append(neighbor)
+    return areas
+
+
+def _entry(cost, hops):
+    # A routing table entry, in the format of the simulators' tables
+    return {'next_hop': ','.join(sorted(str(hop) for hop in hops)) if hops else '-', 'cost': cost}
+
+
+class Hierarchy:
+    """
+    A topology split into areas for hierarchical link-state routing.
+
+    `areas` is a {router: area} dict, or a number of areas for
+    assign_areas(). Each area is a link-state domain of its own: its
+    routers and the links between them. Routers with a link into another
+    area are border routers (OSPF ABRs, IS-IS L1L2 routers); the backbone
+    (OSPF area 0, IS-IS level 2) is made of the border routers and the
+    links between them, and must be connected. A border router advertises
+    its area into the backbone as one summary (an OSPF area range, an
+    IS-IS summary address) costing as much as its farthest router there.
+
+    Other routers only run SPF over their own area. In OSPF the ABRs
+    inject the cost of every other area's range as summary LSAs, and a
+    router leaves its area by the ABR with the cheapest total; in IS-IS an
+    L1 router just follows a default route to its nearest L1L2 router.
+
+    Routers are numbered as in `full`, the compiled LSDB of the whole
+    topology; local[i] is router i's index in its area's compiled LSDB
+    (area_lsdb[area]) and backbone_local[i] its index in `backbone`.
+    """
+
+    def __init__(self, topology, areas):
+        if not isinstance(areas, dict):
+            areas = assign_areas(topology, areas)
+        self.full = full = compile_lsdb(topology)
+        names = full.names
+        for name in names:
+            if name not in areas:
+                raise ValueError(f"Router {name} is not in any area.")
+        self.area = [areas[name] for name in names]
+        self.members = {}
+        for i, area in enumerate(self.area):
+            self.members.setdefault(area, []).append(i)
+
+        self.border = bytearray(len(names))
+        area_links = {area: [] for area in self.members}
+        for u, v, w in topology.links:
+            ui, vi = full.index[u], full.index[v]
+            if self.area[ui] == self.area[vi]:
+                area_links[self.area[ui]].append((u, v, w))
+            else:
+                self.border[ui] = self.border[vi] = 1
+        self.borders = [i for i in range(len(names)) if self.border[i]]
+        self.borders_of = {area: [i for i in members if self.border[i]]
+                           for area, members in self.members.items()}
+        backbone_links = [(u, v, w) for u, v, w in topology.links
+                          if self.border[full.index[u]] and self.border[full.index[v]]]
+
+        self.area_lsdb = {area: compile_lsdb(Topology(area_links[area], [names[i] for i in members]))
+                          for area, members in self.members.items()}
+        self.backbone = compile_lsdb(Topology(backbone_links, [names[i] for i in self.borders]))
+        self.local = [0] * len(names)
+        for members in self.members.values():
+            for k, i in enumerate(members):
+                self.local[i] = k
+        self.backbone_local = {i: k for k, i in enumerate(self.borders)}
+
+        for area, lsdb in self.area_lsdb.items():
+            if INF in spf(lsdb, 0)[0]:
+                raise ValueError(f"Area {area} is not connected.")
+        if self.borders and INF in spf(self.backbone, 0)[0]:
+            raise ValueError("The backbone is not connected; choose other areas.")
+
+        # What the border routers compute and advertise, on demand
+        self._border_intra = {}
+        self._summaries = None
+        self._backbone_dist = {}
+        self._ranges = {}
+
+    def intra(self, router):
+        """Router index `router`'s SPF over its own area: distances by local index."""
+        return spf(self.area_lsdb[self.area[router]], self.local[router])[0]
+
+    def border_intra(self, border):
+        if border not in self._border_intra:
+            self._border_intra[border] = self.intra(border)
+        return self._border_intra[border]
+
+    def summaries(self):
+        """The cost of every border router's area summary: that of its farthest router."""
+        if self._summaries is None:
+            self._summaries = {b: max(self.border_intra(b)) for b in self.borders}
+        return self._summaries
+
+    def backbone_distances(self, border):
+        if border not in self._backbone_dist:
+            self._backbone_dist[border] = spf(self.backbone, self.backbone_local[border])[0]
+        return self._backbone_dist[border]
+
+    def _range_costs(self, border, backbone_dist):
+        own = self.area[border]
+        summaries = self.summaries()
+        best = {}
+        for k, b in enumerate(self.borders):
+            area = self.area[b]
+            if area != own:
+                cost = backbone_dist[k] + summaries[b]
+                if area not in best or cost < best[area][0]:
+                    best[area] = (cost, b)
+        return best
+
+    def range_costs(self, border):
+        """
+        {area: (cost, entry)} for every other area: the cost of reaching its
+        range over the backbone from `border`, and the border router by
+        which the route enters it.
+        """
+        if border not in self._ranges:
+            self._ranges[border] = self._range_costs(border, self.backbone_distances(border))
+        return self._ranges[border]
+
+    def exits(self, router, intra, protocol):
+        """{area: border router by which `router` leaves its own area towards it}."""
+        own = self.area[router]
+        if self.border[router]:
+            return {area: router for area in self.members if area != own}
+        borders = self.borders_of[own]
+        if not borders:
+            return {}
+        local = self.local
+        if protocol == 'isis':
+            nearest = min(borders, key=lambda b: intra[local[b]])
+            return {area: nearest for area in self.members if area != own}
+
+        exits = {}
+        for area in self.members:
+            if area != own:
+                exits[area] = min(borders, key=lambda b: intra[local[b]] + self.range_costs(b)[area][0])
+        return exits
+
+    def time_router(self, router, protocol):
+        """
+        Seconds `router` spends computing its routes: SPF over its area,
+        then the inter-area routes (for border routers, also SPF over the
+        backbone and the costs of the area ranges). The summaries the other
+        border routers advertise are computed beforehand.
+        """
+        own = self.area[router]
+        if protocol == 'ospf':
+            for b in self.borders_of[own]:
+                self.range_costs(b)
+        else:
+            self.summaries()
+
+        start = time.perf_counter()
+        intra = self.intra(router)
+        if self.border[router]:
+            self._range_costs(router, spf(self.backbone, self.backbone_local[router])[0])
+        else:
+            self.exits(router, intra, protocol)
+        return time.perf_counter() - start
+
+    def route_costs(self, router, protocol):
+        """The cost of the path a packet from `router` actually takes to every router."""
+        intra = self.intra(router)
+        costs = [INF] * len(self.area)
+        for k, i in enumerate(self.members[self.area[router]]):
+            costs[i] = intra[k]
+        for area, exit in self.exits(router, intra, protocol).items():
+            _, entry = self.range_costs(exit)[area]
+            base = intra[self.local[exit]] + self.backbone_distances(exit)[self.backbone_local[entry]]
+            entry_intra = self.border_intra(entry)
+            for k, i in enumerate(self.members[area]):
+                costs[i] = base + entry_intra[k]
+        return costs
+
+    def lsdb_size(self, router, protocol):
+        """
+        The records in `router`'s LSDB: the router LSAs / LSPs of its area,
+        the summary LSAs its ABRs inject (OSPF) and, for border routers, the
+        backbone's router LSAs / L2 LSPs and area summaries.
+        """
+        own = self.area[router]
+        size = len(self.members[own])
+        if protocol == 'ospf':
+            size += len(self.borders_of[own]) * (len(self.members) - 1)
+        if self.border[router]:
+            size += 2 * len(self.borders)
+        return size
+
+    def routing_table(self, name, protocol):
+        """
+        Router `name`'s routing table: a route per router of its area, and
+        a route per other area ("area N") or, for IS-IS L1 routers, a
+        default route to the nearest L1L2 router.
+        """
+        router = self.full.index[name]
+        own = self.area[router]
+        distances, hops, _ = dijkstra(self.area_lsdb[own], name)
+        table = {dest: _entry(cost, hops[dest]) for dest, cost in distances.items()}
+        names = self.full.names
+
+        if self.border[router]:
+            _, backbone_hops, _ = dijkstra(self.backbone, name)
+            for area, (cost, entry) in sorted(self.range_costs(router).items()):
+                table[f"area {area}"] = _entry(cost, backbone_hops[names[entry]])
+        elif self.borders_of[own]:
+            intra = [distances[names[i]] for i in self.members[own]]
+            exits = self.exits(router, intra, protocol)
+            if protocol == 'isis':
+                nearest = names[next(iter(exits.values()))]
+                table['default'] = _entry(distances[nearest], hops[nearest])
+            else:
+                for area, exit in sorted(exits.items()):
+                    cost = distances[names[exit]] + self.range_costs(exit)[area][0]
+                    table[f"area {area}"] = _entry(cost, hops[names[exit]])
+        return table
+
+    def routing_tables(self, protocol):
+        return {name: self.routing_table(name, protocol) for name in self.full.names}
+
+
+def compare(topology, areas, samples=20, seed=1):
+    """
+    Flat versus hierarchical routing on `topology` split into `areas`.
+
+    For 'flat', 'ospf' (multi-area) and 'isis' (L1/L2), returns the mean
+    time one router spends computing its routes, the mean and largest
+    LSDB (in records) and the stretch: the mean ratio of the cost of the
+    paths packets actually take to the shortest ones. Times and stretch
+    are measured on `samples` random routers. Returns (hierarchy, results).
+    """
+    hierarchy = Hierarchy(topology, areas)
+    full = hierarchy.full
+    n = len(full)
+    routers = random.Random(seed).sample(range(n), min(samples, n))
+
+    shortest = {}
+    elapsed = 0.0
+    for router in routers:
+        start = time.perf_counter()
+        shortest[router] = spf(full, router)[0]
+        elapsed += time.perf_counter() - start
+    results = {'flat': {'spf_ms': elapsed / len(routers) * 1000,
+                        'lsdb_mean': n, 'lsdb_max': n, 'stretch': 1.0}}
+
+    for protocol in PROTOCOLS:
+        elapsed = ratio = 0.0
+        pairs = 0
+        for router in routers:
+            elapsed += hierarchy.time_router(router, protocol)
+            costs = hierarchy.route_costs(router, protocol)
+            for dest, best in enumerate(shortest[router]):
+                if best > 0:
+                    ratio += costs[dest] / best
+                    pairs += 1
+        sizes = [hierarchy.lsdb_size(router, protocol) for router in range(n)]
+        results[protocol] = {'spf_ms': elapsed / len(routers) * 1000,
+                             'lsdb_mean': sum(sizes) / n, 'lsdb_max': max(sizes),
+                             'stretch': ratio / pairs if pairs else 1.0}
+    return hierarchy, results
+
+
+def report(sizes, area_size=400, generator='grid', samples=20, seed=1):
+    """
+    Prints flat versus hierarchical routing (see compare()) on generated
+    topologies of the given sizes, split into areas of about `area_size`
+    routers. Returns {size: results}.
+    """
+    labels = {'flat': "flat", 'ospf': "OSPF areas", 'isis': "IS-IS L1/L2"}
+    reports = {}
+    for n in sizes:
+        topology = generate(generator, n, seed=seed)
+        hierarchy, results = compare(topology, max(4, round(len(topology) / area_size)),
+                                     samples, seed)
+        reports[n] = results
+        print(f"--- {topology.name}: {len(topology)} routers, {len(hierarchy.members)} areas, "
+              f"{len(hierarchy.borders)} border routers ---")
+        print(f"  {'Mode':<12} | {'SPF/router (ms)':>15} | {'LSDB mean':>9} | {'LSDB max':>8} | {'Stretch':>7}")
+        print("  " + "-" * 63)
+        for mode, row in results.items():
+            print(f"  {labels[mode]:<12} | {row['spf_ms']:>15.3f} | {row['lsdb_mean']:>9.0f} | "
+                  f"{row['lsdb_max']:>8} | {row['stretch']:>7.3f}")
+        print()
+    return reports
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 400, 1600, 6400, 10000]
+    report(sizes)
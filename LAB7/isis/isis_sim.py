@@ -1,117 +1,124 @@
-import networkx as nx
-import matplotlib
-matplotlib.use('Agg') # Use a non-GUI backend
-import matplotlib.pyplot as plt
-import heapq
+import os
+import sys
 
-def draw_graph_with_costs(graph, pos, title):
-    """Helper function to draw the network graph with link costs."""
-    plt.figure(figsize=(12, 8))
-    labels = nx.get_edge_attributes(graph, 'weight')
-    nx.draw(graph, pos, with_labels=True, node_color='lightcoral', node_size=2500, font_size=16, font_weight='bold')
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=labels, font_color='blue')
-    plt.title(title)
-    
-    filename = "isis_topology.png" 
-    plt.savefig(filename) 
-    print(f"\n*** Graph saved to {filename} ***") 
-    plt.close() 
-
-def dijkstra(graph, start_node):
-    """Implements Dijkstra's algorithm to find shortest paths."""
-    
-    pq = [(0, start_node, None)]
-    distances = {node: float('inf') for node in graph.nodes}
-    distances[start_node] = 0
-    predecessors = {node: None for node in graph.nodes}
-    visited = set()
-
-    while pq:
-        cost, node, prev = heapq.heappop(pq)
-        
-        if node in visited:
-            continue
-        visited.add(node)
+# The SPF engine and the topology/rendering helpers are shared with the
+# other LAB7 simulators (LAB7/spf.py, topology.py, routing_table.py,
+# flooding.py, hierarchy.py, render.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+try:
+    from spf import compile_lsdb, dijkstra
+    from topology import Topology
+    from routing_table import build_routing_table, print_routing_table, compute_all_routing_tables
+    from flooding import FloodingSimulator, print_flooding
+    from hierarchy import Hierarchy
+    import render
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find 'spf.py', 'topology.py', 'routing_table.py', 'flooding.py', 'hierarchy.py' or 'render.py' in the LAB7 directory.")
+    print("-------------\n")
+    exit()
 
-        for neighbor in graph.neighbors(node):
-            if neighbor not in visited:
-                edge_data = graph.get_edge_data(node, neighbor)
-                new_cost = cost + edge_data['weight']
-                
-                if new_cost < distances[neighbor]:
-                    distances[neighbor] = new_cost
-                    predecessors[neighbor] = node
-                    heapq.heappush(pq, (new_cost, neighbor, node))
-                    
-    return distances, predecessors
-
-def build_routing_table(start_node, predecessors):
-    """Builds a routing table from Dijkstra's predecessors map."""
-    table = {}
-    for dest in predecessors:
-        if dest == start_node:
-            table[dest] = {'next_hop': '-', 'cost': 0}
-            continue
-            
-        if predecessors[dest] is None:
-            table[dest] = {'next_hop': '-', 'cost': float('inf')}
-            continue
-
-        curr = dest
-        while predecessors[curr] is not None and predecessors[curr] != start_node:
-            curr = predecessors[curr]
-        
-        table[dest] = {'next_hop': curr, 'cost': 0}
-            
-    return table
+def draw_graph_with_costs(network, pos, title):
+    """Helper function to draw the network graph with link costs."""
+    render.draw_topology(network, pos, "isis_topology.png", title,
+                         node_color='lightcoral', label_color='blue')
 
-def simulate_is_is():
-    """Simulates the IS-IS protocol (using Dijkstra)."""
+def simulate_is_is(workers=None, topology=None, render_graphs=None, areas=None):
+    """
+    Simulates the IS-IS protocol (using Dijkstra) and returns the routing
+    tables. With `workers` set, all routers' SPFs run in parallel processes.
+    `topology` (a LAB7 topology.Topology) replaces the lab network.
+    `render_graphs` draws the topology after the computation; it defaults
+    to on for the lab network only. `areas` (a {router: area} dict or a
+    number of areas, see hierarchy.Hierarchy) runs IS-IS with L1 areas and
+    an L2 backbone instead, with no drawing.
+    """
     
     print("--- Simulating IS-IS (Link-State / Dijkstra) ---")
     
-    G = nx.Graph()
-    edges = [
-        ('R1', 'R2', 10), ('R1', 'R3', 5),
-        ('R2', 'R3', 2), ('R2', 'R4', 1),
-        ('R3', 'R2', 2), ('R3', 'R4', 9), ('R3', 'R5', 2),
-        ('R4', 'R5', 4),
-        ('R5', 'R1', 7)
-    ]
-    for u, v, w in edges:
-        G.add_edge(u, v, weight=w)
+    if render_graphs is None:
+        render_graphs = topology is None
+    if topology is None:
+        edges = [
+            ('R1', 'R2', 10), ('R1', 'R3', 5),
+            ('R2', 'R3', 2), ('R2', 'R4', 1),
+            ('R3', 'R2', 2), ('R3', 'R4', 9), ('R3', 'R5', 2),
+            ('R4', 'R5', 4),
+            ('R5', 'R1', 7)
+        ]
+        network = Topology(edges, name="isis-lab")
+    else:
+        edges = topology.links
+        network = topology
 
-    print(f"Network Nodes: {list(G.nodes)}")
+    print(f"Network Nodes: {list(network.nodes)}")
     print(f"Network Links (with metrics): {edges}\n")
     
-    link_state_database = G
-    print("Step 1: Link-State PDU (LSP) flooding simulated.")
-    print("All routers now have a complete map (LSDB) of the network.\n")
-    
-    pos = nx.spring_layout(G)
-    draw_graph_with_costs(G, pos, "IS-IS Network Topology (Link Metrics)")
+    if areas is not None:
+        # IS-IS levels: L1 LSPs flood within each area, L2 LSPs between the
+        # L1L2 routers; L1 routers send other areas' traffic to the nearest one
+        hierarchy = Hierarchy(network, areas)
+        names = hierarchy.full.names
+        print("Step 1: L1 LSP flooding within each area, L2 flooding between L1L2 routers.")
+        for area, members in sorted(hierarchy.members.items()):
+            print(f"  Area {area}: {[names[i] for i in members]}, "
+                  f"L1L2: {[names[i] for i in hierarchy.borders_of[area]]}")
+        print()
+        print("Step 2: Each router runs SPF over its own area (L1L2 routers also over level 2).\n")
+        all_routing_tables = hierarchy.routing_tables('isis')
+        for router_name, routing_table in all_routing_tables.items():
+            print_routing_table(router_name, routing_table)
+        return all_routing_tables
+
+    print("Step 1: Link-State PDU (LSP) flooding.")
+    flooding = FloodingSimulator(network.links, network.nodes)
+    flooding.run()
+    print_flooding(flooding, 0.0, {}, "LSP flooding")
+    # Every router runs SPF on its own LSDB; the routers of a partition hold
+    # the same one once the flooding is over, so one copy per partition is
+    # compiled for all of its routers
+    partitions = flooding.lsdb_partitions()
+    if flooding.consistent():
+        link_state_database = partitions[0][1]
+        print(f"All routers now have the same map (LSDB) of the network: "
+              f"{len(link_state_database)} LSPs, {len(link_state_database.links)} links.\n")
+    else:
+        print(f"Warning: the routers hold {len(partitions)} different LSDBs "
+              f"(is the network partitioned?).\n")
     
     all_routing_tables = {}
+
+    # Compile each LSDB into integer-indexed adjacency arrays once; every
+    # router's SPF run then works on those arrays instead of the graph.
+    compiled_lsdbs = {}
+    for routers, link_state_database in partitions:
+        compiled_lsdb = compile_lsdb(link_state_database)
+        compiled_lsdbs.update(dict.fromkeys(routers, compiled_lsdb))
     
     print("Step 2: Each router runs Dijkstra's algorithm (IS-IS uses SPF).\n")
     
-    for router_name in G.nodes:
-        print(f"--- Router {router_name} Calculations ---")
-        
-        distances, predecessors = dijkstra(link_state_database, router_name)
-        
-        routing_table = build_routing_table(router_name, predecessors)
-        for dest in routing_table:
-            routing_table[dest]['cost'] = distances[dest]
-            
-        all_routing_tables[router_name] = routing_table
-        
-        print(f"Routing Table for Router {router_name}:")
-        print(f"  {'Destination':<12} | {'Next Hop':<10} | {'Total Cost':<10}")
-        print("  " + "-"*40)
-        for dest, info in sorted(routing_table.items()):
-            print(f"  {dest:<12} | {info['next_hop']:<10} | {info['cost']:<10}")
-        print()
+    if workers is not None:
+        for routers, _ in partitions:
+            partition_tables = compute_all_routing_tables(compiled_lsdbs[routers[0]], workers)
+            for router_name in routers:
+                all_routing_tables[router_name] = partition_tables[router_name]
+
+    for router_name in network.nodes:
+        if workers is None:
+            print(f"--- Router {router_name} Calculations ---")
+
+            distances, next_hops, _ = dijkstra(compiled_lsdbs[router_name], router_name)
+
+            routing_table = build_routing_table(distances, next_hops)
+
+            all_routing_tables[router_name] = routing_table
+        print_routing_table(router_name, all_routing_tables[router_name])
+
+    # Rendering is a separate, optional stage after the computation
+    if render_graphs:
+        draw_graph_with_costs(network, render.layout(network), "IS-IS Network Topology (Link Metrics)")
+
+    return all_routing_tables
 
 if __name__ == "__main__":
     simulate_is_is()
\ No newline at end of file
@@ -1,152 +1,203 @@
-import networkx as nx
-import matplotlib
-matplotlib.use('Agg') # Use a non-GUI backend
-import matplotlib.pyplot as plt
-import heapq
+import os
+import sys
 
-def draw_graph_with_costs(graph, pos, title):
+# The SPF engine and the topology/rendering helpers are shared with the
+# other LAB7 simulators (LAB7/spf.py, topology.py, routing_table.py,
+# flooding.py, hierarchy.py, render.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+try:
+    from spf import compile_lsdb, dijkstra, set_link_cost, IncrementalSPF
+    from topology import Topology
+    from routing_table import build_routing_table, print_routing_table, compute_all_routing_tables
+    from flooding import FloodingSimulator, print_flooding
+    from hierarchy import Hierarchy
+    import render
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find 'spf.py', 'topology.py', 'routing_table.py', 'flooding.py', 'hierarchy.py' or 'render.py' in the LAB7 directory.")
+    print("-------------\n")
+    exit()
+
+def draw_graph_with_costs(network, pos, title):
     """Helper function to draw the network graph with link costs."""
-    plt.figure(figsize=(12, 8))
-    labels = nx.get_edge_attributes(graph, 'weight')
-    nx.draw(graph, pos, with_labels=True, node_color='skyblue', node_size=2500, font_size=16, font_weight='bold')
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=labels, font_color='darkred')
-    plt.title(title)
-    
-    filename = "ospf_topology.png" 
-    plt.savefig(filename) 
-    print(f"\n*** Graph saved to {filename} ***") 
-    plt.close() 
+    render.draw_topology(network, pos, "ospf_topology.png", title,
+                         node_color='skyblue', label_color='darkred')
 
-def draw_spt(graph, spt_edges, pos, router_name, title):
+def draw_spt(network, spt_edges, pos, router_name, title):
     """Helper function to draw a specific router's Shortest Path Tree."""
-    plt.figure(figsize=(12, 8))
-    
-    nx.draw(graph, pos, with_labels=True, node_color='gray', node_size=2000, font_size=14, alpha=0.3)
-    labels = nx.get_edge_attributes(graph, 'weight')
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=labels, font_color='gray', alpha=0.3)
-    
-    spt_nodes = set([router_name])
-    for u, v in spt_edges:
-        spt_nodes.add(u)
-        spt_nodes.add(v)
-        
-    nx.draw_networkx_nodes(graph, pos, nodelist=spt_nodes, node_color='skyblue', node_size=2500)
-    nx.draw_networkx_labels(graph, pos, font_size=16, font_weight='bold')
-    nx.draw_networkx_edges(graph, pos, edgelist=spt_edges, edge_color='blue', width=2.5)
-    
-    nx.draw_networkx_nodes(graph, pos, nodelist=[router_name], node_color='tomato', node_size=3000)
-    
-    plt.title(title)
-    
-    filename = f"ospf_spt_{router_name}.png" 
-    plt.savefig(filename) 
-    print(f"*** SPT graph saved to {filename} ***") 
-    plt.close() 
+    render.draw_spt(network, spt_edges, pos, router_name, f"ospf_spt_{router_name}.png", title)
 
-def dijkstra(graph, start_node):
-    """Implements Dijkstra's algorithm to find shortest paths."""
-    
-    pq = [(0, start_node, None)]
-    distances = {node: float('inf') for node in graph.nodes}
-    distances[start_node] = 0
-    predecessors = {node: None for node in graph.nodes}
-    spt_edges = []
-    visited = set()
-
-    while pq:
-        cost, node, prev = heapq.heappop(pq)
-        
-        if node in visited:
-            continue
-            
-        visited.add(node)
-        
-        if prev is not None:
-            spt_edges.append((prev, node))
-
-        for neighbor in graph.neighbors(node):
-            if neighbor not in visited:
-                edge_data = graph.get_edge_data(node, neighbor)
-                new_cost = cost + edge_data['weight']
-                
-                if new_cost < distances[neighbor]:
-                    distances[neighbor] = new_cost
-                    predecessors[neighbor] = node
-                    heapq.heappush(pq, (new_cost, neighbor, node))
-                    
-    return distances, predecessors, spt_edges
-
-def build_routing_table(start_node, predecessors):
-    """Builds a routing table from Dijkstra's predecessors map."""
-    table = {}
-    for dest in predecessors:
-        if dest == start_node:
-            table[dest] = {'next_hop': '-', 'cost': 0}
-            continue
-            
-        if predecessors[dest] is None:
-            table[dest] = {'next_hop': '-', 'cost': float('inf')}
-            continue
+def apply_link_events(network, compiled_lsdbs, link_events, flooding=None):
+    """
+    Applies link events to the LSDBs and updates every router's SPT
+    incrementally (iSPF) instead of re-running Dijkstra from scratch.
 
-        curr = dest
-        while predecessors[curr] is not None and predecessors[curr] != start_node:
-            curr = predecessors[curr]
-        
-        table[dest] = {'next_hop': curr, 'cost': 0} 
-            
-    return table
+    `compiled_lsdbs` maps each router to its compiled LSDB (one per
+    partition of the network). Each event is (u, v, cost): a new cost for
+    the link u-v, or None to take it down. With `flooding` (a
+    FloodingSimulator), the routers at both ends flood their new LSAs
+    first. Returns the routing tables after the last event.
+    """
+    routers = {name: IncrementalSPF(compiled_lsdbs[name], compiled_lsdbs[name].index[name])
+               for name in network.nodes}
+    full_recompute = sum(len(compiled_lsdbs[name]) for name in network.nodes)
+
+    def describe(cost):
+        return 'down' if cost == float('inf') else cost
+
+    print("Step 3: Link events, each router updates its SPT incrementally.\n")
+    for u, v, cost in link_events:
+        new_cost = float('inf') if cost is None else cost
+        compiled_lsdb = compiled_lsdbs[u]
+        index = compiled_lsdb.index
+        old_cost = set_link_cost(compiled_lsdb, index[u], index[v], new_cost)
 
+        # Keep the topology in sync with the compiled copy
+        if cost is None:
+            network.remove_link(u, v)
+        else:
+            network.set_link(u, v, cost)
 
-def simulate_ospf():
-    """Simulates the Open Shortest Path First (OSPF) protocol."""
+        touched = sum(spt.link_changed(index[u], index[v], old_cost, new_cost)
+                      for spt in routers.values() if spt.lsdb is compiled_lsdb)
+        print(f"Event: link {u}-{v} cost {describe(old_cost)} -> {describe(new_cost)}")
+        if flooding is not None:
+            start, before = flooding.now, flooding.totals()
+            flooding.set_link(u, v, cost)
+            flooding.run()
+            print_flooding(flooding, start, before, "  LSA flooding")
+        print(f"  iSPF touched {touched} router entries across {len(routers)} SPTs "
+              f"(full recompute: {full_recompute})")
+    print()
+
+    all_routing_tables = {}
+    for router_name, spt in routers.items():
+        routing_table = build_routing_table(spt.distances(), spt.next_hops())
+        all_routing_tables[router_name] = routing_table
+        print_routing_table(router_name, routing_table)
+    return all_routing_tables
+
+def simulate_ospf(link_events=None, workers=None, topology=None, render_graphs=None, areas=None):
+    """
+    Simulates the Open Shortest Path First (OSPF) protocol.
+
+    `link_events` is an optional list of (u, v, cost) link changes applied
+    after the initial routing tables are built (cost None = link down).
+    With `workers` set, all routers' SPFs run in parallel processes
+    (see compute_all_routing_tables) and no SPT graphs are drawn.
+    `topology` (a LAB7 topology.Topology) replaces the lab network.
+    `render_graphs` draws the topology and every SPT once the routing
+    tables are computed; it defaults to on for the lab network only.
+    `areas` (a {router: area} dict or a number of areas, see
+    hierarchy.Hierarchy) runs multi-area OSPF instead, with no link
+    events or drawings.
+    """
     
     print("--- Simulating OSPF (Dijkstra) ---")
     
-    G = nx.Graph()
-    edges = [
-        ('A', 'B', 5), ('A', 'C', 4), ('A', 'D', 2),
-        ('B', 'C', 3), ('B', 'F', 5),
-        ('C', 'D', 2), ('C', 'E', 4),
-        ('D', 'E', 7),
-        ('E', 'F', 6)
-    ]
-    for u, v, w in edges:
-        G.add_edge(u, v, weight=w)
-
-    print(f"Network Nodes: {list(G.nodes)}")
+    if render_graphs is None:
+        render_graphs = topology is None
+    if topology is None:
+        edges = [
+            ('A', 'B', 5), ('A', 'C', 4), ('A', 'D', 2),
+            ('B', 'C', 3), ('B', 'F', 5),
+            ('C', 'D', 2), ('C', 'E', 4),
+            ('D', 'E', 7),
+            ('E', 'F', 6)
+        ]
+    else:
+        edges = list(topology.links)
+    if topology is None:
+        network = Topology(edges, name="ospf-lab")
+    else:
+        network = Topology(edges, topology.nodes, topology.name, topology.pos)
+
+    print(f"Network Nodes: {list(network.nodes)}")
     print(f"Network Links (with costs): {edges}\n")
     
-    link_state_database = G
-    print("Step 1: Link-State Advertisement (LSA) flooding simulated.")
-    print("All routers now have a complete map (LSDB) of the network.\n")
-    
-    pos = nx.spring_layout(G)
-    draw_graph_with_costs(G, pos, "OSPF Network Topology (Link Costs)")
+    if areas is not None:
+        # Multi-area OSPF: LSAs flood within each area, the ABRs inject
+        # summary LSAs, and every router runs SPF over its own area only
+        hierarchy = Hierarchy(network, areas)
+        names = hierarchy.full.names
+        print("Step 1: LSA flooding within each area; the ABRs inject summary LSAs.")
+        for area, members in sorted(hierarchy.members.items()):
+            print(f"  Area {area}: {[names[i] for i in members]}, "
+                  f"ABRs: {[names[i] for i in hierarchy.borders_of[area]]}")
+        print()
+        print("Step 2: Each router runs Dijkstra's algorithm over its own area.\n")
+        all_routing_tables = hierarchy.routing_tables('ospf')
+        for router_name, routing_table in all_routing_tables.items():
+            print_routing_table(router_name, routing_table)
+        return all_routing_tables
+
+    print("Step 1: Link-State Advertisement (LSA) flooding.")
+    flooding = FloodingSimulator(network.links, network.nodes)
+    flooding.run()
+    print_flooding(flooding, 0.0, {}, "LSA flooding")
+    # Every router runs SPF on its own LSDB; the routers of a partition hold
+    # the same one once the flooding is over, so one copy per partition is
+    # compiled for all of its routers
+    partitions = flooding.lsdb_partitions()
+    if flooding.consistent():
+        link_state_database = partitions[0][1]
+        print(f"All routers now have the same map (LSDB) of the network: "
+              f"{len(link_state_database)} LSAs, {len(link_state_database.links)} links.\n")
+    else:
+        print(f"Warning: the routers hold {len(partitions)} different LSDBs "
+              f"(is the network partitioned?).\n")
     
     all_routing_tables = {}
+    all_spt_edges = {}
+
+    # Compile each LSDB into integer-indexed adjacency arrays once; every
+    # router's SPF run then works on those arrays instead of the graph.
+    compiled_lsdbs = {}
+    for routers, link_state_database in partitions:
+        compiled_lsdb = compile_lsdb(link_state_database)
+        compiled_lsdbs.update(dict.fromkeys(routers, compiled_lsdb))
     
     print("Step 2: Each router runs Dijkstra's algorithm to build its SPT.\n")
-    
-    for router_name in G.nodes:
-        print(f"--- Router {router_name} Calculations ---")
+
+    if workers is not None:
+        for routers, _ in partitions:
+            partition_tables = compute_all_routing_tables(compiled_lsdbs[routers[0]], workers)
+            for router_name in routers:
+                all_routing_tables[router_name] = partition_tables[router_name]
+        all_routing_tables = {name: all_routing_tables[name] for name in network.nodes}
+        for router_name, routing_table in all_routing_tables.items():
+            print_routing_table(router_name, routing_table)
+    else:
+        for router_name in network.nodes:
+            print(f"--- Router {router_name} Calculations ---")
         
-        distances, predecessors, spt_edges = dijkstra(link_state_database, router_name)
+            distances, next_hops, spt_edges = dijkstra(compiled_lsdbs[router_name], router_name)
         
-        routing_table = build_routing_table(router_name, predecessors)
-        for dest in routing_table:
-            routing_table[dest]['cost'] = distances[dest]
+            routing_table = build_routing_table(distances, next_hops)
             
-        all_routing_tables[router_name] = routing_table
+            all_routing_tables[router_name] = routing_table
         
-        print(f"Shortest Path Tree (SPT) for Router {router_name} (Edges): {spt_edges}")
-        print(f"Routing Table for Router {router_name}:")
-        print(f"  {'Destination':<12} | {'Next Hop':<10} | {'Total Cost':<10}")
-        print("  " + "-"*40)
-        for dest, info in sorted(routing_table.items()):
-            print(f"  {dest:<12} | {info['next_hop']:<10} | {info['cost']:<10}")
-        print()
+            all_spt_edges[router_name] = spt_edges
         
-        draw_spt(G, spt_edges, pos, router_name, f"Shortest Path Tree (SPT) for Router {router_name}")
+            print(f"Shortest Path Tree (SPT) for Router {router_name} (Edges): {spt_edges}")
+            print_routing_table(router_name, routing_table)
+
+    # Rendering is a separate, optional stage after the computation
+    if render_graphs:
+        pos = render.layout(network)
+        draw_graph_with_costs(network, pos, "OSPF Network Topology (Link Costs)")
+        for router_name, spt_edges in all_spt_edges.items():
+            draw_spt(network, spt_edges, pos, router_name, f"Shortest Path Tree (SPT) for Router {router_name}")
+
+    if link_events:
+        all_routing_tables = apply_link_events(network, compiled_lsdbs, link_events, flooding)
+
+    return all_routing_tables
 
 if __name__ == "__main__":
-    simulate_ospf()
\ No newline at end of file
+    simulate_ospf(link_events=[
+        ('C', 'D', None),   # link C-D fails
+        ('A', 'B', 1),      # A-B becomes much cheaper
+        ('C', 'D', 2),      # C-D comes back
+    ])
+    simulate_ospf(areas={'A': 1, 'C': 1, 'D': 1, 'B': 2, 'E': 2, 'F': 2})
\ No newline at end of file
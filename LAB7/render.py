@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import tempfile
+
+# Drawing is optional post-processing for the LAB7 simulators: matplotlib
+# and networkx are only imported when something is actually rendered.
+LAYOUT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'lab7_layouts')
+
+_layouts = {}
+
+
+def pyplot():
+    """Imports matplotlib (non-GUI backend) on first use."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def networkx():
+    import networkx as nx
+    return nx
+
+
+def fingerprint(topology):
+    """A digest of a topology's nodes and links, the key of its cached layout."""
+    digest = hashlib.sha1()
+    digest.update(repr(topology.nodes).encode())
+    digest.update(repr(topology.links).encode())
+    return digest.hexdigest()
+
+
+def to_networkx(topology):
+    nx = networkx()
+    graph = nx.Graph()
+    # Routers without links (isolated, or whose links all went down) still get drawn
+    graph.add_nodes_from(topology.nodes)
+    for u, v, w in topology.links:
+        graph.add_edge(u, v, weight=w)
+    return graph
+
+
+def layout(topology, kind='spring', cache_dir=LAYOUT_CACHE_DIR):
+    """
+    Node positions for drawing `topology`: its own `pos` if it has some,
+    otherwise a networkx layout ('spring' or 'circular'). Layouts are cached
+    in memory and in `cache_dir` (None to disable), keyed by the topology's
+    fingerprint, so redrawing the same topology does not recompute them.
+    """
+    if topology.pos:
+        return topology.pos
+    key = f"{fingerprint(topology)}-{kind}"
+    if key in _layouts:
+        return _layouts[key]
+
+    path = os.path.join(cache_dir, key + '.json') if cache_dir else None
+    if path and os.path.exists(path):
+        with open(path) as f:
+            coords = json.load(f)
+        pos = {node: tuple(xy) for node, xy in zip(topology.nodes, coords)}
+    else:
+        nx = networkx()
+        graph = to_networkx(topology)
+        if kind == 'circular':
+            pos = nx.circular_layout(graph)
+        else:
+            pos = nx.spring_layout(graph)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump([[float(c) for c in pos[node]] for node in topology.nodes], f)
+    _layouts[key] = pos
+    return pos
+
+
+def draw_topology(topology, pos, filename, title, node_color='skyblue', edge_labels=None,
+                  label_color='darkred', node_size=2500, font_size=16, figsize=(12, 8)):
+    """
+    Draws the topology and saves it to `filename`. `edge_labels` is a
+    {(u, v): label} dict, or None for the link weights, or False for none.
+    """
+    plt, nx = pyplot(), networkx()
+    graph = to_networkx(topology)
+    plt.figure(figsize=figsize)
+    nx.draw(graph, pos, with_labels=True, node_color=node_color, node_size=node_size,
+            font_size=font_size, font_weight='bold')
+    if edge_labels is not False:
+        if edge_labels is None:
+            edge_labels = nx.get_edge_attributes(graph, 'weight')
+        nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels, font_color=label_color)
+    plt.title(title)
+
+    plt.savefig(filename)
+    print(f"\n*** Graph saved to {filename} ***")
+    plt.close()
+
+
+def draw_spt(topology, spt_edges, pos, router_name, filename, title):
+    """Draws one router's Shortest Path Tree over the greyed-out topology."""
+    plt, nx = pyplot(), networkx()
+    graph = to_networkx(topology)
+    plt.figure(figsize=(12, 8))
+
+    nx.draw(graph, pos, with_labels=True, node_color='gray', node_size=2000, font_size=14, alpha=0.3)
+    labels = nx.get_edge_attributes(graph, 'weight')
+    nx.draw_networkx_edge_labels(graph, pos, edge_labels=labels, font_color='gray', alpha=0.3)
+
+    spt_nodes = set([router_name])
+    for u, v in spt_edges:
+        spt_nodes.add(u)
+        spt_nodes.add(v)
+
+    nx.draw_networkx_nodes(graph, pos, nodelist=spt_nodes, node_color='skyblue', node_size=2500)
+    nx.draw_networkx_labels(graph, pos, font_size=16, font_weight='bold')
+    nx.draw_networkx_edges(graph, pos, edgelist=spt_edges, edge_color='blue', width=2.5)
+
+    nx.draw_networkx_nodes(graph, pos, nodelist=[router_name], node_color='tomato', node_size=3000)
+
+    plt.title(title)
+
+    plt.savefig(filename)
+    print(f"*** SPT graph saved to {filename} ***")
+    plt.close()
\ No newline at end of file
@@ -0,0 +1,152 @@
+import csv
+import random
+import sys
+
+try:
+    from rip_sim import RipSimulator
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find 'rip_sim.py' in the same directory.")
+    print("-------------\n")
+    exit()
+
+CSV_FIELDS = [
+    'scenario', 'seed', 'routers', 'links', 'event', 'time', 'u', 'v',
+    'convergence_time', 'converged', 'messages', 'bytes', 'bytes_per_router_mean',
+    'bytes_per_router_max',
+]
+ROUTER_CSV_FIELDS = ['scenario', 'seed', 'event', 'time', 'router', 'bytes']
+
+def run_scenario(links, events, **sim_options):
+    """
+    Runs RIP on `links` and applies link events at given simulated times.
+
+    `events` is a list of (time, u, v, cost) tuples; cost None fails the
+    link, a number brings it (back) up. The network first converges from
+    scratch; then each event is applied at its time and the network is
+    left to reconverge. Returns one metrics dict per phase ('initial',
+    then one per event): convergence time after the phase started, and the
+    update messages and bytes sent during it, in total and per router
+    ('bytes_by_router' maps each router to the bytes it sent). A phase cut
+    off by the next event while updates were still pending has
+    'converged' False; its convergence time is only the time of its last
+    route change before the cut-off.
+    """
+    sim = RipSimulator(links, **sim_options)
+    phases = [('initial', 0.0, None, None, None)]
+    for time, u, v, cost in sorted(events, key=lambda event: event[0]):
+        phases.append(('down' if cost is None else 'up', time, u, v, cost))
+
+    results = []
+    messages_before, bytes_before = 0, [0] * len(sim.names)
+    for k, (name, start, u, v, cost) in enumerate(phases):
+        if name != 'initial':
+            sim.now = max(sim.now, start)
+            sim.set_link(u, v, cost)
+        # Run until the next event (or until the network is quiet)
+        last_change = sim.run(until=phases[k + 1][1] if k + 1 < len(phases) else None)
+        converged = not sim.events
+
+        messages, sent = sum(sim.messages), list(sim.bytes_sent)
+        delta = [after - before for before, after in zip(bytes_before, sent)]
+        results.append({
+            'event': name, 'time': start, 'u': u, 'v': v,
+            'convergence_time': round(max(last_change - start, 0.0), 6),
+            'converged': converged,
+            'messages': messages - messages_before,
+            'bytes': sum(delta),
+            'bytes_per_router_mean': sum(delta) / len(delta),
+            'bytes_per_router_max': max(delta),
+            'bytes_by_router': dict(zip(sim.names, delta)),
+        })
+        messages_before, bytes_before = messages, sent
+    return results
+
+def random_topology(routers, extra_links, rng):
+    """A random connected topology: a random spanning tree plus extra links."""
+    links = {(i, rng.randrange(i)) for i in range(1, routers)}
+    while len(links) < routers - 1 + extra_links:
+        u, v = rng.sample(range(routers), 2)
+        if (v, u) not in links:
+            links.add((u, v))
+    return sorted(links)
+
+def random_scenario(routers, extra_links, seed, fail_at=100.0, recover_at=200.0):
+    """A random topology in which one random link fails and later recovers."""
+    rng = random.Random(seed)
+    links = random_topology(routers, extra_links, rng)
+    u, v = rng.choice(links)
+    return links, [(fail_at, u, v, None), (recover_at, u, v, 1)]
+
+def sweep(count, routers=50, extra_links=25, seed=0, csv_path=None, router_csv_path=None):
+    """
+    Runs `count` randomized failure/recovery scenarios and returns one row
+    per phase; with `csv_path`, the rows are also written as a CSV file.
+    With `router_csv_path`, the bytes each router sent in each phase are
+    written there, one row per (scenario, phase, router).
+    """
+    rows = []
+    for scenario in range(count):
+        scenario_seed = seed * 1000003 + scenario
+        links, events = random_scenario(routers, extra_links, scenario_seed)
+        for result in run_scenario(links, events):
+            rows.append(dict(result, scenario=scenario, seed=scenario_seed,
+                             routers=routers, links=len(links)))
+
+    if csv_path:
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+    if router_csv_path:
+        with open(router_csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=ROUTER_CSV_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                for router, sent in row['bytes_by_router'].items():
+                    writer.writerow({'scenario': row['scenario'], 'seed': row['seed'],
+                                     'event': row['event'], 'time': row['time'],
+                                     'router': router, 'bytes': sent})
+    return rows
+
+def print_summary(rows):
+    """
+    Prints mean and worst convergence time, messages and bytes per phase
+    type. Convergence times only count the phases that converged before
+    the next event; 'Cut off' counts the others.
+    """
+    print(f"  {'Event':<8} | {'Runs':>5} | {'Cut off':>7} | {'Conv. mean (s)':>14} | "
+          f"{'Conv. max (s)':>13} | {'Msgs mean':>9} | {'Bytes/router':>12}")
+    print("  " + "-" * 88)
+    for event in ('initial', 'down', 'up'):
+        selected = [row for row in rows if row['event'] == event]
+        if not selected:
+            continue
+        times = [row['convergence_time'] for row in selected if row['converged']]
+        cut_off = len(selected) - len(times)
+        times = times or [float('nan')]
+        print(f"  {event:<8} | {len(selected):>5} | {cut_off:>7} | "
+              f"{sum(times) / len(times):>14.2f} | {max(times):>13.2f} | "
+              f"{sum(row['messages'] for row in selected) / len(selected):>9.1f} | "
+              f"{sum(row['bytes_per_router_mean'] for row in selected) / len(selected):>12.1f}")
+    print()
+
+if __name__ == "__main__":
+    print("--- RIP link failure scenarios ---\n")
+
+    # The lab topology: link C-D fails at t=100 s and comes back at t=200 s
+    edges = [('A', 'B'), ('A', 'C'), ('B', 'C'), ('C', 'D'), ('D', 'E')]
+    for result in run_scenario(edges, [(100.0, 'C', 'D', None), (200.0, 'C', 'D', 1)]):
+        where = f" {result['u']}-{result['v']} at t={result['time']:.0f}s" if result['u'] is not None else ""
+        status = "converged in" if result['converged'] else "cut off by the next event after"
+        print(f"{result['event']}{where}: {status} {result['convergence_time']:.2f} s, "
+              f"{result['messages']} messages, {result['bytes']} bytes")
+    print()
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    csv_path = "rip_scenarios.csv"
+    router_csv_path = "rip_scenarios_routers.csv"
+    print(f"Sweeping {count} random scenarios (50 routers, 74 links)...")
+    rows = sweep(count, csv_path=csv_path, router_csv_path=router_csv_path)
+    print(f"*** {len(rows)} rows saved to {csv_path}, bytes per router to {router_csv_path} ***\n")
+    print_summary(rows)
\ No newline at end of file
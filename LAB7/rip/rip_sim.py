@@ -1,28 +1,277 @@
-import networkx as nx
-import matplotlib
-matplotlib.use('Agg') # Use a non-GUI backend
-import matplotlib.pyplot as plt
+import heapq
+import os
+import sys
 import time
+from array import array
 
-def draw_graph(graph, labels, pos, title):
+# The shared LAB7 modules (topology.py, render.py) live one folder up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+try:
+    from topology import Topology
+    import render
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find 'topology.py' or 'render.py' in the LAB7 directory.")
+    print("-------------\n")
+    exit()
+
+INFINITY = 16           # RIP's "unreachable" metric
+RIP_HEADER_BYTES = 4    # RIPv2 message header
+RIP_RTE_BYTES = 20      # one route entry
+RIP_MAX_RTES = 25       # route entries per message
+
+# Event kinds of the RIP simulator
+UPDATE_DUE = 0          # a router's triggered-update timer fired
+RESPONSE = 1            # a response (update) message arrives
+REQUEST = 2             # a request for specific routes arrives
+
+def draw_graph(network, labels, pos, title):
     """Helper function to draw the network graph and save to file."""
-    plt.figure(figsize=(10, 6))
-    nx.draw(graph, pos, with_labels=True, node_color='lightblue', node_size=2000, font_size=16, font_weight='bold')
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=labels, font_color='red')
-    plt.title(title)
-    
-    filename = "rip_topology.png" 
-    plt.savefig(filename) 
-    print(f"\n*** Graph saved to {filename} ***") 
-    plt.close() 
+    render.draw_topology(network, pos, "rip_topology.png", title, node_color='lightblue',
+                         edge_labels=labels, label_color='red', node_size=2000, figsize=(10, 6))
+
+class RipSimulator:
+    """
+    Event-driven RIP on a simulated clock.
+
+    Routers are numbered 0..n-1; router i's table is cost[i] (metric per
+    destination, INFINITY if unreachable) and hop[i] (next hop, -1 if none).
+    There are no periodic full-table broadcasts: a router whose table
+    changes waits `trigger_delay` seconds (batching further changes), then
+    sends a triggered update carrying only the changed routes, with split
+    horizon and poison reverse. A router that loses a route asks its
+    neighbours for it with a request message. Messages take `link_delay`
+    seconds to cross a link. The network has converged when no events are
+    left. `nodes` adds routers that have no links (yet).
+    """
+
+    def __init__(self, links, nodes=(), link_delay=0.01, trigger_delay=1.0):
+        # links: (u, v) pairs (cost 1) or (u, v, cost) triples
+        self.names = []
+        self.index = {}
+        for name in nodes:
+            if name not in self.index:
+                self.index[name] = len(self.names)
+                self.names.append(name)
+        self.links = []
+        for link in links:
+            u, v = link[0], link[1]
+            for name in (u, v):
+                if name not in self.index:
+                    self.index[name] = len(self.names)
+                    self.names.append(name)
+            cost = link[2] if len(link) > 2 else 1
+            self.links.append((self.index[u], self.index[v], cost))
+
+        n = len(self.names)
+        self.neighbors = [{} for _ in range(n)]
+        for u, v, cost in self.links:
+            self.neighbors[u][v] = cost
+            self.neighbors[v][u] = cost
+
+        self.cost = [array('B', [INFINITY]) * n for _ in range(n)]
+        self.hop = [array('i', [-1]) * n for _ in range(n)]
+        self.changed = [set() for _ in range(n)]    # routes to send in the next update
+        self.lost = [set() for _ in range(n)]       # routes to request from the neighbours
+        self.timer_set = bytearray(n)
+
+        self.link_delay = link_delay
+        self.trigger_delay = trigger_delay
+        self.now = 0.0
+        self.last_change = 0.0
+        self.events = []
+        self.seq = 0
+        self.messages = [0] * n
+        self.bytes_sent = [0] * n
+
+        # Every router starts knowing only itself and announces it
+        for i in range(n):
+            self.cost[i][i] = 0
+            self.hop[i][i] = i
+            self._route_changed(i, i)
+
+    def _schedule(self, delay, kind, router, sender=None, entries=None):
+        self.seq += 1
+        heapq.heappush(self.events, (self.now + delay, self.seq, kind, router, sender, entries))
+
+    def _send(self, sender, receiver, kind, entries):
+        # A message holds at most RIP_MAX_RTES entries; longer ones are split.
+        # A whole-table request (entries=None) is a single special entry.
+        count = 1 if entries is None else len(entries)
+        packets = -(-count // RIP_MAX_RTES)
+        self.messages[sender] += packets
+        self.bytes_sent[sender] += packets * RIP_HEADER_BYTES + count * RIP_RTE_BYTES
+        self._schedule(self.link_delay, kind, receiver, sender, entries)
+
+    def _route_changed(self, router, dest):
+        self.changed[router].add(dest)
+        self.last_change = self.now
+        if not self.timer_set[router]:
+            self.timer_set[router] = 1
+            self._schedule(self.trigger_delay, UPDATE_DUE, router)
+
+    def _advertised(self, router, dests):
+        """
+        The (dest, metric, next_hop) entries `router` advertises for `dests`.
+
+        One list is shared by the messages to all neighbours: the receiver
+        applies poison reverse (metric INFINITY when it is the next hop), as
+        the sender would have for its copy.
+        """
+        cost, hop = self.cost[router], self.hop[router]
+        return [(dest, cost[dest], hop[dest]) for dest in dests]
+
+    def _send_update(self, router):
+        self.timer_set[router] = 0
+        entries = self._advertised(router, sorted(self.changed[router]))
+        self.changed[router].clear()
+        lost = [dest for dest in sorted(self.lost[router]) if self.cost[router][dest] == INFINITY]
+        self.lost[router].clear()
+        for neighbor in self.neighbors[router]:
+            if entries:
+                self._send(router, neighbor, RESPONSE, entries)
+            if lost:
+                self._send(router, neighbor, REQUEST, lost)
+
+    def set_link(self, u, v, cost):
+        """
+        Brings the link u-v (router names) up with `cost`, or down if cost
+        is None, at the current simulated time.
+
+        When a link fails, both ends lose the routes through it at once.
+        When a link comes up, both ends ask each other for their whole table.
+        """
+        u, v = self.index[u], self.index[v]
+        for a, b in ((u, v), (v, u)):
+            if cost is None:
+                self.neighbors[a].pop(b, None)
+                hop, lost = self.hop[a], self.lost[a]
+                for dest in range(len(self.names)):
+                    if hop[dest] == b and self.cost[a][dest] != INFINITY:
+                        self.cost[a][dest] = INFINITY
+                        lost.add(dest)
+                        self._route_changed(a, dest)
+            else:
+                self.neighbors[a][b] = cost
+                self._send(a, b, REQUEST, None)
+
+    def _receive(self, router, sender, entries):
+        link_cost = self.neighbors[router].get(sender)
+        if link_cost is None:
+            return      # the link went down while the message was in flight
+        cost, hop = self.cost[router], self.hop[router]
+        changed, lost = self.changed[router], self.lost[router]
+        updated = False
+        for dest, metric, next_hop in entries:
+            if next_hop == router or metric + link_cost >= INFINITY:
+                new_cost = INFINITY     # poison reverse, or too far
+            else:
+                new_cost = metric + link_cost
+            if hop[dest] == sender:
+                # News from the current next hop is always believed
+                if new_cost != cost[dest]:
+                    cost[dest] = new_cost
+                    if new_cost == INFINITY:
+                        lost.add(dest)
+                    changed.add(dest)
+                    updated = True
+            elif new_cost < cost[dest]:
+                # (a router's route to itself costs 0 and is never replaced)
+                cost[dest] = new_cost
+                hop[dest] = sender
+                changed.add(dest)
+                updated = True
+        if updated:
+            self.last_change = self.now
+            if not self.timer_set[router]:
+                self.timer_set[router] = 1
+                self._schedule(self.trigger_delay, UPDATE_DUE, router)
+
+    def run(self, until=None):
+        """Processes events until none are left (or until `until`); returns the time of the last route change."""
+        events = self.events
+        while events:
+            if until is not None and events[0][0] > until:
+                break
+            self.now, _, kind, router, sender, entries = heapq.heappop(events)
+            if kind == UPDATE_DUE:
+                self._send_update(router)
+            elif kind == RESPONSE:
+                self._receive(router, sender, entries)
+            elif sender in self.neighbors[router]:
+                # Requests are answered at once, not rate-limited;
+                # entries=None asks for the whole table
+                if entries is None:
+                    hop = self.hop[router]
+                    entries = [dest for dest in range(len(self.names)) if hop[dest] != -1]
+                self._send(router, sender, RESPONSE, self._advertised(router, entries))
+        return self.last_change
+
+    def table(self, name):
+        """Router `name`'s table, in the format of the round-based simulation."""
+        i = self.index[name]
+        names, cost, hop = self.names, self.cost[i], self.hop[i]
+        return {names[dest]: {'next_hop': names[hop[dest]], 'cost': cost[dest]}
+                for dest in range(len(names)) if hop[dest] != -1}
 
-def simulate_rip():
-    """Simulates the Routing Information Protocol (RIP)."""
+    def tables(self):
+        return {name: self.table(name) for name in self.names}
+
+
+def print_final_tables(nodes, tables):
+    """Prints every router's converged routing table."""
+    print("--- FINAL CONVERGED ROUTING TABLES ---")
+    for node in nodes:
+        print(f"Router {node}'s Final Table:")
+        for dest, info in sorted(tables[node].items()):
+            print(f"  -> Dest: {dest}, Next Hop: {info['next_hop']}, Cost: {info['cost']}")
+        print()
+
+def simulate_rip(mode="rounds", topology=None, render_graphs=None):
+    """
+    Simulates the Routing Information Protocol (RIP) and returns the tables.
+
+    mode="rounds" exchanges full tables in synchronous rounds, printing
+    every table each round (for teaching); mode="event" runs RipSimulator
+    with triggered updates on a simulated clock. `topology` (a LAB7
+    topology.Topology) replaces the lab network; RIP counts hops, so its
+    link weights are ignored. The topology is drawn after the simulation
+    if `render_graphs` (default: only for the lab network).
+    """
     
     # 1. Create a network topology
-    nodes = ['A', 'B', 'C', 'D', 'E']
-    edges = [('A', 'B'), ('A', 'C'), ('B', 'C'), ('C', 'D'), ('D', 'E')]
+    if topology is None:
+        nodes = ['A', 'B', 'C', 'D', 'E']
+        edges = [('A', 'B'), ('A', 'C'), ('B', 'C'), ('C', 'D'), ('D', 'E')]
+    else:
+        nodes = list(topology.nodes)
+        edges = [(u, v) for u, v, _ in topology.links]
     
+    if mode == "event":
+        print("--- Simulating RIP (event-driven, triggered updates) ---")
+        print(f"Network Nodes: {nodes}")
+        print(f"Network Links (all cost 1): {edges}\n")
+        sim = RipSimulator(edges, nodes)
+        converged = sim.run()
+        tables = sim.tables()
+        print(f"*** CONVERGENCE REACHED after {converged:.2f} simulated seconds, "
+              f"{sum(sim.messages)} messages, {sum(sim.bytes_sent)} bytes. ***\n")
+    else:
+        tables = simulate_rip_rounds(nodes, edges)
+
+    print_final_tables(nodes, tables)
+
+    # Visualization
+    if render_graphs is None:
+        render_graphs = topology is None
+    if render_graphs:
+        network = Topology(edges, nodes) if topology is None else topology
+        labels = {(u, v): 1 for u, v in edges}
+        draw_graph(network, labels, render.layout(network), "RIP Network Topology (All Link Costs = 1)")
+    return tables
+
+def simulate_rip_rounds(nodes, edges):
+    """Round-based RIP: every router relaxes every neighbour's full table each round."""
     network = {node: {} for node in nodes}
     for u, v in edges:
         network[u][v] = 1
@@ -84,20 +333,7 @@ def simulate_rip():
             
         time.sleep(1) 
 
-    # 4. Display final routing tables
-    print("--- FINAL CONVERGED ROUTING TABLES ---")
-    for node in nodes:
-        print(f"Router {node}'s Final Table:")
-        for dest, info in sorted(tables[node].items()):
-            print(f"  -> Dest: {dest}, Next Hop: {info['next_hop']}, Cost: {info['cost']}")
-        print()
-
-    # Visualization
-    G = nx.Graph()
-    G.add_edges_from(edges)
-    pos = nx.spring_layout(G)
-    labels = {(u, v): 1 for u, v in edges}
-    draw_graph(G, labels, pos, "RIP Network Topology (All Link Costs = 1)")
+    return tables
 
 if __name__ == "__main__":
     simulate_rip()
\ No newline at end of file
@@ -0,0 +1,36 @@
+from spf import all_pairs_spf, named_next_hops
+
+
+def build_routing_table(distances, next_hops):
+    """Builds a routing table from the SPF distances and ECMP next hops."""
+    table = {}
+    for dest, cost in distances.items():
+        hops = next_hops[dest]
+        next_hop = ','.join(sorted(str(hop) for hop in hops)) if hops else '-'
+        table[dest] = {'next_hop': next_hop, 'cost': cost}
+    return table
+
+
+def print_routing_table(router_name, routing_table):
+    """Prints one router's routing table."""
+    print(f"Routing Table for Router {router_name}:")
+    print(f"  {'Destination':<12} | {'Next Hop':<10} | {'Total Cost':<10}")
+    print("  " + "-"*40)
+    # Router names first, then the area and default routes of the multi-area mode
+    for dest, info in sorted(routing_table.items(), key=lambda item: (isinstance(item[0], str), item[0])):
+        print(f"  {str(dest):<12} | {info['next_hop']:<10} | {info['cost']:<10}")
+    print()
+
+
+def compute_all_routing_tables(compiled_lsdb, workers=None):
+    """
+    Parallel all-routers mode: runs every router's SPF across `workers`
+    processes (default: one per CPU) and returns all the routing tables.
+    """
+    names = compiled_lsdb.names
+    all_routing_tables = {}
+    for source, (dist, hops) in enumerate(all_pairs_spf(compiled_lsdb, workers)):
+        distances = {names[i]: dist[i] for i in range(len(names))}
+        all_routing_tables[names[source]] = build_routing_table(
+            distances, named_next_hops(compiled_lsdb, hops))
+    return all_routing_tables
@@ -0,0 +1,416 @@
+import heapq
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+INF = float('inf')
+
+
+class CompiledLSDB:
+    """
+    A link-state database compiled into integer-indexed CSR adjacency arrays.
+
+    Router i's links are targets[offsets[i]:offsets[i + 1]] with the matching
+    entries of weights. names[i] is the router's name, index[name] its number.
+    weights is a plain list so a link can be taken down (INF) in place.
+    """
+    __slots__ = ('names', 'index', 'offsets', 'targets', 'weights')
+
+    def __init__(self, names, index, offsets, targets, weights):
+        self.names = names
+        self.index = index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.names)
+
+    def neighbors(self, node):
+        """Yields (neighbor, weight) pairs of router index `node`."""
+        for k in range(self.offsets[node], self.offsets[node + 1]):
+            yield self.targets[k], self.weights[k]
+
+
+def compile_lsdb(lsdb, directed=False):
+    """
+    Compiles an LSDB into a CompiledLSDB, once, before running SPF.
+
+    `lsdb` is a networkx graph (edge attribute 'weight', default 1), a
+    topology.Topology or an iterable of (u, v, weight) links. Links are bidirectional unless
+    `directed` is set; a link given twice keeps its last weight.
+    """
+    if hasattr(lsdb, 'nodes') and hasattr(lsdb, 'edges'):
+        names = list(lsdb.nodes)
+        links = lsdb.edges(data='weight', default=1)
+    else:
+        names = []
+        links = lsdb
+
+    index = {}
+    for name in names:
+        index.setdefault(name, len(index))
+
+    adjacency = {}
+    for u, v, w in links:
+        for name in (u, v):
+            if name not in index:
+                index[name] = len(index)
+                names.append(name)
+        ui, vi = index[u], index[v]
+        adjacency[(ui, vi)] = w
+        if not directed:
+            adjacency[(vi, ui)] = w
+
+    # Counting sort of the links by source router -> CSR arrays
+    n = len(names)
+    offsets = array('l', [0]) * (n + 1)
+    for (ui, _) in adjacency:
+        offsets[ui + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    fill = array('l', offsets[:n])
+    targets = array('l', [0]) * len(adjacency)
+    weights = [0] * len(adjacency)
+    for (ui, vi), w in adjacency.items():
+        k = fill[ui]
+        targets[k] = vi
+        weights[k] = w
+        fill[ui] = k + 1
+
+    return CompiledLSDB(names, index, offsets, targets, weights)
+
+
+def spf(lsdb, source):
+    """
+    Dijkstra's algorithm over a CompiledLSDB from router index `source`.
+
+    Returns (dist, preds, order):
+      dist[v]  - cost of the shortest path to v (INF if unreachable)
+      preds[v] - list of ALL predecessors of v on equal-cost shortest
+                 paths (ECMP), or None if v is unreachable
+      order    - routers in the order they were settled
+    """
+    n = len(lsdb.names)
+    offsets, targets, weights = lsdb.offsets, lsdb.targets, lsdb.weights
+    dist = [INF] * n
+    preds = [None] * n
+    done = bytearray(n)
+    order = []
+
+    dist[source] = 0
+    preds[source] = []
+    heap = [(0, source)]
+    pop, push = heapq.heappop, heapq.heappush
+
+    while heap:
+        cost, node = pop(heap)
+        if done[node]:
+            # Stale entry: the node was settled through a cheaper path
+            continue
+        done[node] = 1
+        order.append(node)
+
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[k]
+            if done[neighbor]:
+                continue
+            new_cost = cost + weights[k]
+            old_cost = dist[neighbor]
+            if new_cost < old_cost:
+                dist[neighbor] = new_cost
+                preds[neighbor] = [node]
+                push(heap, (new_cost, neighbor))
+            elif new_cost == old_cost and new_cost != INF:
+                preds[neighbor].append(node)
+
+    return dist, preds, order
+
+
+def next_hops(preds, order, source):
+    """
+    First hops from `source` towards every router, in one pass over the
+    settle order: a router's next hops are those of its predecessors, or
+    the router itself where the predecessor is the source. Routers with a
+    single predecessor share its tuple. Returns a list of tuples of router
+    indices (empty for the source and unreachable routers).
+    """
+    hops = [()] * len(preds)
+    for node in order:
+        node_preds = preds[node]
+        if not node_preds:
+            continue
+        if len(node_preds) == 1:
+            prev = node_preds[0]
+            hops[node] = (node,) if prev == source else hops[prev]
+        else:
+            merged = set()
+            for prev in node_preds:
+                if prev == source:
+                    merged.add(node)
+                else:
+                    merged.update(hops[prev])
+            hops[node] = tuple(merged)
+    return hops
+
+
+# The LSDB used by all_pairs_spf() worker processes. With the "fork" start
+# method it is inherited from the parent (shared copy-on-write pages, never
+# pickled); otherwise each worker receives it once, at start-up.
+_worker_lsdb = None
+
+
+def _init_worker(lsdb):
+    global _worker_lsdb
+    _worker_lsdb = lsdb
+
+
+def _spf_chunk(sources):
+    lsdb = _worker_lsdb
+    results = []
+    for source in sources:
+        dist, preds, order = spf(lsdb, source)
+        results.append((source, dist, next_hops(preds, order, source)))
+    return results
+
+
+def all_pairs_spf(lsdb, workers=None):
+    """
+    Runs spf() from every router of a CompiledLSDB, in parallel.
+
+    The routers are split into chunks handed to a pool of `workers`
+    processes (default: one per CPU); the compiled LSDB is shared with the
+    workers rather than sent with every task. The workers also derive the
+    next hops (see next_hops()), so only two flat lists per router come
+    back. Returns a list indexed by router: results[source] = (dist, hops).
+    """
+    n = len(lsdb)
+    workers = workers or os.cpu_count() or 1
+    results = [None] * n
+    if workers <= 1 or n < 2:
+        for source in range(n):
+            dist, preds, order = spf(lsdb, source)
+            results[source] = (dist, next_hops(preds, order, source))
+        return results
+
+    # A few chunks per worker keeps them all busy until the end
+    chunk_size = max(1, n // (workers * 4))
+    chunks = [range(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+    global _worker_lsdb
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        _worker_lsdb = lsdb
+        initializer, initargs = None, ()
+    else:
+        context = multiprocessing.get_context()
+        initializer, initargs = _init_worker, (lsdb,)
+
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context,
+                                 initializer=initializer, initargs=initargs) as pool:
+            for chunk in pool.map(_spf_chunk, chunks):
+                for source, dist, hops in chunk:
+                    results[source] = (dist, hops)
+    finally:
+        _worker_lsdb = None
+    return results
+
+
+def set_link_cost(lsdb, u, v, cost):
+    """
+    Changes the cost of the (bidirectional) link between router indices u
+    and v in place; cost=INF takes the link down. Returns the old cost.
+
+    Only links present when the LSDB was compiled can be changed: a new
+    adjacency needs compile_lsdb() again. Costs must be positive, which
+    IncrementalSPF relies on to repair the trees.
+    """
+    if not cost > 0:
+        raise ValueError(f"Link costs must be positive, got {cost}.")
+    old_cost = None
+    for a, b in ((u, v), (v, u)):
+        for k in range(lsdb.offsets[a], lsdb.offsets[a + 1]):
+            if lsdb.targets[k] == b:
+                old_cost = lsdb.weights[k]
+                lsdb.weights[k] = cost
+                break
+        else:
+            raise KeyError(f"No link {lsdb.names[a]}-{lsdb.names[b]} in the LSDB.")
+    return old_cost
+
+
+class IncrementalSPF:
+    """
+    The shortest path tree of one router, kept up to date as link costs
+    change (incremental SPF / partial route calculation).
+
+    After set_link_cost() changes a link, link_changed() repairs the tree:
+
+      - cost decrease (or link up): if the link now gives a router a
+        cheaper path, Dijkstra is resumed from that router only, and stops
+        where distances no longer improve;
+      - cost increase (or link down): if the link carried the last
+        shortest path of a router, only that router and the routers
+        depending solely on it (its subtree) are reset and recomputed
+        from their unaffected neighbours. Otherwise nothing changes.
+
+    Links are assumed to be symmetric (compile_lsdb without `directed`).
+    """
+
+    def __init__(self, lsdb, source):
+        self.lsdb = lsdb
+        self.source = source
+        self.dist, self.preds, _ = spf(lsdb, source)
+
+    def link_changed(self, u, v, old_cost, new_cost):
+        """
+        Repairs the tree after the link u-v changed from old_cost to
+        new_cost (already applied to the LSDB). Returns the number of
+        routers whose distance or predecessors were touched.
+        """
+        if new_cost == old_cost:
+            return 0
+        touched = set()
+        for a, b in ((u, v), (v, u)):
+            if new_cost < old_cost:
+                self._decrease(a, b, new_cost, touched)
+            else:
+                self._increase(a, b, touched)
+        return len(touched)
+
+    def _decrease(self, u, v, cost, touched):
+        dist, preds = self.dist, self.preds
+        new_cost = dist[u] + cost
+        if new_cost == INF or new_cost > dist[v]:
+            return
+        if new_cost == dist[v]:
+            # One more equal-cost path: distances are unchanged
+            if u not in preds[v]:
+                preds[v].append(u)
+                touched.add(v)
+            return
+        dist[v] = new_cost
+        preds[v] = [u]
+        touched.add(v)
+        self._propagate([(new_cost, v)], touched)
+
+    def _increase(self, u, v, touched):
+        dist, preds = self.dist, self.preds
+        if not preds[v] or u not in preds[v]:
+            return      # the link was not on any shortest path to v
+        preds[v].remove(u)
+        touched.add(v)
+        if preds[v]:
+            return      # v still has an equal-cost path
+
+        # v lost its last shortest path: find the routers whose every
+        # shortest path went through v, i.e. the subtree hanging from it.
+        lsdb = self.lsdb
+        offsets, targets = lsdb.offsets, lsdb.targets
+        affected = [v]
+        in_subtree = {v}
+        for node in affected:
+            for k in range(offsets[node], offsets[node + 1]):
+                child = targets[k]
+                child_preds = preds[child]
+                if child_preds and node in child_preds:
+                    child_preds.remove(node)
+                    if not child_preds and child not in in_subtree:
+                        in_subtree.add(child)
+                        affected.append(child)
+
+        # Reset the subtree, then give each of its routers the best path
+        # offered by a neighbour outside of it, and resume Dijkstra there.
+        for node in affected:
+            dist[node] = INF
+            preds[node] = None
+        weights = lsdb.weights
+        heap = []
+        for node in affected:
+            touched.add(node)
+            best, best_preds = INF, None
+            for k in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[k]
+                if neighbor in in_subtree:
+                    continue
+                cost = dist[neighbor] + weights[k]
+                if cost < best:
+                    best, best_preds = cost, [neighbor]
+                elif cost == best and cost != INF:
+                    best_preds.append(neighbor)
+            if best != INF:
+                dist[node] = best
+                preds[node] = best_preds
+                heap.append((best, node))
+        heapq.heapify(heap)
+        self._propagate(heap, touched)
+
+    def _propagate(self, heap, touched):
+        """Resumes Dijkstra from the routers in `heap` until nothing improves."""
+        dist, preds = self.dist, self.preds
+        offsets, targets, weights = self.lsdb.offsets, self.lsdb.targets, self.lsdb.weights
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            cost, node = pop(heap)
+            if cost > dist[node]:
+                continue
+            for k in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[k]
+                new_cost = cost + weights[k]
+                old_cost = dist[neighbor]
+                if new_cost < old_cost:
+                    dist[neighbor] = new_cost
+                    preds[neighbor] = [node]
+                    touched.add(neighbor)
+                    push(heap, (new_cost, neighbor))
+                elif new_cost == old_cost and new_cost != INF and node not in preds[neighbor]:
+                    preds[neighbor].append(node)
+                    touched.add(neighbor)
+
+    def predecessors(self):
+        """The ECMP predecessor lists keyed by router name."""
+        return named_predecessors(self.lsdb, self.preds)
+
+    def next_hops(self):
+        """The ECMP next hops keyed by router name."""
+        # Costs are positive, so ordering by distance is a valid settle order
+        order = sorted((i for i, cost in enumerate(self.dist) if cost != INF),
+                       key=self.dist.__getitem__)
+        return named_next_hops(self.lsdb, next_hops(self.preds, order, self.source))
+
+    def distances(self):
+        names = self.lsdb.names
+        return {names[i]: cost for i, cost in enumerate(self.dist)}
+
+
+def named_predecessors(lsdb, preds):
+    """Converts index-based ECMP predecessor lists to router names."""
+    names = lsdb.names
+    return {names[i]: [names[p] for p in preds[i]] if preds[i] else []
+            for i in range(len(names))}
+
+
+def named_next_hops(lsdb, hops):
+    """Converts index-based next-hop tuples to router names."""
+    names = lsdb.names
+    return {names[i]: [names[hop] for hop in hops[i]] for i in range(len(names))}
+
+
+def dijkstra(lsdb, start_node):
+    """
+    Name-based wrapper around spf() for the simulators.
+
+    Returns (distances, next_hops, spt_edges) keyed by router name, where
+    next_hops[dest] is the list of ECMP first hops towards dest and
+    spt_edges lists one (prev, node) edge per router in settle order.
+    """
+    names = lsdb.names
+    source = lsdb.index[start_node]
+    dist, preds, order = spf(lsdb, source)
+
+    distances = {names[i]: dist[i] for i in range(len(names))}
+    hops = named_next_hops(lsdb, next_hops(preds, order, source))
+    spt_edges = [(names[preds[node][0]], names[node]) for node in order if preds[node]]
+    return distances, hops, spt_edges
@@ -0,0 +1,267 @@
+import gzip
+import json
+import math
+import random
+import xml.etree.ElementTree as ET
+
+DEFAULT_WEIGHTS = (1, 10)
+
+
+class Topology:
+    """
+    A network topology shared by the LAB7 simulators: node names and
+    undirected (u, v, weight) links, plus optional node positions (`pos`)
+    for drawing.
+
+    It has the `nodes` / `edges(data='weight', default=1)` interface of a
+    networkx graph, so compile_lsdb() accepts it directly. Links are
+    indexed by their end points, so set_link() and remove_link() take
+    constant time; removing a link moves the last one into its place.
+    """
+
+    def __init__(self, links=(), nodes=(), name="topology", pos=None):
+        self.name = name
+        self.nodes = []
+        self.links = []
+        self.pos = pos
+        self._known = set()
+        # frozenset((u, v)) -> positions in self.links of the u-v links
+        self._link_index = {}
+        for node in nodes:
+            self.add_node(node)
+        for link in links:
+            self.add_link(*link)
+
+    def add_node(self, node):
+        if node not in self._known:
+            self._known.add(node)
+            self.nodes.append(node)
+
+    def add_link(self, u, v, weight=1):
+        self.add_node(u)
+        self.add_node(v)
+        self._link_index.setdefault(frozenset((u, v)), []).append(len(self.links))
+        self.links.append((u, v, weight))
+
+    def set_link(self, u, v, weight):
+        """Changes the weight of the link u-v, adding the link if needed."""
+        positions = self._link_index.get(frozenset((u, v)))
+        if positions:
+            a, b, _ = self.links[positions[0]]
+            self.links[positions[0]] = (a, b, weight)
+        else:
+            self.add_link(u, v, weight)
+
+    def remove_link(self, u, v):
+        """Removes the link u-v (every copy of it); the last link takes each freed position."""
+        links, index = self.links, self._link_index
+        for position in sorted(index.pop(frozenset((u, v)), ()), reverse=True):
+            last = links.pop()
+            if position < len(links):
+                links[position] = last
+                moved = index[frozenset(last[:2])]
+                moved[moved.index(len(links))] = position
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return f"Topology({self.name!r}, {len(self.nodes)} nodes, {len(self.links)} links)"
+
+    def edges(self, data=None, default=None):
+        """The links as (u, v) pairs, or (u, v, weight) triples if `data` is given."""
+        if data is None:
+            return [(u, v) for u, v, _ in self.links]
+        return list(self.links)
+
+
+def _open_text(path):
+    # Big topologies are often shipped gzipped
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rt')
+    return open(path)
+
+
+def load_edge_list(path, nodetype=str, default_weight=1):
+    """
+    Reads an edge list: one "u v [weight]" link per line, separated by
+    spaces, tabs or commas; '#' starts a comment. The file is read one
+    line at a time, so only the topology itself is held in memory.
+    """
+    topology = Topology(name=str(path))
+    with _open_text(path) as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            fields = line.replace(',', ' ').split()
+            if len(fields) < 2:
+                raise ValueError(f"Line {line_num}: expected 'u v [weight]'.")
+            weight = float(fields[2]) if len(fields) > 2 else default_weight
+            if math.isfinite(weight) and weight.is_integer():
+                weight = int(weight)
+            topology.add_link(nodetype(fields[0]), nodetype(fields[1]), weight)
+    return topology
+
+
+def load_graphml(path, nodetype=str, default_weight=1):
+    """
+    Reads a GraphML file with iterparse, clearing each element once read,
+    so large files are never held in memory as a whole XML tree. The link
+    weight is the edge attribute named "weight" (default_weight if absent).
+    """
+    topology = Topology(name=str(path))
+    weight_key = None
+    with _open_text(path) as f:
+        for _, elem in ET.iterparse(f, events=('end',)):
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if tag == 'key':
+                if elem.get('attr.name') == 'weight' and elem.get('for') in ('edge', 'all'):
+                    weight_key = elem.get('id')
+            elif tag == 'node':
+                topology.add_node(nodetype(elem.get('id')))
+                elem.clear()
+            elif tag == 'edge':
+                weight = default_weight
+                for data in elem:
+                    if data.get('key') == weight_key and data.text:
+                        weight = float(data.text)
+                        if math.isfinite(weight) and weight.is_integer():
+                            weight = int(weight)
+                topology.add_link(nodetype(elem.get('source')), nodetype(elem.get('target')), weight)
+                elem.clear()
+    return topology
+
+
+def load_json(path, default_weight=1):
+    """
+    Reads a node-link JSON file ({"nodes": [{"id": ...}], "links": [{"source":
+    ..., "target": ..., "weight": ...}]}, as written by networkx).
+    """
+    with _open_text(path) as f:
+        data = json.load(f)
+    topology = Topology(name=str(path))
+    for node in data.get('nodes', []):
+        topology.add_node(node['id'] if isinstance(node, dict) else node)
+    for link in data.get('links', data.get('edges', [])):
+        topology.add_link(link['source'], link['target'], link.get('weight', default_weight))
+    return topology
+
+
+def load(path, **kwargs):
+    """Loads a topology file, choosing the format from its extension."""
+    name = str(path).lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if name.endswith('.graphml') or name.endswith('.xml'):
+        return load_graphml(path, **kwargs)
+    if name.endswith('.json'):
+        return load_json(path, **kwargs)
+    return load_edge_list(path, **kwargs)
+
+
+def _weight(rng, weights):
+    return rng.randint(*weights) if weights else 1
+
+
+def grid(rows, cols, weights=DEFAULT_WEIGHTS, seed=None):
+    """A rows x cols grid; node r * cols + c sits at (c, r)."""
+    rng = random.Random(seed)
+    pos = {r * cols + c: (c, r) for r in range(rows) for c in range(cols)}
+    topology = Topology(nodes=range(rows * cols), name=f"grid-{rows}x{cols}", pos=pos)
+    for r in range(rows):
+        for c in range(cols):
+            node = r * cols + c
+            if c + 1 < cols:
+                topology.add_link(node, node + 1, _weight(rng, weights))
+            if r + 1 < rows:
+                topology.add_link(node, node + cols, _weight(rng, weights))
+    return topology
+
+
+def waxman(n, alpha=0.4, beta=0.1, weights=DEFAULT_WEIGHTS, seed=None):
+    """
+    A Waxman graph: n nodes placed uniformly in the unit square, each pair
+    linked with probability beta * exp(-d / (alpha * L)), where d is their
+    distance and L the largest possible one. Every pair is considered, so
+    this is O(n^2): use barabasi_albert() or grid() for very large graphs.
+    """
+    rng = random.Random(seed)
+    pos = {i: (rng.random(), rng.random()) for i in range(n)}
+    topology = Topology(nodes=range(n), name=f"waxman-{n}", pos=pos)
+    scale = alpha * math.sqrt(2)
+    for u in range(n):
+        xu, yu = pos[u]
+        for v in range(u + 1, n):
+            xv, yv = pos[v]
+            if rng.random() < beta * math.exp(-math.hypot(xu - xv, yu - yv) / scale):
+                topology.add_link(u, v, _weight(rng, weights))
+    return topology
+
+
+def barabasi_albert(n, m=2, weights=DEFAULT_WEIGHTS, seed=None):
+    """
+    A Barabasi-Albert preferential-attachment graph: each new node links
+    to m distinct existing nodes chosen proportionally to their degree.
+    """
+    if not 1 <= m < n:
+        raise ValueError("Barabasi-Albert needs 1 <= m < n.")
+    rng = random.Random(seed)
+    topology = Topology(nodes=range(n), name=f"ba-{n}-{m}")
+    # Every link end is listed once, so a uniform pick is degree-weighted
+    ends = list(range(m))
+    for node in range(m, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(ends))
+        for target in targets:
+            topology.add_link(target, node, _weight(rng, weights))
+            ends.extend((target, node))
+    return topology
+
+
+def fat_tree(k, weights=None, seed=None):
+    """
+    A k-ary fat tree (k even) of switches: (k/2)^2 core switches and k pods
+    of k/2 aggregation and k/2 edge switches. Links have cost 1 unless
+    `weights` is given.
+    """
+    if k < 2 or k % 2:
+        raise ValueError("A fat tree needs an even k >= 2.")
+    rng = random.Random(seed)
+    half = k // 2
+    topology = Topology(name=f"fattree-{k}")
+    for pod in range(k):
+        for a in range(half):
+            agg = f"a{pod}_{a}"
+            for c in range(half):
+                topology.add_link(agg, f"c{a * half + c}", _weight(rng, weights))
+            for e in range(half):
+                topology.add_link(agg, f"e{pod}_{e}", _weight(rng, weights))
+    return topology
+
+
+def _grid_of(n, seed=None):
+    rows = max(1, int(math.sqrt(n)))
+    return grid(rows, -(-n // rows), seed=seed)
+
+
+def _fat_tree_of(n, seed=None):
+    # A k-ary fat tree has 5k^2/4 switches
+    k = max(2, 2 * round(math.sqrt(n * 4 / 5) / 2))
+    return fat_tree(k, seed=seed)
+
+
+GENERATORS = {
+    'grid': _grid_of,
+    'waxman': waxman,
+    'ba': barabasi_albert,
+    'fattree': _fat_tree_of,
+}
+
+
+def generate(kind, n, seed=None):
+    """A generated topology of about n nodes: kind is 'grid', 'waxman', 'ba' or 'fattree'."""
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown topology generator '{kind}'.")
+    return GENERATORS[kind](n, seed=seed)
\ No newline at end of file
@@ -0,0 +1,219 @@
+# File Name: benchmark.py
+# Throughput benchmarks for the LAB8 router.
+#
+# Run with:  python benchmark.py
+
+import random
+import time
+import tracemalloc
+
+try:
+    from ip_utils import int_to_ip, ip_to_int
+    from router import Router
+    from scheduler import (Packet, CompactPacket, PacketBatch, FifoScheduler,
+                           PriorityScheduler, WFQScheduler, DRRScheduler)
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find 'ip_utils.py' / 'router.py' / 'scheduler.py' in the same directory.")
+    print("-------------\n")
+    exit()
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def random_routes(num_routes: int, num_links: int = 16, seed: int = 1) -> list:
+    """
+    Generates a BGP-like table: mostly /24s, some shorter aggregates and a
+    few longer prefixes, pointing at `num_links` output links.
+    """
+    rng = random.Random(seed)
+    lengths = [24] * 60 + [16, 19, 20, 21, 22, 23] * 5 + [25, 28, 32] * 3 + [8]
+    routes = {}
+    while len(routes) < num_routes:
+        length = rng.choice(lengths)
+        network = rng.getrandbits(32) & ((0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF)
+        routes[f"{int_to_ip(network)}/{length}"] = f"Link {rng.randrange(num_links)}"
+    return list(routes.items())
+
+
+def random_destinations(routes: list, num_packets: int, seed: int = 2) -> list:
+    """Destinations that mostly fall inside the table, some that miss it."""
+    rng = random.Random(seed)
+    prefixes = [cidr.split('/')[0] for cidr, _ in routes]
+    dests = []
+    for _ in range(num_packets):
+        if rng.random() < 0.9:
+            base = prefixes[rng.randrange(len(prefixes))]
+            dests.append(base.rsplit('.', 1)[0] + f".{rng.randrange(256)}")
+        else:
+            dests.append(int_to_ip(rng.getrandbits(32)))
+    return dests
+
+
+def timed(label: str, count: int, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed:8.3f} s  {count / elapsed:14,.0f} lookups/s")
+    return result
+
+
+def bench_router(num_routes: int = 100_000, num_packets: int = 200_000):
+    print(f"--- Router throughput: {num_routes:,} routes, {num_packets:,} packets ---")
+    routes = random_routes(num_routes)
+    dests = random_destinations(routes, num_packets)
+
+    router = Router(routes)
+    dest_ints = [ip_to_int(ip) for ip in dests]
+
+    per_packet = timed("route_packet (str, per packet)", num_packets,
+                       lambda: [router.route_packet(ip) for ip in dests])
+    timed("lookup (int, per packet)", num_packets,
+          lambda: [router.lookup(dest) for dest in dest_ints])
+
+    if np is None:
+        print("  route_many skipped: NumPy is not installed.")
+        return
+    dest_array = np.array(dest_ints, dtype=np.uint32)
+    router.route_many(dest_array[:1])   # compile the range table up front
+    batch = timed("route_many (NumPy batch)", num_packets,
+                  lambda: router.route_many(dest_array))
+
+    links = router.links + ["Default Gateway"]   # index -1 -> default
+    agree = all(links[link_id] == link for link_id, link in zip(batch, per_packet))
+    print(f"  Batch and per-packet results agree: {agree}")
+
+
+def bench_flow_cache(num_routes: int = 100_000, num_packets: int = 200_000,
+                     hot_destinations: int = 2_000, cache_size: int = 4_096):
+    print(f"\n--- Flow cache: {hot_destinations:,} hot destinations, "
+          f"cache of {cache_size:,} entries ---")
+    routes = random_routes(num_routes)
+    rng = random.Random(3)
+    hot = [ip_to_int(ip) for ip in random_destinations(routes, hot_destinations)]
+    # Skewed traffic: 90% of packets go to the hot set
+    dest_ints = [hot[int(rng.paretovariate(1.2)) % len(hot)] if rng.random() < 0.9
+                 else rng.getrandbits(32) for _ in range(num_packets)]
+
+    for size in (0, cache_size):
+        router = Router(routes, cache_size=size)
+        timed(f"lookup, cache_size={size}", num_packets,
+              lambda: [router.lookup(dest) for dest in dest_ints])
+        if size:
+            print(f"  {router.cache_stats()}")
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def bench_schedulers(num_packets: int = 200_000, load: float = 1.05,
+                     link_rate_bps: float = 100e6):
+    """
+    Feeds the same overloaded packet stream through the four schedulers and
+    reports scheduler throughput (packets/s of enqueue + dequeue work) and
+    per-class queueing delay on a link of `link_rate_bps`.
+    
+    Class mix by bytes: 50% High (0), 30% Medium (1), 20% Low (2), so the
+    high class alone nearly fills the link, which is what starves Low under
+    strict priority.
+    """
+    print(f"\n--- Schedulers: {num_packets:,} packets, offered load {load:.2f} ---")
+    rng = random.Random(4)
+    class_share = [0.5, 0.3, 0.2]
+    payloads = {size: "x" * size for size in (64, 576, 1500)}
+    mean_size = (64 + 576 + 1500) / 3
+    mean_gap = mean_size * 8 / (link_rate_bps * load)
+
+    # Arrival stream: (arrival_time, packet); sizes are payload lengths
+    arrivals = []
+    now = 0.0
+    for _ in range(num_packets):
+        now += rng.expovariate(1.0 / mean_gap)
+        cls = rng.choices((0, 1, 2), class_share)[0]
+        payload = payloads[rng.choice((64, 576, 1500))]
+        arrivals.append((now, Packet("10.0.0.1", "10.0.0.2", payload, cls)))
+
+    schedulers = [
+        ("FIFO", FifoScheduler()),
+        ("Priority", PriorityScheduler(3)),
+        ("WFQ 4:2:1", WFQScheduler((4, 2, 1))),
+        ("DRR 4:2:1", DRRScheduler((4, 2, 1), quantum=1500)),
+    ]
+    print(f"  {'Scheduler':<10} {'pkts/s':>12}   "
+          + "   ".join(f"class {c}: mean/p99 delay (ms)" for c in range(3)))
+    for name, scheduler in schedulers:
+        arrived_at = {}
+        delays = ([], [], [])
+        link_free = 0.0
+
+        def send_until(time_limit):
+            nonlocal link_free
+            while scheduler and link_free <= time_limit:
+                packet = scheduler.dequeue()
+                link_free += len(packet.payload) * 8 / link_rate_bps
+                delays[packet.priority].append(link_free - arrived_at.pop(id(packet)))
+
+        start = time.perf_counter()
+        for (arrival, packet) in arrivals:
+            send_until(arrival)
+            if not scheduler:
+                link_free = max(link_free, arrival)
+            arrived_at[id(packet)] = arrival
+            scheduler.enqueue(packet)
+        send_until(float("inf"))
+        elapsed = time.perf_counter() - start
+
+        columns = []
+        for per_class in delays:
+            per_class.sort()
+            mean = sum(per_class) / len(per_class) if per_class else 0.0
+            columns.append(f"{mean * 1e3:10.2f} / {_percentile(per_class, 0.99) * 1e3:10.2f}")
+        print(f"  {name:<10} {num_packets / elapsed:12,.0f}   " + "   ".join(f"{c:<30}" for c in columns))
+
+
+def bench_packet_memory(num_packets: int = 100_000, payload_size: int = 64):
+    """
+    Memory per packet of each representation, measured with tracemalloc.
+    Every packet gets its own payload, as it would on a real queue.
+    """
+    print(f"\n--- Packet memory: {num_packets:,} packets, {payload_size}-byte payloads ---")
+    rng = random.Random(5)
+    addresses = [(rng.getrandbits(32), rng.getrandbits(32)) for _ in range(num_packets)]
+
+    def build_packets():
+        return [Packet(int_to_ip(src), int_to_ip(dst),
+                       f"{i:0{payload_size}d}", i % 3)
+                for i, (src, dst) in enumerate(addresses)]
+
+    def build_compact():
+        return [CompactPacket(src, dst, f"{i:0{payload_size}d}".encode(), i % 3)
+                for i, (src, dst) in enumerate(addresses)]
+
+    def build_batch():
+        batch = PacketBatch()
+        for i, (src, dst) in enumerate(addresses):
+            batch.append(src, dst, f"{i:0{payload_size}d}".encode(), i % 3)
+        return batch
+
+    for label, build in (("Packet (@dataclass, str IPs)", build_packets),
+                         ("CompactPacket (slots, int IPs)", build_compact),
+                         ("PacketBatch (columnar)", build_batch)):
+        tracemalloc.start()
+        kept = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {label:<32} {current / num_packets:8.1f} bytes/packet")
+        del kept
+
+
+if __name__ == "__main__":
+    bench_router()
+    bench_flow_cache()
+    bench_schedulers()
+    bench_packet_memory()
@@ -1,27 +1,139 @@
 # File Name: ip_utils.py
 # Implements Part 1 of the Computer Networks Lab assignment.
 
+import os
+import socket
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Typecode for an unsigned 32-bit array ('I' is 32 bits on every mainstream
+# platform, fall back to 'L' where it is not).
+UINT32_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+
+# --- Integer API ---
+# These functions work on a single 32-bit int instead of a 32-char string.
+
+def ip_to_int(ip_address: str) -> int:
+    """
+    Converts a dotted-decimal IP address string into a 32-bit integer.
+    
+    For example: "192.168.1.1" -> 3232235777
+    
+    Raises:
+        ValueError: If the string is not a valid dotted-quad IPv4 address.
+    """
+    try:
+        # inet_pton does the strict parsing in C and returns 4 packed bytes
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), 'big')
+    except (OSError, TypeError):
+        raise ValueError(f"Invalid IPv4 address: {ip_address!r}") from None
+
+def int_to_ip(address: int) -> str:
+    """
+    Converts a 32-bit integer back into a dotted-decimal IP address string.
+    
+    For example: 3232235777 -> "192.168.1.1"
+    """
+    if not (0 <= address <= 0xFFFFFFFF):
+        raise ValueError(f"Address out of 32-bit range: {address}")
+    return socket.inet_ntop(socket.AF_INET, address.to_bytes(4, 'big'))
+
+def prefix_mask(prefix_len: int) -> int:
+    """
+    Returns the network mask for a prefix length as an integer.
+    
+    For example: 24 -> 0xFFFFFF00
+    """
+    if not (0 <= prefix_len <= 32):
+        raise ValueError("Prefix length must be between 0 and 32.")
+    return (0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF
+
+def parse_cidr(ip_cidr: str) -> tuple:
+    """
+    Parses a CIDR notation string into integers.
+    
+    For example: "200.23.16.0/23" -> (3356954624, 4294966784, 23)
+    
+    Returns:
+        tuple: (network_int, mask_int, prefix_length). Any host bits set in
+               the address are cleared from network_int.
+    
+    Raises:
+        ValueError: If the CIDR string, address or prefix length is invalid.
+    """
+    ip_address, sep, prefix_len_str = ip_cidr.partition('/')
+    if not sep:
+        raise ValueError("Invalid CIDR format. Must be 'ip/prefix'.")
+
+    try:
+        prefix_len = int(prefix_len_str)
+    except ValueError:
+        raise ValueError("Invalid prefix length.") from None
+
+    mask = prefix_mask(prefix_len)
+    return (ip_to_int(ip_address) & mask, mask, prefix_len)
+
+def _iter_ip_lines(lines):
+    """Yields the address on each non-empty, non-comment line."""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+def parse_ip_list(addresses=None, as_numpy: bool = False, path=None):
+    """
+    Parses many dotted-decimal addresses in one pass.
+    
+    Args:
+        addresses: An iterable of address strings, or a pathlib.Path (any
+                   os.PathLike) of a text file with one address per line
+                   ('#' starts a comment).
+        as_numpy (bool): Return a NumPy uint32 array instead of array('I').
+        path:      The file to read instead of `addresses`, as a str or
+                   os.PathLike.
+    
+    Returns:
+        array('I') (or numpy.ndarray of uint32) with one entry per address.
+    
+    Raises:
+        ValueError: If any address is invalid.
+        TypeError:  If `addresses` is a single str (ambiguous between one
+                    address and a file name).
+    """
+    if path is None and isinstance(addresses, os.PathLike):
+        path = addresses
+    if path is not None:
+        with open(path) as f:
+            parsed = array(UINT32_TYPECODE, map(ip_to_int, _iter_ip_lines(f)))
+    elif isinstance(addresses, str):
+        raise TypeError("parse_ip_list() takes an iterable of addresses: use "
+                        "parse_ip_list([address]) for one address, or path=... for a file.")
+    else:
+        parsed = array(UINT32_TYPECODE, map(ip_to_int, addresses))
+
+    if as_numpy:
+        if np is None:
+            raise ImportError("parse_ip_list(as_numpy=True) requires NumPy.")
+        # Wraps the same buffer, no copy
+        return np.frombuffer(parsed, dtype=np.uint32)
+    return parsed
+
+
+# --- String API (Part 1) ---
+# Thin wrappers over the integer API, so the lab output stays the same.
+
 def ip_to_binary(ip_address: str) -> str:
     """
     Converts a standard dotted-decimal IP address string into a 32-bit binary string.
     
     For example: "192.168.1.1" -> "11000000101010000000000100000001"
     """
-    octets = ip_address.split('.')
-    
-    binary_octets = []
-    for octet_str in octets:
-        octet_int = int(octet_str)
-        
-        binary_str = bin(octet_int)
-        
-        binary_str = binary_str[2:]
-        
-        padded_binary_str = binary_str.zfill(8)
-        
-        binary_octets.append(padded_binary_str)
-        
-    return "".join(binary_octets)
+    return format(ip_to_int(ip_address), '032b')
 
 def get_network_prefix(ip_cidr: str) -> str:
     """
@@ -30,23 +142,11 @@ def get_network_prefix(ip_cidr: str) -> str:
     For example: "200.23.16.0/23" -> "11001000000101110001000"
     """
     try:
-        ip_address, prefix_len_str = ip_cidr.split('/')
-    except ValueError:
-        return "Invalid CIDR format. Must be 'ip/prefix'."
-        
-    try:
-        prefix_len = int(prefix_len_str)
-    except ValueError:
-        return "Invalid prefix length."
-        
-    if not (0 <= prefix_len <= 32):
-        return "Prefix length must be between 0 and 32."
+        network, _, prefix_len = parse_cidr(ip_cidr)
+    except ValueError as e:
+        return str(e)
 
-    full_binary_ip = ip_to_binary(ip_address)
-    
-    network_prefix = full_binary_ip[:prefix_len]
-    
-    return network_prefix
+    return format(network, '032b')[:prefix_len]
 
 # --- Main execution block for testing ---
 if __name__ == "__main__":
@@ -92,4 +192,34 @@ if __name__ == "__main__":
     # /24:  110111110000000100000001
     expected_prefix2 = "110111110000000100000001"
     print(f"Expected:    {expected_prefix2}")
-    print(f"Test Passed: {prefix2 == expected_prefix2}\n")
\ No newline at end of file
+    print(f"Test Passed: {prefix2 == expected_prefix2}\n")
+
+    # Test Case 5: Integer API round trip
+    ip3 = "192.168.1.1"
+    int_ip3 = ip_to_int(ip3)
+    print(f"IP Address:  {ip3}")
+    print(f"Integer:     {int_ip3}")
+    print(f"Expected:    3232235777")
+    print(f"Test Passed: {int_ip3 == 3232235777 and int_to_ip(int_ip3) == ip3}\n")
+
+    # Test Case 6: parse_cidr returns (network, mask, length)
+    cidr3 = "200.23.17.5/23"
+    parsed3 = parse_cidr(cidr3)
+    print(f"CIDR:        {cidr3}")
+    print(f"Parsed:      {parsed3}")
+    expected3 = (ip_to_int("200.23.16.0"), 0xFFFFFE00, 23)
+    print(f"Expected:    {expected3}")
+    print(f"Test Passed: {parsed3 == expected3}\n")
+
+    # Test Case 7: invalid input raises ValueError
+    try:
+        parse_cidr("300.1.1.0/24")
+        print("Test Passed: False\n")
+    except ValueError as e:
+        print(f"Invalid CIDR rejected: {e}")
+        print("Test Passed: True\n")
+
+    # Test Case 8: bulk parser
+    bulk = parse_ip_list(["10.0.0.1", "223.1.1.100", "255.255.255.255"])
+    print(f"Bulk parsed: {bulk.tolist()}")
+    print(f"Test Passed: {bulk.tolist() == [167772161, 3741385060, 4294967295]}\n")
\ No newline at end of file
@@ -0,0 +1,496 @@
+# File Name: lpm.py
+# Longest Prefix Match (LPM) engines used by the Router in router.py (Part 2).
+#
+# Every engine stores routes keyed by an *integer* network address and a
+# prefix length, and maps them to an opaque "hop" value (the Router uses the
+# index of the output link). All engines share the same small interface:
+#
+#   engine.load(entries)          bulk-load (network, length, hop) tuples
+#   engine.insert(network, length, hop)
+#   engine.remove(network, length) -> hop   (KeyError if absent)
+#   engine.get(network, length)    -> hop   (None if absent)
+#   engine.lookup(address) -> hop  (NO_ROUTE when nothing matches)
+#   engine.items()                 iterate (network, length, hop)
+#   engine.shadow()                private working copy for a batch update
+#   engine.publish()               called once the shadow replaces the original
+#   len(engine)                    number of stored prefixes
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+# Returned by every engine when no prefix covers the address.
+NO_ROUTE = -1
+
+# Typecodes for 32-bit unsigned/signed arrays on this platform
+UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+INT32 = 'i' if array('i').itemsize == 4 else 'l'
+
+
+class LinearTable:
+    """
+    Reference engine: the original lab algorithm.
+
+    Routes are kept as binary prefix strings sorted longest-to-shortest, and a
+    lookup scans the table with str.startswith until the first match. The cost
+    grows with the table size, but the logic is simple enough to trust, so it
+    is kept to cross-check the faster engines.
+    """
+    def __init__(self):
+        # List of (binary_prefix, prefix_length, hop), longest prefix first.
+        self.table = []
+
+    def load(self, entries):
+        """Builds the whole table at once (one sort instead of n inserts)."""
+        temp_table = []
+        for (network, length, hop) in entries:
+            binary_prefix = format(network, '032b')[:length]
+            temp_table.append((binary_prefix, length, hop))
+        # Same "CRUCIAL HINT" as the lab: sort by prefix length, descending.
+        self.table = sorted(temp_table, key=lambda item: item[1], reverse=True)
+
+    def insert(self, network: int, length: int, hop):
+        """Adds (or overwrites) one prefix, keeping the table sorted."""
+        binary_prefix = format(network, '032b')[:length]
+        for index, (prefix, prefix_len, _) in enumerate(self.table):
+            if prefix_len == length and prefix == binary_prefix:
+                self.table[index] = (binary_prefix, length, hop)
+                return
+        # insort places the entry after the existing ones of the same length,
+        # which is exactly where the stable sort in load() would have put it.
+        bisect.insort(self.table, (binary_prefix, length, hop),
+                      key=lambda item: -item[1])
+
+    def remove(self, network: int, length: int):
+        binary_prefix = format(network, '032b')[:length]
+        for index, (prefix, prefix_len, hop) in enumerate(self.table):
+            if prefix_len == length and prefix == binary_prefix:
+                del self.table[index]
+                return hop
+        raise KeyError((network, length))
+
+    def get(self, network: int, length: int):
+        binary_prefix = format(network, '032b')[:length]
+        for (prefix, prefix_len, hop) in self.table:
+            if prefix_len == length and prefix == binary_prefix:
+                return hop
+        return None
+
+    def shadow(self):
+        # The reference engine simply copies its list.
+        copy = LinearTable()
+        copy.table = list(self.table)
+        return copy
+
+    def publish(self):
+        pass
+
+    def lookup(self, address: int):
+        binary_address = format(address, '032b')
+        for (binary_prefix, prefix_len, hop) in self.table:
+            if binary_address.startswith(binary_prefix):
+                return hop
+        return NO_ROUTE
+
+    def items(self):
+        for (binary_prefix, prefix_len, hop) in self.table:
+            network = int(binary_prefix, 2) << (32 - prefix_len) if prefix_len else 0
+            yield (network, prefix_len, hop)
+
+    def __len__(self):
+        return len(self.table)
+
+
+class _TrieNode:
+    """
+    One node of the multibit trie, covering `stride` bits of the address.
+
+    The node is an array of 2**stride slots. For each slot we keep:
+      hops[i]     - hop of the longest prefix stored in this node covering slot i
+      lens[i]     - length of that prefix (-1 if none), used during expansion
+      children[i] - the next-level node for addresses falling into slot i
+    `prefixes` remembers the original (network, length) -> hop entries that
+    were expanded into this node, so they can be enumerated again.
+    """
+    __slots__ = ("hops", "lens", "children", "prefixes")
+
+    def __init__(self, size: int):
+        self.hops = [NO_ROUTE] * size
+        self.lens = [-1] * size
+        self.children = [None] * size
+        self.prefixes = {}
+
+    def clone(self):
+        node = _TrieNode.__new__(_TrieNode)
+        node.hops = list(self.hops)
+        node.lens = list(self.lens)
+        node.children = list(self.children)
+        node.prefixes = dict(self.prefixes)
+        return node
+
+
+def _mask(length: int) -> int:
+    return (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+
+
+class MultibitTrie:
+    """
+    Multibit stride trie with controlled prefix expansion (default 16-8-8).
+
+    A prefix whose length falls inside a level is expanded to all the slots of
+    that level it covers, so a lookup reads exactly one slot per level and
+    touches at most len(strides) nodes, whatever the size of the table.
+
+    Updates are proportional to the depth of the prefix: one node per level
+    is walked, plus the expanded slots of the node the prefix ends in.
+
+    A trie is normally updated in place. Each lookup reads a single slot per
+    level, so it sees either the old or the new hop of one route, never a
+    mix. For a batch of updates, shadow() returns a copy-on-write trie that
+    shares every node with the original and clones only the nodes a change
+    touches; swapping it in publishes the whole batch at once.
+    """
+    def __init__(self, strides=(16, 8, 8)):
+        if sum(strides) != 32 or any(stride <= 0 for stride in strides):
+            raise ValueError("Strides must be positive and add up to 32 bits.")
+        self.strides = tuple(strides)
+
+        # Pre-compute, per level: (shift, slot_mask, first_prefix_len,
+        # last_prefix_len). Prefixes of length 0 are stored in the root.
+        levels = []
+        end = 0
+        for stride in self.strides:
+            first_len = end + 1 if end else 0
+            end += stride
+            levels.append((32 - end, (1 << stride) - 1, first_len, end))
+        self._levels = tuple(levels)
+
+        self.root = _TrieNode(1 << self.strides[0])
+        self._size = 0
+
+        # Nodes this trie may modify in place. None means "all of them";
+        # a set means copy-on-write (see shadow()).
+        self._owned = None
+
+    def shadow(self):
+        copy = MultibitTrie.__new__(MultibitTrie)
+        copy.strides = self.strides
+        copy._levels = self._levels
+        copy.root = self.root
+        copy._size = self._size
+        copy._owned = set()
+        return copy
+
+    def publish(self):
+        # Nothing else refers to the nodes this copy has cloned, and the
+        # original it was made from is being dropped: back to in-place mode.
+        self._owned = None
+
+    def _own(self, node):
+        """Returns a version of `node` that may be modified in place."""
+        if self._owned is None or node in self._owned:
+            return node
+        node = node.clone()
+        self._owned.add(node)
+        return node
+
+    def _find(self, network: int, length: int, create: bool = False):
+        """
+        Walks to the node a prefix is stored in. Returns (node, level) or
+        (None, level) if the path does not exist and `create` is False.
+        When creating, every node on the path is made writable.
+        """
+        if create:
+            self.root = self._own(self.root)
+        node = self.root
+        for depth, (shift, slot_mask, _, last_len) in enumerate(self._levels):
+            if length <= last_len:
+                return node, self._levels[depth]
+            i = (network >> shift) & slot_mask
+            child = node.children[i]
+            if create:
+                if child is None:
+                    child = _TrieNode(1 << self.strides[depth + 1])
+                    if self._owned is not None:
+                        self._owned.add(child)
+                    node.children[i] = child
+                else:
+                    writable = self._own(child)
+                    if writable is not child:
+                        node.children[i] = child = writable
+            elif child is None:
+                return None, self._levels[depth]
+            node = child
+
+    def load(self, entries):
+        # Inserting shortest prefixes first means each slot is overwritten
+        # only by progressively longer prefixes during expansion.
+        for (network, length, hop) in sorted(entries, key=lambda item: item[1]):
+            self.insert(network, length, hop)
+
+    def insert(self, network: int, length: int, hop):
+        """
+        Adds (or overwrites) one prefix. `network` must have its host bits
+        cleared (e.g. 223.1.1.0 for 223.1.1.0/24).
+        """
+        # Walk (or grow) the trie down to the level the prefix ends in
+        node, (shift, slot_mask, _, last_len) = self._find(network, length, create=True)
+
+        key = (network, length)
+        if key not in node.prefixes:
+            self._size += 1
+        node.prefixes[key] = hop
+
+        # Expand the prefix over the 2**(last_len - length) slots it covers
+        first = (network >> shift) & slot_mask
+        hops, lens = node.hops, node.lens
+        for i in range(first, first + (1 << (last_len - length))):
+            # Never let a shorter prefix hide a longer one.
+            if lens[i] <= length:
+                hops[i] = hop
+                lens[i] = length
+
+    def remove(self, network: int, length: int):
+        """Removes one prefix and returns its hop. Raises KeyError if absent."""
+        node, _ = self._find(network, length)
+        if node is None or (network, length) not in node.prefixes:
+            raise KeyError((network, length))
+
+        node, (shift, slot_mask, first_len, last_len) = self._find(network, length, create=True)
+        hop = node.prefixes.pop((network, length))
+        self._size -= 1
+
+        # The slots this prefix owned fall back to the longest *shorter*
+        # prefix stored in the same node that covers it, if any. The same
+        # prefix covers the whole span, so it only has to be found once.
+        cover_hop, cover_len = NO_ROUTE, -1
+        for shorter in range(length - 1, first_len - 1, -1):
+            cover = node.prefixes.get((network & _mask(shorter), shorter))
+            if cover is not None:
+                cover_hop, cover_len = cover, shorter
+                break
+
+        first = (network >> shift) & slot_mask
+        hops, lens = node.hops, node.lens
+        for i in range(first, first + (1 << (last_len - length))):
+            # Slots held by a longer prefix are left alone
+            if lens[i] == length:
+                hops[i] = cover_hop
+                lens[i] = cover_len
+        return hop
+
+    def get(self, network: int, length: int):
+        node, _ = self._find(network, length)
+        if node is None:
+            return None
+        return node.prefixes.get((network, length))
+
+    def lookup(self, address: int):
+        node = self.root
+        best = NO_ROUTE
+        for (shift, slot_mask, _, _) in self._levels:
+            i = (address >> shift) & slot_mask
+            hop = node.hops[i]
+            # A match found deeper in the trie is always the longer one.
+            if hop != NO_ROUTE:
+                best = hop
+            node = node.children[i]
+            if node is None:
+                break
+        return best
+
+    def items(self):
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for (network, length), hop in node.prefixes.items():
+                yield (network, length, hop)
+            stack.extend(child for child in node.children if child is not None)
+
+    def __len__(self):
+        return self._size
+
+
+def compile_ranges(entries):
+    """
+    Flattens a set of (network, length, hop) prefixes into disjoint address
+    ranges, for the vectorized lookup in Router.route_many.
+
+    Nested prefixes are resolved once here, so that afterwards the hop of an
+    address is simply the hop of the last range starting at or before it:
+
+        starts[i] <= address < starts[i + 1]  ->  hops[i]
+
+    Returns:
+        (starts, hops): two lists of equal length, starts[0] == 0 and
+        sorted ascending; uncovered space maps to NO_ROUTE.
+    """
+    starts = [0]
+    hops = [NO_ROUTE]
+
+    def emit(position, hop):
+        if position > 0xFFFFFFFF:
+            return
+        if starts[-1] == position:
+            # A longer prefix starting at the same address wins.
+            hops[-1] = hop
+        elif hops[-1] != hop:
+            starts.append(position)
+            hops.append(hop)
+
+    # Enclosing (shorter) prefixes sort before the prefixes they contain.
+    stack = []   # (last_address, hop) of the prefixes we are currently inside
+    for (network, length, hop) in sorted(entries, key=lambda item: (item[0], item[1])):
+        while stack and stack[-1][0] < network:
+            last, _ = stack.pop()
+            emit(last + 1, stack[-1][1] if stack else NO_ROUTE)
+        emit(network, hop)
+        stack.append((network + (1 << (32 - length)) - 1, hop))
+    while stack:
+        last, _ = stack.pop()
+        emit(last + 1, stack[-1][1] if stack else NO_ROUTE)
+
+    return starts, hops
+
+
+class RangeTable:
+    """
+    Read-only engine over a flattened range table (see compile_ranges),
+    typically backed by a memory-mapped snapshot file.
+
+    `starts`/`hops` (and the original prefixes, kept for items()) can be any
+    indexable sequences - lists, arrays or memoryviews into an mmap - so a
+    snapshot is used in place, without being parsed or copied. A lookup is
+    a binary search over `starts`.
+    """
+    def __init__(self, starts, hops, networks, lengths, prefix_hops):
+        self.starts = starts
+        self.hops = hops
+        self._networks = networks
+        self._lengths = lengths
+        self._prefix_hops = prefix_hops
+
+    def lookup(self, address: int):
+        return self.hops[bisect.bisect_right(self.starts, address) - 1]
+
+    def items(self):
+        return zip(self._networks, self._lengths, self._prefix_hops)
+
+    def __len__(self):
+        return len(self._networks)
+
+    def _read_only(self, *args):
+        raise RuntimeError("A snapshot table is read-only; build a Router "
+                           "from routes to update it.")
+
+    get = insert = remove = shadow = load = _read_only
+
+
+# --- Snapshot files ---
+#
+# A snapshot is the compiled range table plus the original prefixes and the
+# link names, laid out so every section can be used straight from an mmap:
+#
+#   header   32 bytes: magic, format version, flags, #ranges, #prefixes,
+#                      size of the link names, CRC-32 of everything after it
+#   starts   uint32 x #ranges
+#   hops     int32  x #ranges
+#   networks uint32 x #prefixes
+#   p_hops   int32  x #prefixes
+#   lengths  uint8  x #prefixes, padded to a multiple of 4 bytes
+#   links    UTF-8 JSON list of output link names
+#
+# Integers are stored in the byte order of the host that wrote the file; the
+# flags record it and a host with the other byte order rejects the file.
+
+SNAPSHOT_MAGIC = b"LPMSNAP\0"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<8sIIIIII")
+_FLAG_BIG_ENDIAN = 0x1
+
+
+def write_snapshot(path: str, entries, links: list):
+    """
+    Compiles (network, length, hop) entries and writes them to `path`.
+
+    The file is written next to its final name and renamed into place, so
+    a process loading the snapshot never sees a half-written file.
+    """
+    entries = sorted(entries)
+    starts, hops = compile_ranges(entries)
+
+    body = bytearray()
+    body += array(UINT32, starts).tobytes()
+    body += array(INT32, hops).tobytes()
+    body += array(UINT32, (network for (network, _, _) in entries)).tobytes()
+    body += array(INT32, (hop for (_, _, hop) in entries)).tobytes()
+    body += bytes(length for (_, length, _) in entries)
+    body += bytes(-len(entries) % 4)
+    links_blob = json.dumps(links).encode("utf-8")
+    body += links_blob
+
+    flags = _FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0
+    header = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags,
+                                   len(starts), len(entries), len(links_blob),
+                                   zlib.crc32(body))
+
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path: str, verify: bool = True):
+    """
+    Maps a snapshot file read-only and returns (RangeTable, links).
+
+    Raises:
+        ValueError: If the file is not a snapshot, was written by another
+                    format version or byte order, or (with verify=True)
+                    fails its checksum.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mm) < _SNAPSHOT_HEADER.size:
+        raise ValueError(f"{path}: too short to be an LPM snapshot.")
+    (magic, version, flags, num_ranges, num_prefixes,
+     links_size, checksum) = _SNAPSHOT_HEADER.unpack_from(mm)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path}: not an LPM snapshot.")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: snapshot format version {version} is not "
+                         f"supported (expected {SNAPSHOT_VERSION}).")
+    if bool(flags & _FLAG_BIG_ENDIAN) != (sys.byteorder == "big"):
+        raise ValueError(f"{path}: snapshot was written with another byte order.")
+
+    pad = -num_prefixes % 4
+    expected_size = (_SNAPSHOT_HEADER.size + 8 * num_ranges
+                     + 9 * num_prefixes + pad + links_size)
+    if len(mm) != expected_size:
+        raise ValueError(f"{path}: snapshot is truncated or corrupt "
+                         f"({len(mm)} bytes, expected {expected_size}).")
+
+    view = memoryview(mm)
+    if verify and zlib.crc32(view[_SNAPSHOT_HEADER.size:]) != checksum:
+        raise ValueError(f"{path}: snapshot checksum mismatch.")
+
+    def section(offset, count, fmt, itemsize):
+        return view[offset:offset + count * itemsize].cast(fmt), offset + count * itemsize
+
+    offset = _SNAPSHOT_HEADER.size
+    starts, offset = section(offset, num_ranges, UINT32, 4)
+    hops, offset = section(offset, num_ranges, INT32, 4)
+    networks, offset = section(offset, num_prefixes, UINT32, 4)
+    prefix_hops, offset = section(offset, num_prefixes, INT32, 4)
+    lengths, offset = section(offset, num_prefixes, "B", 1)
+    offset += pad
+    links = json.loads(bytes(view[offset:offset + links_size]).decode("utf-8"))
+
+    return RangeTable(starts, hops, networks, lengths, prefix_hops), links
@@ -1,9 +1,15 @@
 # File Name: router.py
 # Implements Part 2 of the Computer Networks Lab assignment.
 
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
 # We must import the helper functions from Part 1
 try:
-    from ip_utils import ip_to_binary, get_network_prefix
+    from ip_utils import ip_to_int, parse_cidr, prefix_mask
 except ImportError:
     print("\n--- ERROR ---")
     print("Could not find 'ip_utils.py' in the same directory.")
@@ -11,12 +17,123 @@ except ImportError:
     print("-------------\n")
     exit()
 
+# The lookup engines live in their own module next to this one
+try:
+    from lpm import (NO_ROUTE, LinearTable, MultibitTrie, RangeTable,
+                     compile_ranges, read_snapshot, write_snapshot)
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find 'lpm.py' in the same directory.")
+    print("Please make sure 'lpm.py' is present before running 'router.py'.")
+    print("-------------\n")
+    exit()
+
+# NumPy is only needed for the batch API (Router.route_many)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Selectable LPM engines. "linear" is the original lab algorithm and is kept
+# as the reference implementation to cross-check the trie against.
+ENGINES = {
+    "trie": MultibitTrie,
+    "linear": LinearTable,
+}
+
+class FlowCache:
+    """
+    A bounded LRU cache of destination address -> output link index, placed
+    in front of the LPM engine so that hot destinations skip the lookup.
+    
+    Entries must be invalidated when a route covering them changes; see
+    invalidate(). Cached destinations are also indexed by their /24, so an
+    invalidation only visits the buckets under the changed prefix instead of
+    the whole cache. The cache is not thread-safe by itself: the router
+    serialises every access with its `_cache_lock`. The counters are plain
+    attributes and may be read at any time.
+    """
+    BUCKET_BITS = 24
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Cache capacity must be a positive number of entries.")
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._buckets = {}      # dest >> 8 (its /24) -> set of cached dests
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, dest: int):
+        """Returns the cached link index for `dest`, or None on a miss."""
+        link_id = self._entries.get(dest)
+        if link_id is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(dest)
+        self.hits += 1
+        return link_id
+
+    def put(self, dest: int, link_id: int):
+        entries = self._entries
+        if dest not in entries:
+            self._buckets.setdefault(dest >> (32 - self.BUCKET_BITS), set()).add(dest)
+        entries[dest] = link_id
+        if len(entries) > self.capacity:
+            old, _ = entries.popitem(last=False)
+            self._unindex(old)
+            self.evictions += 1
+
+    def _unindex(self, dest: int):
+        key = dest >> (32 - self.BUCKET_BITS)
+        bucket = self._buckets[key]
+        bucket.discard(dest)
+        if not bucket:
+            del self._buckets[key]
+
+    def invalidate(self, network: int, prefix_length: int):
+        """Drops every cached destination inside network/prefix_length."""
+        shift = 32 - self.BUCKET_BITS
+        if prefix_length >= self.BUCKET_BITS:
+            keys = [network >> shift]
+        else:
+            # The prefix spans a range of buckets: walk the range or the
+            # existing buckets, whichever is shorter
+            first = network >> shift
+            last = first + (1 << (self.BUCKET_BITS - prefix_length))
+            if last - first <= len(self._buckets):
+                keys = range(first, last)
+            else:
+                keys = [key for key in self._buckets if first <= key < last]
+
+        mask = prefix_mask(prefix_length)
+        stale = []
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket:
+                stale.extend(dest for dest in bucket if dest & mask == network)
+        for dest in stale:
+            del self._entries[dest]
+            self._unindex(dest)
+        self.invalidations += len(stale)
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._buckets.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
 class Router:
     """
     Implements a router with a forwarding table that uses the
     Longest Prefix Match (LPM) algorithm.
     """
-    def __init__(self, routes: list):
+    def __init__(self, routes: list, engine: str = "trie", cache_size: int = 0):
         """
         Initializes the router with a list of routes.
         
@@ -24,43 +141,304 @@ class Router:
             routes (list): A list of tuples, where each tuple contains
                            a CIDR prefix string and an output link string.
                            e.g., [("223.1.1.0/24", "Link 0"), ...]
+            engine (str):  The LPM engine to use: "trie" (multibit 16-8-8
+                           trie, the default) or "linear" (the original
+                           sorted-list scan, kept as a reference).
+            cache_size (int): Number of destinations kept in the LRU flow
+                              cache in front of the engine (0 disables it).
         """
-        # This list will store our "optimized" forwarding table
-        self.forwarding_table = []
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown LPM engine '{engine}'. "
+                             f"Choose one of: {', '.join(ENGINES)}")
+        self._setup(engine, ENGINES[engine](), [], cache_size)
         
         # Call the helper method to process the routes as required [cite: 34]
         self._build_forwarding_table(routes)
 
+    def _setup(self, engine: str, table, links: list, cache_size: int):
+        """Initializes the router state around an (already created) engine."""
+        self.engine = engine
+
+        # Output links are stored once; the engine only keeps their index.
+        self.links = list(links)
+        self._link_ids = {link: link_id for link_id, link in enumerate(self.links)}
+
+        self._table = table
+
+        # Flattened (version, starts, hops) arrays for route_many, built lazily
+        self._ranges = None
+
+        # Writers (route updates, batches) are serialised by this lock.
+        # Lookups never take it: they read `self._table` once and work on
+        # that object, and a batch only swaps in a new one when complete.
+        self._lock = threading.RLock()
+        self._batch = None
+        self._batch_changes = []
+        self._version = 0
+
+        # Optional flow cache. Every cache access holds `_cache_lock`, which
+        # also orders fills against invalidations so a lookup racing an
+        # update never caches a stale hop.
+        self.cache = FlowCache(cache_size) if cache_size else None
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def load_snapshot(cls, path: str, cache_size: int = 0, verify: bool = True):
+        """
+        Creates a read-only router from a snapshot written by save_snapshot.
+        
+        The file is memory-mapped and used in place: nothing is parsed or
+        copied, so start-up is fast and all processes loading the same file
+        share one copy of it in the page cache.
+        
+        Args:
+            path (str): The snapshot file.
+            cache_size (int): Size of the flow cache (0 disables it).
+            verify (bool): Check the CRC-32 of the file (reads it once).
+            
+        Raises:
+            ValueError: If the snapshot is corrupt, truncated or was written
+                        by an incompatible format version.
+        """
+        table, links = read_snapshot(path, verify=verify)
+        router = cls.__new__(cls)
+        router._setup("snapshot", table, links, cache_size)
+        return router
+
+    def save_snapshot(self, path: str):
+        """
+        Writes the compiled forwarding table to `path` (see load_snapshot).
+        """
+        with self._lock:
+            entries = list(self._table.items())
+        write_snapshot(path, entries, self.links)
+
+    def _link_id(self, output_link: str) -> int:
+        """Returns the index of an output link, registering it if new."""
+        link_id = self._link_ids.get(output_link)
+        if link_id is None:
+            link_id = len(self.links)
+            self.links.append(output_link)
+            self._link_ids[output_link] = link_id
+        return link_id
+
     def _build_forwarding_table(self, routes: list):
         """
         A private method to process the human-readable routes list into
         an internal format optimized for LPM.
         
-        The internal table will store tuples of:
-        (binary_prefix, prefix_length, output_link)
+        Every route is reduced to (network_int, prefix_length, link_id)
+        and handed to the selected engine in a single bulk load.
         """
         print("Building forwarding table...")
-        temp_table = []
+        # Keyed by (network, length) so a repeated prefix keeps its last link
+        entries = {}
         for (cidr_prefix, output_link) in routes:
-            # 1. Convert the CIDR prefix (e.g., "223.1.1.0/24") into
-            #    its binary prefix (e.g., "110111110000000100000001") [cite: 38]
-            binary_prefix = get_network_prefix(cidr_prefix)
-            
-            # 2. Get the length of that binary prefix (e.g., 24)
-            prefix_length = len(binary_prefix)
+            # 1. Convert the CIDR prefix (e.g., "223.1.1.0/24") into its
+            #    integer network address and prefix length (e.g., 24) [cite: 38]
+            network, _, prefix_length = parse_cidr(cidr_prefix)
             
-            # 3. Store this processed information
-            temp_table.append((binary_prefix, prefix_length, output_link))
-        
-        # 4. **CRUCIAL HINT:** Sort the table by prefix length in
-        #    DESCENDING order (longest to shortest).
-        #    We use a lambda function to tell `sorted` to use the
-        #    second element of our tuple (prefix_length) as the sort key.
-        self.forwarding_table = sorted(temp_table, 
-                                       key=lambda item: item[1], 
-                                       reverse=True)
+            # 2. Store this processed information
+            entries[(network, prefix_length)] = self._link_id(output_link)
+        
+        self._table.load((network, length, link_id)
+                         for (network, length), link_id in entries.items())
         print("Forwarding table built and sorted.")
 
+    @property
+    def forwarding_table(self) -> list:
+        """
+        The internal table as (binary_prefix, prefix_length, output_link)
+        tuples, sorted longest-to-shortest. Built on demand for inspection.
+        """
+        table = []
+        with self._lock:
+            items = list(self._table.items())
+        for (network, length, link_id) in items:
+            table.append((format(network, '032b')[:length], length, self.links[link_id]))
+        table.sort(key=lambda item: (-item[1], item[0]))
+        return table
+
+    def lookup(self, dest: int) -> int:
+        """
+        Longest Prefix Match on an integer destination address.
+        
+        Returns:
+            int: The index of the output link in `self.links`, or
+                 NO_ROUTE (-1) if no prefix matches.
+        """
+        cache = self.cache
+        if cache is None:
+            return self._table.lookup(dest)
+
+        with self._cache_lock:
+            link_id = cache.get(dest)
+        if link_id is None:
+            version = self._version
+            link_id = self._table.lookup(dest)
+            with self._cache_lock:
+                # Only cache the answer if no update happened meanwhile
+                if version == self._version:
+                    cache.put(dest, link_id)
+        return link_id
+
+    def cache_stats(self):
+        """
+        Returns the flow cache counters as a dict, or None if the cache is off.
+        """
+        cache = self.cache
+        if cache is None:
+            return None
+        lookups = cache.hits + cache.misses
+        return {
+            "size": len(cache),
+            "capacity": cache.capacity,
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "evictions": cache.evictions,
+            "invalidations": cache.invalidations,
+            "hit_rate": cache.hits / lookups if lookups else 0.0,
+        }
+
+    def route_many(self, dests):
+        """
+        Batch Longest Prefix Match over many integer destinations at once.
+        
+        The prefixes are flattened (once, then cached) into sorted disjoint
+        address ranges, so the whole batch is resolved by a single vectorized
+        binary search (numpy.searchsorted) instead of a Python loop. This
+        needs only two arrays the size of the table, unlike a DIR-24-8 style
+        direct table which always costs 2**24 entries.
+        
+        Args:
+            dests: uint32 destinations (NumPy array, array('I') or any
+                   sequence of ints), e.g. from ip_utils.parse_ip_list.
+            
+        Returns:
+            numpy.ndarray: int32 link indices into `self.links`, with
+                           NO_ROUTE (-1) where no prefix matches.
+        """
+        if np is None:
+            raise ImportError("Router.route_many requires NumPy.")
+
+        ranges = self._ranges
+        if ranges is None or ranges[0] != self._version:
+            with self._lock:
+                table = self._table
+                if isinstance(table, RangeTable):
+                    # A snapshot is already flattened: wrap it, no copy
+                    starts, hops = table.starts, table.hops
+                else:
+                    starts, hops = compile_ranges(table.items())
+                ranges = (self._version,
+                          np.asarray(starts, dtype=np.uint32),
+                          np.asarray(hops, dtype=np.int32))
+                self._ranges = ranges
+        _, starts, hops = ranges
+
+        dests = np.asarray(dests, dtype=np.uint32)
+        return hops[np.searchsorted(starts, dests, side='right') - 1]
+
+    # --- Incremental updates ---
+
+    def add_route(self, cidr_prefix: str, output_link: str):
+        """
+        Adds a single route without rebuilding the table.
+        
+        Raises:
+            ValueError: If the CIDR is invalid or the prefix already has a
+                        route (use replace_route to change it).
+        """
+        network, _, prefix_length = parse_cidr(cidr_prefix)
+        with self._lock:
+            table = self._writable_table()
+            if table.get(network, prefix_length) is not None:
+                raise ValueError(f"Route for {cidr_prefix} already exists.")
+            table.insert(network, prefix_length, self._link_id(output_link))
+            self._updated(network, prefix_length)
+
+    def withdraw_route(self, cidr_prefix: str) -> str:
+        """
+        Removes a single route and returns the output link it pointed to.
+        
+        Raises:
+            KeyError: If there is no route for this prefix.
+        """
+        network, _, prefix_length = parse_cidr(cidr_prefix)
+        with self._lock:
+            try:
+                link_id = self._writable_table().remove(network, prefix_length)
+            except KeyError:
+                raise KeyError(f"No route for {cidr_prefix}.") from None
+            self._updated(network, prefix_length)
+        return self.links[link_id]
+
+    def replace_route(self, cidr_prefix: str, output_link: str) -> str:
+        """
+        Points an existing route at a new output link and returns the old one.
+        
+        Raises:
+            KeyError: If there is no route for this prefix.
+        """
+        network, _, prefix_length = parse_cidr(cidr_prefix)
+        with self._lock:
+            table = self._writable_table()
+            old_link_id = table.get(network, prefix_length)
+            if old_link_id is None:
+                raise KeyError(f"No route for {cidr_prefix}.")
+            table.insert(network, prefix_length, self._link_id(output_link))
+            self._updated(network, prefix_length)
+        return self.links[old_link_id]
+
+    @contextmanager
+    def batch(self):
+        """
+        Applies several updates atomically:
+        
+            with router.batch():
+                router.withdraw_route("223.1.1.0/24")
+                router.add_route("223.1.1.0/25", "Link 5")
+        
+        Updates inside the block go to a private copy-on-write version of the
+        table, which replaces the live one in a single step when the block
+        exits. Concurrent lookups see either none or all of the batch. If the
+        block raises, the whole batch is discarded.
+        """
+        with self._lock:
+            if self._batch is not None:
+                raise RuntimeError("Router batches cannot be nested.")
+            self._batch = self._table.shadow()
+            try:
+                yield self
+                self._batch.publish()
+                self._table = self._batch
+                self._bump_version(self._batch_changes)
+            finally:
+                self._batch = None
+                self._batch_changes = []
+
+    def _writable_table(self):
+        """The table updates go to: the open batch, or the live table."""
+        return self._batch if self._batch is not None else self._table
+
+    def _updated(self, network: int, prefix_length: int):
+        """Bookkeeping after a single update (deferred inside a batch)."""
+        if self._batch is not None:
+            self._batch_changes.append((network, prefix_length))
+        else:
+            self._bump_version([(network, prefix_length)])
+
+    def _bump_version(self, changes: list):
+        """
+        Marks the live table as changed: cached range arrays become stale and
+        cached destinations covered by a changed prefix are dropped.
+        """
+        with self._cache_lock:
+            self._version += 1
+            if self.cache is not None:
+                for (network, prefix_length) in changes:
+                    self.cache.invalidate(network, prefix_length)
+
     def route_packet(self, dest_ip: str) -> str:
         """
         Performs the Longest Prefix Match algorithm to find the
@@ -71,23 +449,20 @@ class Router:
             
         Returns:
             str: The corresponding output link string or a default route.
+        
+        Raises:
+            ValueError: If dest_ip is not a valid IPv4 address.
         """
         
-        # (a) Convert the destination IP to its 32-bit binary representation [cite: 44]
-        binary_dest_ip = ip_to_binary(dest_ip)
+        # (a) Convert the destination IP to its 32-bit integer representation [cite: 44]
+        dest = ip_to_int(dest_ip)
         
-        # (b) Iterate through the sorted internal forwarding table [cite: 45]
-        for (binary_prefix, prefix_len, output_link) in self.forwarding_table:
-            
-            # (c) Check if the binary destination IP *starts with* the binary prefix [cite: 46]
-            #     This is the core prefix match logic.
-            if binary_dest_ip.startswith(binary_prefix):
+        # (b) Let the engine find the longest matching prefix [cite: 45-48]
+        link_id = self.lookup(dest)
+        if link_id != NO_ROUTE:
+            return self.links[link_id]
                 
-                # (d) The first match IS the longest match because we sorted the table.
-                #     Return the corresponding output link immediately. [cite: 47, 48]
-                return output_link
-                
-        # (e) If the loop finishes with no matches, return the default route [cite: 49]
+        # (c) If nothing matches, return the default route [cite: 49]
         return "Default Gateway"
 
 
@@ -104,12 +479,14 @@ if __name__ == "__main__":
         ("223.1.0.0/16", "Link 4 (ISP)")
     ]
     
-    # 2. Initialize the Router
+    # 2. Initialize the Router (trie engine) and a reference router that
+    #    uses the original linear scan, so the two can be cross-checked
     my_router = Router(routes_list)
+    reference_router = Router(routes_list, engine="linear")
 
     # (Optional) Print the sorted internal table to verify the hint
     print("\n--- Internal Forwarding Table (Sorted Longest-to-Shortest) ---")
-    for (prefix, length, link) in my_router.forwarding_table:
+    for (prefix, length, link) in reference_router.forwarding_table:
         print(f"  Prefix: {prefix:<24} (Len: {length}) -> {link}")
     print("---------------------------------------------------------------")
 
@@ -135,4 +512,47 @@ if __name__ == "__main__":
     # Test 4: Should match nothing
     ip_4 = "198.51.100.1"
     link_4 = my_router.route_packet(ip_4)
-    print(f"Routing '{ip_4}':\t -> {link_4} (Expected: Default Gateway)") # [cite: 59]
\ No newline at end of file
+    print(f"Routing '{ip_4}':\t -> {link_4} (Expected: Default Gateway)") # [cite: 59]
+
+    # 4. Cross-check the trie against the reference engine
+    print("\n--- Cross-checking trie engine against linear engine ---")
+    test_ips = [ip_1, ip_2, ip_3, ip_4, "223.1.3.255", "223.1.0.0", "223.2.0.1"]
+    agree = all(my_router.route_packet(ip) == reference_router.route_packet(ip)
+                for ip in test_ips)
+    print(f"Engines agree on {len(test_ips)} addresses: {agree}")
+
+    # 5. Incremental updates, without rebuilding the table
+    print("\n--- Testing incremental route updates ---")
+    my_router.add_route("223.1.250.0/24", "Link 3")
+    print(f"After add_route 223.1.250.0/24:      {ip_3} -> {my_router.route_packet(ip_3)} (Expected: Link 3)")
+    my_router.replace_route("223.1.250.0/24", "Link 5")
+    print(f"After replace_route 223.1.250.0/24:  {ip_3} -> {my_router.route_packet(ip_3)} (Expected: Link 5)")
+    my_router.withdraw_route("223.1.250.0/24")
+    print(f"After withdraw_route 223.1.250.0/24: {ip_3} -> {my_router.route_packet(ip_3)} (Expected: Link 4 (ISP))")
+
+    with my_router.batch():
+        my_router.withdraw_route("223.1.1.0/24")
+        my_router.add_route("223.1.1.0/25", "Link 6")
+        # Nothing is visible until the batch completes
+        during = my_router.route_packet(ip_1)
+    after = my_router.route_packet(ip_1)
+    print(f"Batch update: {ip_1} -> {during} during, {after} after (Expected: Link 0, Link 6)")
+
+    # 6. Flow cache in front of the engine
+    print("\n--- Testing flow cache ---")
+    cached_router = Router(routes_list, cache_size=2)
+    for ip in [ip_1, ip_1, ip_2, ip_1, ip_3]:
+        cached_router.route_packet(ip)
+    cached_router.add_route("223.1.1.0/25", "Link 7")
+    print(f"After add_route 223.1.1.0/25: {ip_1} -> {cached_router.route_packet(ip_1)} (Expected: Link 7)")
+    print(f"Cache stats: {cached_router.cache_stats()}")
+
+    # 7. Snapshot: save the compiled table and map it back in
+    print("\n--- Testing forwarding table snapshot ---")
+    snapshot_path = os.path.join(tempfile.gettempdir(), "router_snapshot.lpm")
+    reference_router.save_snapshot(snapshot_path)
+    snapshot_router = Router.load_snapshot(snapshot_path)
+    agree = all(snapshot_router.route_packet(ip) == reference_router.route_packet(ip)
+                for ip in test_ips)
+    print(f"Snapshot router agrees on {len(test_ips)} addresses: {agree}")
+    os.remove(snapshot_path)
\ No newline at end of file
@@ -1,8 +1,20 @@
 # File Name: scheduler.py
 # Implements Part 3 of the Computer Networks Lab assignment.
 
+import heapq
+from array import array
+from collections import deque
 from dataclasses import dataclass
 
+try:
+    from ip_utils import UINT32_TYPECODE, int_to_ip, ip_to_int
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find 'ip_utils.py' in the same directory.")
+    print("Please make sure 'ip_utils.py' is present before running 'scheduler.py'.")
+    print("-------------\n")
+    exit()
+
 # 1. Class: Packet [cite: 65]
 # Using a dataclass is a clean, modern way to
 # implement this simple data container.
@@ -16,6 +28,84 @@ class Packet:
     payload: str     # [cite: 69]
     priority: int    # [cite: 70] (0=High, 1=Medium, 2=Low)
 
+
+# Compact representations for large queues. A regular dataclass instance
+# carries a __dict__ and two address strings; these do not.
+@dataclass(slots=True)
+class CompactPacket:
+    """
+    A Packet with __slots__ (no per-instance __dict__), integer addresses
+    and a bytes payload. Works with every scheduler in this file.
+    """
+    source_ip: int
+    dest_ip: int
+    payload: bytes
+    priority: int
+
+    @classmethod
+    def from_packet(cls, packet: Packet) -> "CompactPacket":
+        return cls(ip_to_int(packet.source_ip), ip_to_int(packet.dest_ip),
+                   packet.payload.encode(), packet.priority)
+
+
+class PacketBatch:
+    """
+    Columnar (struct-of-arrays) storage for many packets:
+    
+        src[i], dst[i]   uint32 addresses          (array('I'))
+        priority[i]      uint8 priority class       (array('B'))
+        payload          one shared bytearray; packet i's payload is
+                         payload[offsets[i]:offsets[i + 1]]
+    
+    A packet costs 9 bytes plus its payload and an 8-byte offset, instead
+    of a Python object per packet. Schedulers consume a batch directly with
+    `scheduler.enqueue_batch(batch)` (they then hand back packet indices),
+    and the router routes a whole batch with `router.route_many(batch.dst)`.
+    """
+    __slots__ = ("src", "dst", "priority", "offsets", "payload")
+
+    def __init__(self):
+        self.src = array(UINT32_TYPECODE)
+        self.dst = array(UINT32_TYPECODE)
+        self.priority = array('B')
+        self.offsets = array('Q', [0])
+        self.payload = bytearray()
+
+    @classmethod
+    def from_packets(cls, packets) -> "PacketBatch":
+        """Builds a batch from Packet or CompactPacket objects."""
+        batch = cls()
+        for packet in packets:
+            if isinstance(packet, Packet):
+                packet = CompactPacket.from_packet(packet)
+            batch.append(packet.source_ip, packet.dest_ip, packet.payload, packet.priority)
+        return batch
+
+    def append(self, source_ip: int, dest_ip: int, payload: bytes, priority: int):
+        self.src.append(source_ip)
+        self.dst.append(dest_ip)
+        self.priority.append(priority)
+        self.payload += payload
+        self.offsets.append(len(self.payload))
+
+    def size(self, index: int) -> int:
+        """Payload length of packet `index`."""
+        return self.offsets[index + 1] - self.offsets[index]
+
+    def __len__(self):
+        return len(self.src)
+
+    def __getitem__(self, index: int) -> CompactPacket:
+        """Materializes one packet (only meant for inspection/printing)."""
+        payload = bytes(self.payload[self.offsets[index]:self.offsets[index + 1]])
+        return CompactPacket(self.src[index], self.dst[index], payload, self.priority[index])
+
+    def to_packet(self, index: int) -> Packet:
+        """Converts packet `index` back to the lab's Packet format."""
+        packet = self[index]
+        return Packet(int_to_ip(packet.source_ip), int_to_ip(packet.dest_ip),
+                      packet.payload.decode(), packet.priority)
+
 # 2. Function: fifo_scheduler [cite: 71]
 def fifo_scheduler(packet_list: list) -> list:
     """
@@ -37,12 +127,270 @@ def priority_scheduler(packet_list: list) -> list:
     Input: A list of Packet objects that have arrived at the queue. [cite: 78]
     Output: A new list of Packet objects, ordered by priority (lower number first). [cite: 79-80]
     """
-    # We can use Python's built-in `sorted` function.
-    # We provide a `key` to tell `sorted` to use the 'priority'
-    # attribute of each Packet object for comparison.
-    # The default sort is ascending (0, 1, 2), which is exactly
-    # what we need for (High, Medium, Low) priority.
-    return sorted(packet_list, key=lambda packet: packet.priority)
+    # Instead of sorting every packet, we push them through the streaming
+    # PriorityScheduler below: one FIFO queue per priority class, so packets
+    # of equal priority keep their arrival order (exactly like the stable
+    # sort used to). Priorities can be any sortable values, so the distinct
+    # ones are mapped to dense class indexes first.
+    if not packet_list:
+        return []
+    classes = {p: i for i, p in enumerate(sorted({packet.priority for packet in packet_list}))}
+    scheduler = PriorityScheduler(len(classes))
+    for packet in packet_list:
+        scheduler.push(packet, classes[packet.priority], len(packet.payload))
+    return list(scheduler.drain())
+
+
+# --- Streaming schedulers ---
+# The functions above take the whole batch of packets at once. The classes
+# below accept packets one at a time (enqueue) and release them one at a
+# time (dequeue), so they can sit behind a live stream of arrivals.
+
+class _StreamingScheduler:
+    """
+    Common helpers for the streaming schedulers.
+    
+    Subclasses implement push(item, cls, size), dequeue() and __len__.
+    push() is the low-level entry point: `item` is whatever dequeue()
+    should hand back (a packet object, a packet index when a PacketBatch is
+    enqueued, or any record a simulator wants to track), and the class and
+    size are given explicitly instead of being read from a packet.
+    """
+
+    def enqueue(self, packet):
+        """Queues a Packet or CompactPacket (class = its priority)."""
+        self.push(packet, packet.priority, len(packet.payload))
+
+    def enqueue_batch(self, batch: PacketBatch):
+        """
+        Queues every packet of a PacketBatch straight from its columns.
+        dequeue() then returns packet indices into the batch.
+        """
+        priority, offsets = batch.priority, batch.offsets
+        for index in range(len(batch)):
+            self.push(index, priority[index], offsets[index + 1] - offsets[index])
+
+    def drain(self):
+        """Yields every queued packet in send order until the queue is empty."""
+        packet = self.dequeue()
+        while packet is not None:
+            yield packet
+            packet = self.dequeue()
+
+    def serve(self, arrivals, departures_per_arrival: float = 1.0):
+        """
+        Drives the scheduler from an iterator of arriving packets.
+        
+        The output link sends `departures_per_arrival` packets per arrival
+        on average (e.g. 0.5 = one packet sent for every two that arrive);
+        once the arrivals run out the remaining backlog is drained. Only the
+        backlog is held in memory, never the whole stream.
+        
+        Yields:
+            Packet: The packets in the order they are sent.
+        """
+        credit = 0.0
+        for packet in arrivals:
+            self.enqueue(packet)
+            credit += departures_per_arrival
+            while credit >= 1.0:
+                sent = self.dequeue()
+                if sent is None:
+                    # An idle link cannot save up capacity for later
+                    credit = 0.0
+                    break
+                credit -= 1.0
+                yield sent
+        yield from self.drain()
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+class FifoScheduler(_StreamingScheduler):
+    """Streaming First-Come, First-Served scheduler."""
+
+    def __init__(self):
+        self._queue = deque()
+
+    def push(self, item, cls: int, size: int):
+        self._queue.append(item)
+
+    def dequeue(self):
+        """Returns the next packet to send, or None if the queue is empty."""
+        return self._queue.popleft() if self._queue else None
+
+    def __len__(self):
+        return len(self._queue)
+
+
+class PriorityScheduler(_StreamingScheduler):
+    """
+    Streaming strict-priority scheduler for a fixed number of classes.
+    
+    Each priority class has its own FIFO queue, and a bitmask records which
+    queues are non-empty, so both enqueue and dequeue are O(1). Packets of
+    the same priority leave in arrival order.
+    """
+
+    def __init__(self, num_classes: int = 3):
+        if num_classes <= 0:
+            raise ValueError("A priority scheduler needs at least one class.")
+        self.num_classes = num_classes
+        self._queues = [deque() for _ in range(num_classes)]
+        self._active = 0    # bit p is set while queue p is non-empty
+        self._length = 0
+
+    def push(self, item, priority: int, size: int):
+        if not (0 <= priority < self.num_classes):
+            raise ValueError(f"Priority {priority} is outside 0..{self.num_classes - 1}.")
+        self._queues[priority].append(item)
+        self._active |= 1 << priority
+        self._length += 1
+
+    def dequeue(self):
+        """Returns the next packet to send, or None if the queue is empty."""
+        active = self._active
+        if not active:
+            return None
+        # Lowest set bit = highest priority (lowest number) with packets
+        priority = (active & -active).bit_length() - 1
+        queue = self._queues[priority]
+        packet = queue.popleft()
+        if not queue:
+            self._active = active & ~(1 << priority)
+        self._length -= 1
+        return packet
+
+    def __len__(self):
+        return self._length
+
+
+class WFQScheduler(_StreamingScheduler):
+    """
+    Streaming Weighted Fair Queuing scheduler.
+    
+    Every packet gets a virtual finish time when it arrives:
+    
+        finish = max(virtual_time, last finish of its class) + size / weight
+    
+    and packets are sent in order of finish time, so each class gets a share
+    of the link proportional to its weight and no class is starved. The
+    virtual time is the finish time of the packet last sent (the
+    "self-clocked" approximation of WFQ, which avoids simulating the ideal
+    fluid system). Sizes are payload lengths; the class of a packet is its
+    `priority` field.
+    
+    Only the head of each class's queue sits in a heap, so enqueue is O(1)
+    and dequeue is O(log k) for k classes.
+    """
+
+    def __init__(self, weights=(4, 2, 1)):
+        if not weights or any(weight <= 0 for weight in weights):
+            raise ValueError("WFQ weights must be positive, one per class.")
+        self.weights = tuple(weights)
+        self._queues = [deque() for _ in self.weights]
+        self._last_finish = [0.0] * len(self.weights)
+        self._heads = []          # heap of (finish, seq, class) of queue heads
+        self._virtual_time = 0.0
+        self._seq = 0             # tie-breaker: equal finish times stay FIFO
+        self._length = 0
+
+    def push(self, item, cls: int, size: int):
+        if not (0 <= cls < len(self.weights)):
+            raise ValueError(f"Class {cls} is outside 0..{len(self.weights) - 1}.")
+        start = max(self._virtual_time, self._last_finish[cls])
+        finish = start + size / self.weights[cls]
+        self._last_finish[cls] = finish
+
+        queue = self._queues[cls]
+        queue.append((finish, item))
+        if len(queue) == 1:
+            heapq.heappush(self._heads, (finish, self._seq, cls))
+            self._seq += 1
+        self._length += 1
+
+    def dequeue(self):
+        """Returns the next packet to send, or None if the queue is empty."""
+        if not self._heads:
+            return None
+        finish, _, cls = heapq.heappop(self._heads)
+        queue = self._queues[cls]
+        _, packet = queue.popleft()
+        self._virtual_time = finish
+        if queue:
+            heapq.heappush(self._heads, (queue[0][0], self._seq, cls))
+            self._seq += 1
+        self._length -= 1
+        return packet
+
+    def __len__(self):
+        return self._length
+
+
+class DRRScheduler(_StreamingScheduler):
+    """
+    Streaming Deficit Round Robin scheduler.
+    
+    Backlogged classes are visited in turn. On each visit a class earns
+    `quantum * weight` bytes of credit (its deficit counter) and may send
+    packets while their payload fits in that credit; what is left over is
+    kept for its next turn, so large packets are not penalised. A class that
+    empties its queue loses its credit. Both operations are O(1) amortised.
+    The class of a packet is its `priority` field.
+    """
+
+    def __init__(self, weights=(4, 2, 1), quantum: int = 500):
+        if not weights or any(weight <= 0 for weight in weights):
+            raise ValueError("DRR weights must be positive, one per class.")
+        if quantum <= 0:
+            raise ValueError("The DRR quantum must be positive.")
+        self.weights = tuple(weights)
+        self._quanta = [quantum * weight for weight in self.weights]
+        self._queues = [deque() for _ in self.weights]
+        self._deficit = [0] * len(self.weights)
+        self._active = deque()    # backlogged classes, in round-robin order
+        self._visiting = False    # has the head of _active had its quantum?
+        self._length = 0
+
+    def push(self, item, cls: int, size: int):
+        if not (0 <= cls < len(self.weights)):
+            raise ValueError(f"Class {cls} is outside 0..{len(self.weights) - 1}.")
+        queue = self._queues[cls]
+        queue.append((size, item))
+        if len(queue) == 1:
+            self._active.append(cls)
+        self._length += 1
+
+    def dequeue(self):
+        """Returns the next packet to send, or None if the queue is empty."""
+        active = self._active
+        while active:
+            cls = active[0]
+            queue = self._queues[cls]
+            if not self._visiting:
+                self._deficit[cls] += self._quanta[cls]
+                self._visiting = True
+
+            size = queue[0][0]
+            if size <= self._deficit[cls]:
+                self._deficit[cls] -= size
+                _, packet = queue.popleft()
+                if not queue:
+                    # Idle classes do not keep credit
+                    self._deficit[cls] = 0
+                    active.popleft()
+                    self._visiting = False
+                self._length -= 1
+                return packet
+
+            # Not enough credit left: this class's turn is over
+            active.rotate(-1)
+            self._visiting = False
+        return None
+
+    def __len__(self):
+        return self._length
 
 
 # --- Main execution block for testing --- [cite: 84]
@@ -102,4 +450,43 @@ if __name__ == "__main__":
     # Note: Both VOIP packets have P0. The sort algorithm is "stable",
     # meaning it keeps them in their original relative order (VOIP 1, then VOIP 2).
     expected_priority = ["VOIP Packet 1", "VOIP Packet 2", "Video Packet 1", "Data Packet 1", "Data Packet 2"]
-    print(f"Test Passed:         {priority_payloads == expected_priority}")
\ No newline at end of file
+    print(f"Test Passed:         {priority_payloads == expected_priority}")
+
+
+    print("\n--- Testing streaming Priority Scheduler ---")
+    # Packets arrive one by one from a generator; the link sends one packet
+    # for every two arrivals, so the queue builds up and priority matters.
+    def arrivals():
+        for packet in arrival_list:
+            yield packet
+
+    stream_scheduler = PriorityScheduler(num_classes=3)
+    stream_payloads = [p.payload for p in stream_scheduler.serve(arrivals(), 0.5)]
+    print(f"Streaming Send Order: {stream_payloads}")
+    # Data 1 is sent before VOIP 1 has even arrived; after that the
+    # backlog is served by priority.
+    expected_stream = ["Data Packet 1", "VOIP Packet 1", "VOIP Packet 2", "Video Packet 1", "Data Packet 2"]
+    print(f"Test Passed:          {stream_payloads == expected_stream}")
+
+
+    print("\n--- Testing WFQ and DRR Schedulers ---")
+    # Class 2 (Low) has a long backlog; with weights 4:2:1 it still gets a
+    # share of the link instead of waiting behind every higher class.
+    backlog = [Packet("10.1.1.2", "192.168.1.10", f"Bulk {i}" + "." * 92, 2) for i in range(3)]
+    backlog += [Packet("172.16.0.5", "192.168.1.12", f"VOIP {i}" + "." * 94, 0) for i in range(8)]
+    for scheduler in (WFQScheduler((4, 2, 1)), DRRScheduler((4, 2, 1), quantum=100)):
+        for packet in backlog:
+            scheduler.enqueue(packet)
+        order = [p.payload.rstrip(".") for p in scheduler.drain()]
+        first_bulk = next(i for i, payload in enumerate(order) if payload.startswith("Bulk"))
+        print(f"{type(scheduler).__name__} Send Order: {order}")
+        print(f"Test Passed: {first_bulk < 8}  (first Bulk packet sent at position {first_bulk})")
+
+
+    print("\n--- Testing PacketBatch with the Priority Scheduler ---")
+    batch = PacketBatch.from_packets(arrival_list)
+    batch_scheduler = PriorityScheduler(num_classes=3)
+    batch_scheduler.enqueue_batch(batch)
+    batch_payloads = [batch.to_packet(i).payload for i in batch_scheduler.drain()]
+    print(f"Batch Send Order: {batch_payloads}")
+    print(f"Test Passed:      {batch_payloads == expected_priority}")
\ No newline at end of file
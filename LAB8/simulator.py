@@ -0,0 +1,276 @@
+# File Name: simulator.py
+# Discrete-event simulation of a router output port for Part 3:
+# traffic sources -> scheduler (finite buffer) -> output link.
+#
+# The schedulers in scheduler.py only reorder packets; this module adds
+# time. Packets arrive from configurable traffic generators, wait in the
+# scheduler's queue (tail drop when the buffer, or the class's share of it,
+# is full) and leave over a link of finite rate, and we measure per-class
+# throughput, delay and drops.
+
+import heapq
+import numbers
+import random
+import time
+
+try:
+    from scheduler import (Packet, FifoScheduler, PriorityScheduler,
+                           WFQScheduler, DRRScheduler)
+except ImportError:
+    print("\n--- ERROR ---")
+    print("Could not find 'scheduler.py' in the same directory.")
+    print("Please make sure 'scheduler.py' is present before running 'simulator.py'.")
+    print("-------------\n")
+    exit()
+
+# Event kinds. Departures sort before arrivals at the same instant, so a
+# packet leaving frees its buffer slot before the next one is admitted.
+DEPARTURE = 0
+ARRIVAL = 1
+
+SCHEDULERS = {
+    "fifo": FifoScheduler,
+    "priority": PriorityScheduler,
+    "wfq": WFQScheduler,
+    "drr": DRRScheduler,
+}
+
+
+class TrafficSource:
+    """
+    Generates the packet arrivals of one traffic class.
+
+    Args:
+        cls (int):        Class of the packets (the Packet.priority field).
+        rate_pps (float): Mean arrival rate in packets per second.
+        size:             Payload size in bytes: an int, or a sequence of
+                          sizes to pick from uniformly.
+        pattern (str):    "poisson" (exponential gaps), "cbr" (constant
+                          gaps) or "onoff" (Poisson bursts at `peak` times
+                          the mean rate, separated by silent periods).
+        peak (float):     Burst rate multiplier for the "onoff" pattern.
+        seed:             Seed for this source's random generator.
+    """
+    def __init__(self, cls: int, rate_pps: float, size=500,
+                 pattern: str = "poisson", peak: float = 4.0, seed=None):
+        if rate_pps <= 0:
+            raise ValueError("The arrival rate must be positive.")
+        self.cls = cls
+        self.rate_pps = rate_pps
+        self.pattern = pattern
+        rng = random.Random(seed)
+
+        # Both generators are plain callables, bound once, so the event loop
+        # does not pay for attribute lookups or branches per arrival.
+        if pattern == "poisson":
+            self.next_gap = lambda: rng.expovariate(rate_pps)
+        elif pattern == "cbr":
+            gap = 1.0 / rate_pps
+            self.next_gap = lambda: gap
+        elif pattern == "onoff":
+            if peak <= 1.0:
+                raise ValueError("The on/off peak multiplier must be above 1.")
+            on_rate = rate_pps * peak
+            mean_burst = 10.0   # packets per burst, on average
+            mean_off = mean_burst / rate_pps - mean_burst / on_rate
+
+            def next_gap():
+                gap = rng.expovariate(on_rate)
+                if rng.random() < 1.0 / mean_burst:
+                    gap += rng.expovariate(1.0 / mean_off)
+                return gap
+            self.next_gap = next_gap
+        else:
+            raise ValueError(f"Unknown traffic pattern '{pattern}'.")
+
+        # Any integer type (e.g. numpy.int64) is a fixed size, not a sequence
+        if isinstance(size, numbers.Integral):
+            size = int(size)
+            self.next_size = lambda: size
+        else:
+            sizes = tuple(int(s) for s in size)
+            self.next_size = lambda: rng.choice(sizes)
+
+    @classmethod
+    def from_packet(cls, packet: Packet, rate_pps: float, **kwargs) -> "TrafficSource":
+        """A source of copies of `packet` (its priority and payload size)."""
+        return cls(packet.priority, rate_pps, len(packet.payload), **kwargs)
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def simulate(sources: list, scheduler="fifo", link_rate_bps: float = 10e6,
+             buffer_packets: int = 100, duration: float = 10.0,
+             warmup: float = 0.0, class_buffer=None) -> dict:
+    """
+    Runs the event-driven simulation of one output port.
+
+    Args:
+        sources (list):        TrafficSource objects.
+        scheduler:             A streaming scheduler instance, or one of
+                               "fifo", "priority", "wfq", "drr".
+        link_rate_bps (float): Output link rate in bits per second.
+        buffer_packets (int):  Packets that can wait (besides the one being
+                               sent); arrivals beyond that are tail-dropped.
+        duration (float):      Simulated seconds.
+        warmup (float):        Packets arriving before this time are not
+                               counted in the statistics.
+        class_buffer:          Optional per-class limit on waiting packets:
+                               an int for every class, or a {cls: limit}
+                               dict. With one shared buffer the classes
+                               served most fill it and the others are
+                               dropped on arrival, which hides the WFQ/DRR
+                               weights; real WFQ/DRR ports give each class
+                               its own queue limit.
+
+    Returns:
+        dict: {"classes": {cls: stats}, "events": n, "wall_time": s,
+               "events_per_sec": r}, where stats has offered, delivered,
+               dropped, throughput_bps and delay mean/p50/p95/p99 (seconds).
+    """
+    if isinstance(scheduler, str):
+        scheduler = SCHEDULERS[scheduler]()
+
+    classes = sorted({source.cls for source in sources})
+    offered = dict.fromkeys(classes, 0)
+    dropped = dict.fromkeys(classes, 0)
+    delivered_bytes = dict.fromkeys(classes, 0)
+    delays = {cls: [] for cls in classes}
+    if class_buffer is None:
+        class_limits = dict.fromkeys(classes, buffer_packets)
+    elif isinstance(class_buffer, dict):
+        class_limits = {cls: class_buffer.get(cls, buffer_packets) for cls in classes}
+    else:
+        class_limits = dict.fromkeys(classes, class_buffer)
+    class_queued = dict.fromkeys(classes, 0)
+
+    # Event heap entries are plain (time, kind, source_index) tuples; a
+    # queued packet is an (arrival_time, cls, size) tuple. No other objects
+    # are created per event.
+    events = [(source.next_gap(), ARRIVAL, index) for index, source in enumerate(sources)]
+    heapq.heapify(events)
+    push, pop = heapq.heappush, heapq.heappop
+    enqueue, dequeue = scheduler.push, scheduler.dequeue
+    gaps = [source.next_gap for source in sources]
+    sizes = [source.next_size for source in sources]
+    source_classes = [source.cls for source in sources]
+    seconds_per_byte = 8.0 / link_rate_bps
+
+    queued = 0              # packets waiting in the scheduler
+    in_service = None       # packet on the link, if any
+    processed = 0
+    start = time.perf_counter()
+
+    while events:
+        now, kind, index = pop(events)
+        if now > duration:
+            break
+        processed += 1
+
+        if kind == ARRIVAL:
+            cls = source_classes[index]
+            size = sizes[index]()
+            push(events, (now + gaps[index](), ARRIVAL, index))
+            counted = now >= warmup
+            if counted:
+                offered[cls] += 1
+            if in_service is None:
+                in_service = (now, cls, size)
+                push(events, (now + size * seconds_per_byte, DEPARTURE, 0))
+            elif queued < buffer_packets and class_queued[cls] < class_limits[cls]:
+                enqueue((now, cls, size), cls, size)
+                queued += 1
+                class_queued[cls] += 1
+            elif counted:
+                dropped[cls] += 1
+
+        else:
+            arrived, cls, size = in_service
+            if arrived >= warmup:
+                delivered_bytes[cls] += size
+                delays[cls].append(now - arrived)
+            if queued:
+                in_service = dequeue()
+                queued -= 1
+                class_queued[in_service[1]] -= 1
+                push(events, (now + in_service[2] * seconds_per_byte, DEPARTURE, 0))
+            else:
+                in_service = None
+
+    wall_time = time.perf_counter() - start
+    measured = max(duration - warmup, 1e-12)
+    report = {}
+    for cls in classes:
+        values = sorted(delays[cls])
+        report[cls] = {
+            "offered": offered[cls],
+            "delivered": len(values),
+            "dropped": dropped[cls],
+            "throughput_bps": delivered_bytes[cls] * 8 / measured,
+            "delay_mean": sum(values) / len(values) if values else float("nan"),
+            "delay_p50": _percentile(values, 0.50),
+            "delay_p95": _percentile(values, 0.95),
+            "delay_p99": _percentile(values, 0.99),
+        }
+    return {
+        "classes": report,
+        "events": processed,
+        "wall_time": wall_time,
+        "events_per_sec": processed / wall_time if wall_time else float("inf"),
+    }
+
+
+def print_report(name: str, result: dict):
+    print(f"--- {name}: {result['events']:,} events in {result['wall_time']:.2f} s "
+          f"({result['events_per_sec']:,.0f} events/s) ---")
+    print(f"  {'Class':<6} {'Offered':>9} {'Sent':>9} {'Dropped':>8} {'Mbit/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for cls, stats in result["classes"].items():
+        print(f"  {cls:<6} {stats['offered']:>9} {stats['delivered']:>9} {stats['dropped']:>8} "
+              f"{stats['throughput_bps'] / 1e6:>8.2f} {stats['delay_p50'] * 1e3:>8.2f} "
+              f"{stats['delay_p95'] * 1e3:>8.2f} {stats['delay_p99'] * 1e3:>8.2f}")
+    print()
+
+
+# --- Main execution block for testing ---
+if __name__ == "__main__":
+
+    print("--- Testing the discrete-event simulator ---\n")
+
+    # The three traffic classes of the lab, as templates for the sources
+    voip = Packet("172.16.0.5", "192.168.1.12", "V" * 200, 0)
+    video = Packet("10.1.1.4", "192.168.1.13", "v" * 1000, 1)
+    data = Packet("10.1.1.2", "192.168.1.10", "d" * 1500, 2)
+
+    def make_sources():
+        # 10 Mbit/s link offered about 11 Mbit/s: a slightly overloaded port
+        return [
+            TrafficSource.from_packet(voip, 1500, pattern="cbr", seed=1),
+            TrafficSource.from_packet(video, 500, pattern="onoff", seed=2),
+            TrafficSource.from_packet(data, 500, seed=3),
+        ]
+
+    for name in ("fifo", "priority", "wfq", "drr"):
+        result = simulate(make_sources(), name, link_rate_bps=10e6,
+                          buffer_packets=100, duration=20.0, warmup=1.0)
+        print_report(name.upper(), result)
+
+    # Every class now offers ~6 Mbit/s, more than its weighted share, and
+    # each has its own 50-packet queue: WFQ and DRR split the 10 Mbit/s link
+    # about 4:2:1 (by bytes), while strict priority starves classes 1 and 2.
+    def make_overload():
+        return [
+            TrafficSource.from_packet(voip, 3750, seed=1),
+            TrafficSource.from_packet(video, 750, pattern="onoff", seed=2),
+            TrafficSource.from_packet(data, 500, seed=3),
+        ]
+
+    print("--- Every class overloaded, 50 packets of buffer per class ---\n")
+    for name in ("priority", "wfq", "drr"):
+        result = simulate(make_overload(), name, link_rate_bps=10e6, buffer_packets=150,
+                          duration=20.0, warmup=1.0, class_buffer=50)
+        print_report(name.upper(), result)